@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Compare peak memory of the DataFrame feature pipeline and the lean matrix path.
+
+Each mode runs in its own subprocess so peak RSS is measured independently.
+
+Usage:
+    python scripts/benchmark_feature_memory.py --input data/raw/skygeni_sales_data.csv
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import MODEL_FEATURES
+from data.data_loader import (
+    add_temporal_features,
+    load_sales_data,
+    parse_date_columns,
+    prepare_target_variable,
+)
+from features.feature_transformer import RiskFeatureTransformer
+
+MODES = ("frame", "lean")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark feature pipeline memory")
+    parser.add_argument("--input", required=True, help="Path to sales data file")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(input_path: Path, mode: str) -> dict:
+    """Run one pipeline mode and report its timing and memory."""
+    df = load_sales_data(input_path, parse_dates=False)
+    transformer = RiskFeatureTransformer().fit(df)
+    baseline_mb = _peak_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "frame":
+        df = parse_date_columns(df.copy())
+        df = add_temporal_features(prepare_target_variable(df))
+        X = transformer.transform(df)[MODEL_FEATURES].to_numpy()
+    else:
+        parse_date_columns(df)
+        add_temporal_features(prepare_target_variable(df, copy=False), copy=False)
+        X = transformer.transform_matrix(df, MODEL_FEATURES)
+    elapsed = time.perf_counter() - start
+
+    peak_mb = _peak_rss_mb()
+    return {
+        "mode": mode,
+        "rows": len(df),
+        "features": X.shape[1],
+        "seconds": round(elapsed, 3),
+        "baseline_rss_mb": round(baseline_mb, 1),
+        "peak_rss_mb": round(peak_mb, 1),
+        "pipeline_rss_mb": round(peak_mb - baseline_mb, 1),
+    }
+
+
+def main() -> None:
+    """Run every mode in a subprocess and print a comparison."""
+    args = parse_args()
+    if args.mode:
+        print(json.dumps(run_mode(Path(args.input), args.mode)))
+        return
+
+    results = []
+    for mode in MODES:
+        completed = subprocess.run(
+            [sys.executable, __file__, "--input", args.input, "--mode", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8}{'rows':>12}{'seconds':>10}{'peak MB':>10}{'pipeline MB':>13}")
+    for result in results:
+        print(
+            f"{result['mode']:<8}{result['rows']:>12,}{result['seconds']:>10.2f}"
+            f"{result['peak_rss_mb']:>10.1f}{result['pipeline_rss_mb']:>13.1f}"
+        )
+    frame, lean = results
+    if frame["pipeline_rss_mb"] > 0:
+        saving = 1 - lean["pipeline_rss_mb"] / frame["pipeline_rss_mb"]
+        print(f"\n[OK] Lean path uses {saving * 100:.0f}% less pipeline memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Compare scoring latency of the sklearn model and its flat-array export.
+
+Usage:
+    python scripts/benchmark_flat_model.py --input data/raw/skygeni_sales_data.csv
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from config import MODEL_FEATURES, MODEL_FILENAME, MODELS_DIR
+from data.data_loader import add_temporal_features, load_sales_data
+from features.feature_transformer import RiskFeatureTransformer
+from models.flat_ensemble import export_flat_model
+from models.risk_scorer import predict_loss_probability
+
+BATCH_SIZES = (1, 10, 100, 1000)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark flat-array model inference")
+    parser.add_argument("--input", required=True, help="Path to sales data file")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed calls per batch size")
+    return parser.parse_args()
+
+
+def _mean_latency_ms(predict, X, repeats: int) -> float:
+    """Mean wall time of one predict call in milliseconds."""
+    predict(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(X)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main() -> None:
+    """Time both inference paths at several batch sizes."""
+    args = parse_args()
+    model = joblib.load(MODELS_DIR / MODEL_FILENAME)
+    transformer = RiskFeatureTransformer.load(MODELS_DIR)
+    flat_model = export_flat_model(model, MODEL_FEATURES)
+
+    df = add_temporal_features(load_sales_data(Path(args.input)).head(max(BATCH_SIZES)))
+    X = pd.DataFrame(transformer.transform_matrix(df), columns=MODEL_FEATURES)
+
+    max_diff = np.abs(
+        flat_model.predict_loss_probability(X) - predict_loss_probability(model, X)
+    ).max()
+    print(f"Max probability difference: {max_diff:.3e}")
+    print(f"{'batch':>6} {'sklearn ms':>11} {'flat ms':>9} {'speedup':>8}")
+    for batch_size in BATCH_SIZES:
+        X_batch = X.iloc[:batch_size]
+        X_array = X_batch.to_numpy()
+        sklearn_ms = _mean_latency_ms(
+            lambda batch: predict_loss_probability(model, batch), X_batch, args.repeats
+        )
+        flat_ms = _mean_latency_ms(flat_model.predict_loss_probability, X_array, args.repeats)
+        print(f"{batch_size:>6} {sklearn_ms:>11.3f} {flat_ms:>9.3f} {sklearn_ms / flat_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
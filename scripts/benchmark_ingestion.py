@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Compare serial and concurrent CRM ingestion against the local fake CRM.
+
+The fake server adds --latency seconds to every page, standing in for the
+CRM's response time. The serial run fetches one page at a time for one
+tenant at a time; the concurrent run uses the pooled connections and
+tenant concurrency that `skygeni ingest` defaults to.
+
+Usage:
+    python scripts/benchmark_ingestion.py --tenants 8 --deals 100000 --latency 0.1
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import CRM_CONNECTIONS_PER_TENANT, CRM_PAGE_SIZE, CRM_TENANT_CONCURRENCY
+from data.crm_ingestion import ingest_tenants
+from data.fake_crm import FakeCRMServer
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark CRM ingestion")
+    parser.add_argument("--tenants", type=int, default=4, help="Number of tenants")
+    parser.add_argument("--deals", type=int, default=100_000, help="Deals per tenant")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per page request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of 503 responses")
+    parser.add_argument("--page-size", type=int, default=CRM_PAGE_SIZE, help="Deals per page")
+    parser.add_argument(
+        "--skip-serial", action="store_true", help="Only time the concurrent configuration"
+    )
+    return parser.parse_args()
+
+
+def _timed_run(url: str, tenants: list, **options) -> float:
+    """Ingest every tenant into a scratch directory and return the wall time."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        results = ingest_tenants(url, tenants, Path(output_dir), **options)
+        seconds = time.perf_counter() - start
+    failed = [result for result in results if not result.succeeded]
+    if failed:
+        raise SystemExit(f"{len(failed)} tenants failed: {failed[0].error}")
+    return seconds
+
+
+def main() -> None:
+    """Time serial and concurrent ingestion of the same tenants."""
+    args = parse_args()
+    tenants = [f"tenant_{number:03d}" for number in range(args.tenants)]
+    total = args.tenants * args.deals
+    configurations = [
+        ("concurrent", CRM_TENANT_CONCURRENCY, CRM_CONNECTIONS_PER_TENANT),
+    ]
+    if not args.skip_serial:
+        configurations.insert(0, ("serial", 1, 1))
+
+    with FakeCRMServer(
+        {tenant: args.deals for tenant in tenants},
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+    ) as crm:
+        print(f"{args.tenants} tenants x {args.deals:,} deals, {args.latency * 1000:.0f} ms/page")
+        for name, tenant_concurrency, connections in configurations:
+            seconds = _timed_run(
+                crm.url,
+                tenants,
+                tenant_concurrency=tenant_concurrency,
+                page_size=args.page_size,
+                max_connections=connections,
+            )
+            print(
+                f"{name:>10}: {seconds:7.2f}s  {total / seconds:10,.0f} deals/s  "
+                f"({tenant_concurrency} tenants x {connections} connections)"
+            )
+
+
+if __name__ == "__main__":
+    main()
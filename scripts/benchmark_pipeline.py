@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+"""
+Time and memory-profile every pipeline stage on synthetic data.
+
+Each size gets a synthetic deals CSV (generated once and reused). Every
+stage is timed without tracing, keeping the best of --repeats runs, then
+run once more under tracemalloc to record its peak allocation. Results are
+written as JSON and compared with a stored baseline; a stage that is
+slower or larger than the baseline by more than --tolerance is reported as
+a regression and the script exits non-zero. The committed baseline,
+benchmarks/pipeline_baseline.json, was recorded with --save-baseline at
+the default sizes and seed; timings are machine-specific, so re-record it
+before comparing on other hardware.
+
+Usage:
+    python scripts/benchmark_pipeline.py --sizes 10000 100000 --output bench.json
+    python scripts/benchmark_pipeline.py --save-baseline
+    python scripts/benchmark_pipeline.py --sizes 10000 100000 1000000 10000000
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from config import MODEL_FEATURES, PROCESSED_DATA_DIR, PROJECT_ROOT, SEGMENT_COLUMNS
+from data.data_loader import (
+    add_temporal_features,
+    load_sales_data,
+    parse_date_columns,
+    prepare_target_variable,
+)
+from data.synthetic_data import generate_sales_data, write_sales_data
+from features.feature_engineering import compute_feature_statistics, engineer_risk_features
+from features.segment_probabilities import calculate_segment_probabilities
+from models.risk_scorer import predict_loss_probability, train_model
+from pipeline.risk_digest import risk_categories_for_scores, risk_scores_from_probabilities
+from recommendations.recommendation_engine import (
+    generate_recommendations_batch,
+    identify_risk_factors_batch,
+)
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmarks" / "pipeline_baseline.json"
+DEFAULT_DATA_DIR = PROCESSED_DATA_DIR / "benchmark"
+TRAINING_ROWS = 20_000
+# Differences below these floors are noise, whatever the ratio.
+MIN_SECONDS_DELTA = 0.05
+MIN_PEAK_MB_DELTA = 5.0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Row counts")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per stage; best is kept")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Synthetic data cache")
+    parser.add_argument("--output", help="Path for the JSON results")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Write these results as the new baseline"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed fractional slowdown or growth"
+    )
+    return parser.parse_args()
+
+
+def measure(stage: Callable[[], Any], repeats: int) -> Tuple[Any, Dict[str, float]]:
+    """
+    Time a stage and record its peak traced allocation.
+
+    Args:
+        stage: Zero-argument callable running the stage.
+        repeats: Untraced timed runs; the fastest is reported.
+
+    Returns:
+        Tuple of (stage result, {'seconds', 'peak_mb'}).
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        stage()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        result = stage()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {"seconds": min(timings), "peak_mb": peak / 1024**2}
+
+
+def benchmark_size(path: Path, model: Any, repeats: int) -> Dict[str, Dict[str, float]]:
+    """
+    Run every stage in pipeline order on one synthetic file.
+
+    Args:
+        path: Synthetic deals CSV.
+        model: Trained risk model.
+        repeats: Timed runs per stage.
+
+    Returns:
+        Stage name to {'seconds', 'peak_mb'}.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+
+    df, results["load_sales_data"] = measure(lambda: load_sales_data(path), repeats)
+    df, results["prepare_target_variable"] = measure(lambda: prepare_target_variable(df), repeats)
+    df, results["add_temporal_features"] = measure(lambda: add_temporal_features(df), repeats)
+    segment_probs, results["calculate_segment_probabilities"] = measure(
+        lambda: calculate_segment_probabilities(df, SEGMENT_COLUMNS), repeats
+    )
+    feature_stats = compute_feature_statistics(df)
+    df_features, results["engineer_risk_features"] = measure(
+        lambda: engineer_risk_features(df, segment_probs, feature_stats=feature_stats), repeats
+    )
+    X = df_features[MODEL_FEATURES]
+    loss_probability, results["predict_loss_probability"] = measure(
+        lambda: predict_loss_probability(model, X), repeats
+    )
+    categories, results["risk_categories"] = measure(
+        lambda: pd.Series(
+            risk_categories_for_scores(risk_scores_from_probabilities(loss_probability)),
+            index=df_features.index,
+        ),
+        repeats,
+    )
+    factors, results["identify_risk_factors_batch"] = measure(
+        lambda: identify_risk_factors_batch(df_features, model, MODEL_FEATURES), repeats
+    )
+    _, results["generate_recommendations_batch"] = measure(
+        lambda: generate_recommendations_batch(categories, factors, df_features), repeats
+    )
+    return results
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    tolerance: float,
+) -> List[str]:
+    """
+    List stages that regressed against the baseline.
+
+    Args:
+        results: Size to stage to metrics for this run.
+        baseline: Same structure from the stored baseline.
+        tolerance: Allowed fractional increase.
+
+    Returns:
+        Human-readable regression descriptions.
+    """
+    regressions = []
+    floors = {"seconds": MIN_SECONDS_DELTA, "peak_mb": MIN_PEAK_MB_DELTA}
+    for size, stages in results.items():
+        for stage, metrics in stages.items():
+            reference = baseline.get(size, {}).get(stage)
+            if reference is None:
+                continue
+            for metric, floor in floors.items():
+                current, previous = metrics[metric], reference[metric]
+                if current > previous * (1 + tolerance) and current - previous > floor:
+                    regressions.append(
+                        f"{size} rows / {stage}: {metric} {previous:.3f} -> {current:.3f}"
+                    )
+    return regressions
+
+
+def main() -> None:
+    """Benchmark each size, write results and check for regressions."""
+    args = parse_args()
+    data_dir = Path(args.data_dir)
+
+    training = generate_sales_data(TRAINING_ROWS)
+    parse_date_columns(training)
+    training = add_temporal_features(prepare_target_variable(training))
+    training_features = engineer_risk_features(
+        training, calculate_segment_probabilities(training, SEGMENT_COLUMNS)
+    )
+    model = train_model(
+        training_features[MODEL_FEATURES], training_features["is_lost"], "gradient_boosting"
+    )
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for size in args.sizes:
+        path = data_dir / f"synthetic_{size}.csv"
+        if not path.exists():
+            print(f"Generating {size:,} synthetic deals...")
+            write_sales_data(path, size)
+        results[str(size)] = benchmark_size(path, model, args.repeats)
+
+        print(f"\n{size:,} rows")
+        print(f"  {'stage':<34} {'seconds':>9} {'peak MB':>9}")
+        for stage, metrics in results[str(size)].items():
+            print(f"  {stage:<34} {metrics['seconds']:>9.3f} {metrics['peak_mb']:>9.1f}")
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "scikit-learn": sklearn.__version__,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n[OK] Results saved to: {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[OK] Baseline saved to: {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"[WARN] No baseline at {baseline_path}; run with --save-baseline to create one")
+        return
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"[REGRESSION] {regression}")
+    if regressions:
+        raise SystemExit(f"{len(regressions)} stage metrics regressed beyond {args.tolerance:.0%}")
+    print(f"[OK] No regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Measure CLI cold-start time and show which imports dominate it.
+
+Each command runs in a fresh interpreter with ``-X importtime``. The report
+lists wall time per command and the slowest top-level imports by cumulative
+time, so an eager heavy import shows up as a regression.
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --command "score --help" --command "train --help" --top 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+DEFAULT_COMMANDS = ["--help", "score --help", "eda --help"]
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time")
+    parser.add_argument(
+        "--command",
+        action="append",
+        help="skygeni arguments to time, e.g. 'score --help' (repeatable)",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per command; best is kept")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--output", help="Optional path for a JSON report")
+    return parser.parse_args()
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, object]]:
+    """
+    Parse ``-X importtime`` output into top-level import timings.
+
+    Args:
+        stderr: Captured stderr of a ``python -X importtime`` run.
+
+    Returns:
+        Top-level imports with cumulative microseconds, slowest first.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line.split("|")
+        # Nested imports are indented under their importer; keep top-level only.
+        if not module.startswith("  "):
+            imports.append({"module": module.strip(), "cumulative_us": int(cumulative_us)})
+    return sorted(imports, key=lambda item: item["cumulative_us"], reverse=True)
+
+
+def time_command(arguments: List[str], repeats: int) -> Dict[str, object]:
+    """
+    Run the CLI in fresh interpreters and keep the fastest run.
+
+    Args:
+        arguments: Arguments passed to the skygeni CLI.
+        repeats: Number of runs.
+
+    Returns:
+        Wall time in milliseconds and top-level import timings of the best run.
+    """
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "cli.main", *arguments],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if best is None or elapsed_ms < best["wall_ms"]:
+            best = {"wall_ms": elapsed_ms, "imports": parse_importtime(result.stderr)}
+    return best
+
+
+def main() -> None:
+    """Time each command and print the import breakdown."""
+    args = parse_args()
+    commands = args.command or DEFAULT_COMMANDS
+
+    report = {}
+    for command in commands:
+        timing = time_command(command.split(), args.repeats)
+        report[command] = timing
+        print(f"\nskygeni {command}: {timing['wall_ms']:.0f} ms")
+        for item in timing["imports"][: args.top]:
+            print(f"  {item['cumulative_us'] / 1000:8.1f} ms  {item['module']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n[OK] Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Load-test the scoring service and report latency percentiles and throughput.
+
+Usage:
+    python scripts/load_test_service.py --url http://127.0.0.1:8080 --requests 2000 --concurrency 32
+    python scripts/load_test_service.py --input data/raw/skygeni_sales_data.csv
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+
+from service.scoring_service import SCORE_PATH
+
+SAMPLE_DEAL: Dict[str, Any] = {
+    "deal_id": "D12345",
+    "deal_amount": 45000,
+    "industry": "EdTech",
+    "product_type": "Enterprise",
+    "lead_source": "Partner",
+    "region": "North America",
+    "created_date": "2026-01-15",
+    "deal_stage": "Proposal",
+    "sales_cycle_days": 28,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Load-test the scoring service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="Service base URL")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--input", help="Optional CSV of deals to use as request bodies")
+    return parser.parse_args()
+
+
+def load_payloads(input_path: str, limit: int) -> List[bytes]:
+    """Encode request bodies from a deals CSV, or the sample deal."""
+    if not input_path:
+        return [json.dumps(SAMPLE_DEAL).encode("utf-8")]
+    import pandas as pd
+
+    deals = pd.read_csv(input_path, nrows=limit)
+    return [json.dumps(record).encode("utf-8") for record in deals.to_dict(orient="records")]
+
+
+def run_client(
+    host: str, port: int, payloads: List[bytes], count: int, offset: int, latencies: List[float]
+) -> None:
+    """Send count requests over one keep-alive connection."""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    for request_number in range(count):
+        body = payloads[(offset + request_number) % len(payloads)]
+        start = time.perf_counter()
+        connection.request("POST", SCORE_PATH, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"Request failed with HTTP {response.status}")
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def main() -> None:
+    """Run the load test and print the report."""
+    args = parse_args()
+    parsed = urlparse(args.url)
+    payloads = load_payloads(args.input, args.requests)
+
+    per_client = [args.requests // args.concurrency] * args.concurrency
+    for client in range(args.requests % args.concurrency):
+        per_client[client] += 1
+
+    latencies: List[float] = []
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(
+                parsed.hostname,
+                parsed.port or 80,
+                payloads,
+                count,
+                sum(per_client[:i]),
+                latencies,
+            ),
+        )
+        for i, count in enumerate(per_client)
+        if count
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latency_ms = np.array(latencies) * 1000
+    print("=" * 60)
+    print("SCORING SERVICE LOAD TEST")
+    print("=" * 60)
+    print(f"Requests:    {len(latencies):,} ({args.concurrency} concurrent clients)")
+    print(f"Throughput:  {len(latencies) / elapsed:,.1f} requests/sec")
+    for percentile in (50, 95, 99):
+        print(f"p{percentile} latency: {np.percentile(latency_ms, percentile):.1f} ms")
+    print(f"max latency: {latency_ms.max():.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
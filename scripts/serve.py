@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+"""
+Run the local single-deal risk scoring service.
+
+Equivalent to ``skygeni serve``.
+
+Usage:
+    python scripts/serve.py --port 8080
+    curl -X POST localhost:8080/v1/deals/score -d @deal.json
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cli.main import main
+
+if __name__ == "__main__":
+    main(["serve", *sys.argv[1:]])
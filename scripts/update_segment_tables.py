@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+"""
+Fold newly closed deals into the saved segment win-rate tables.
+
+Reads only the new deals; the saved won/total counts stand in for the full
+history. Several input partitions can be passed and are combined.
+Equivalent to ``skygeni update-segments``.
+
+Usage:
+    python scripts/update_segment_tables.py --input data/raw/closed_2024_06_01.csv
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cli.main import main
+
+if __name__ == "__main__":
+    main(["update-segments", *sys.argv[1:]])
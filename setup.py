@@ -11,6 +11,10 @@ setup(
     url="https://github.com/yourusername/skygeni-sales-intelligence",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    py_modules=["config", "decision_engine", "metrics"],
+    entry_points={
+        "console_scripts": ["skygeni=cli.main:main"],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Data Scientists",
@@ -24,4 +28,7 @@ setup(
         "matplotlib>=3.7.2",
         "seaborn>=0.12.2",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=14.0.0"],
+    },
 )
@@ -0,0 +1,30 @@
+"""
+Build the daily top-N risk digest per manager from scored deals.
+"""
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.risk_digest import DIGEST_COLUMNS, add_risk_columns, top_risk_deals
+
+
+def run(args: argparse.Namespace) -> None:
+    """Read scored deals and write each group's riskiest deals."""
+    input_path = Path(args.input)
+    header = pd.read_csv(input_path, nrows=0).columns
+    if "loss_probability" not in header or args.by not in header:
+        raise ValueError(f"{input_path} needs 'loss_probability' and '{args.by}' columns")
+    usecols = [column for column in header if column in DIGEST_COLUMNS or column == args.by]
+    df = pd.read_csv(input_path, usecols=usecols, dtype={args.by: "category"})
+    if "risk_score" not in df.columns:
+        add_risk_columns(df)
+
+    digest = top_risk_deals(df, by=args.by, n=args.top)
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    digest.to_csv(output_path, index=False)
+    groups = digest[args.by].nunique()
+    print(f"[OK] Top {args.top} deals for {groups:,} values of {args.by} from {len(df):,} deals")
+    print(f"[OK] Digest saved to: {output_path}")
@@ -0,0 +1,57 @@
+"""
+Run exploratory data analysis checks.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from config import DATA_CACHE_DIR, SALES_DATA_PATH
+from data.data_loader import add_temporal_features, load_sales_data
+
+
+def print_summary(
+    rows: int,
+    date_range: tuple,
+    statistics: pd.DataFrame,
+    win_rate: Optional[float],
+) -> None:
+    """Print the EDA report shared by the in-memory and streaming modes."""
+    print(f"[OK] Data loaded: {rows:,} deals")
+    print(f"Date range: {date_range[0]} to {date_range[1]}")
+
+    print("\n" + "=" * 80)
+    print("BASIC STATISTICS")
+    print("=" * 80)
+    print(statistics)
+
+    if win_rate is not None and not pd.isna(win_rate):
+        print(f"\nOverall Win Rate: {win_rate * 100:.1f}%")
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run basic EDA checks."""
+    print("=" * 80)
+    print("SKYGENI SALES INTELLIGENCE - EXPLORATORY DATA ANALYSIS")
+    print("=" * 80)
+
+    paths = [Path(path) for path in args.input] if args.input else [SALES_DATA_PATH]
+    if args.streaming:
+        # Imported here: only the streaming mode needs the sketches and process pool.
+        from data.eda_statistics import summarize_sales_data
+
+        print(f"\nStreaming {len(paths)} file(s) in chunks of {args.chunk_size:,} rows...")
+        summary = summarize_sales_data(paths, chunk_size=args.chunk_size, workers=args.workers)
+        print_summary(summary.rows, summary.date_range, summary.describe(), summary.win_rate)
+    else:
+        print("\nLoading data...")
+        df = pd.concat(
+            [load_sales_data(path, cache_dir=DATA_CACHE_DIR) for path in paths], ignore_index=True
+        )
+        df = add_temporal_features(df)
+        win_rate = (df["outcome"] == "Won").mean()
+        date_range = (df["created_date"].min(), df["created_date"].max())
+        print_summary(len(df), date_range, df.describe(), win_rate)
+    print("\n[OK] EDA complete. Open notebooks/01_EDA.ipynb for details.")
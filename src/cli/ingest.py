@@ -0,0 +1,53 @@
+"""
+Pull tenants' deals from the CRM into partitioned Parquet files.
+"""
+
+import argparse
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+
+from config import CRM_EXPORT_DIR
+from data.crm_client import RetryPolicy
+from data.crm_ingestion import ingest_tenants
+
+RUN_SUMMARY_FILENAME = "_ingest_summary.json"
+
+
+def run(args: argparse.Namespace) -> None:
+    """Sync each tenant's deals and report per-tenant results."""
+    output_dir = Path(args.output_dir) if args.output_dir else CRM_EXPORT_DIR
+    headers = {}
+    token = os.environ.get(args.token_env)
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    results = ingest_tenants(
+        args.base_url,
+        args.tenants,
+        output_dir,
+        tenant_concurrency=args.tenant_concurrency,
+        page_size=args.page_size,
+        max_connections=args.connections,
+        retry=RetryPolicy(max_attempts=args.max_attempts),
+        headers=headers,
+    )
+
+    summary_path = output_dir / RUN_SUMMARY_FILENAME
+    summary = [asdict(result) for result in results]
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    failed = [result for result in results if not result.succeeded]
+    for result in results:
+        if result.succeeded:
+            print(
+                f"[OK] {result.tenant_id}: {result.rows:,} deals from {result.pages:,} pages "
+                f"in {result.seconds:.1f}s ({result.rejected:,} rejected, "
+                f"{result.duplicates:,} duplicates dropped)"
+            )
+        else:
+            print(f"[FAIL] {result.tenant_id}: {result.error}")
+    print(f"[OK] Run summary saved to: {summary_path}")
+    if failed:
+        raise SystemExit(f"{len(failed)} of {len(results)} tenants failed")
@@ -0,0 +1,355 @@
+"""
+Single command line entry point for the sales intelligence tools.
+
+Only argparse is imported up front. Each subcommand names the module that
+implements it, and that module (with pandas, scikit-learn and the model
+artifacts) is imported only when the subcommand runs, so ``--help`` and
+argument errors return immediately.
+
+Usage:
+    skygeni eda
+    skygeni eda --streaming --input data/raw/extract.parquet --workers 4
+    skygeni train
+    skygeni train --select-model --workers 8
+    skygeni tune --time-budget 600 && skygeni train --tuned-config models/tuned_model_config.json
+    skygeni score --input data/raw/new_deals.csv --output outputs/risk_scores.csv
+    skygeni score --input data/raw/open_pipeline.csv --output outputs/risk_scores.csv --incremental
+    skygeni score --input ... --output outputs/risk_scores.csv --drift-report outputs/drift.json
+    skygeni --metrics-json metrics.jsonl --metrics-prom metrics.prom score --input ... --output ...
+    SKYGENI_METRICS_PROM=/var/lib/node_exporter/skygeni.prom python scripts/score_deals.py ...
+    skygeni ingest --base-url https://crm.example.com/api --tenants acme globex
+    skygeni score-tenants --input data/tenants/*.csv --output-dir outputs/tenants --workers 8
+    skygeni serve --port 8080
+    skygeni update-segments --input data/raw/closed_2024_06_01.csv
+    skygeni digest --input outputs/risk_scores.csv --output outputs/digest.csv --top 10
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from typing import List, Optional
+
+from config import (
+    BUNDLE_CACHE_SIZE,
+    CRM_CONNECTIONS_PER_TENANT,
+    CRM_PAGE_SIZE,
+    CRM_TENANT_CONCURRENCY,
+    DEFAULT_TENANT,
+    FEATURE_STORE_MAX_ENTRIES,
+    FEATURE_STORE_TTL_SECONDS,
+)
+
+
+def add_feature_store_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that put a feature store in front of feature engineering."""
+    parser.add_argument(
+        "--feature-store",
+        default=None,
+        help="Cache per-deal features: 'memory' or a SQLite file path shared between runs",
+    )
+    parser.add_argument(
+        "--feature-ttl",
+        type=float,
+        default=FEATURE_STORE_TTL_SECONDS,
+        help="Seconds a cached feature row stays valid",
+    )
+    parser.add_argument(
+        "--feature-store-size",
+        type=int,
+        default=FEATURE_STORE_MAX_ENTRIES,
+        help="Most cached feature rows; least recently used are evicted",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for all subcommands.
+
+    Returns:
+        Parser whose subcommands set a ``command_module`` default naming the
+        module with the subcommand's ``run(args)`` function.
+    """
+    parser = argparse.ArgumentParser(prog="skygeni", description="SkyGeni sales intelligence tools")
+    parser.add_argument(
+        "--metrics-json",
+        default=os.environ.get("SKYGENI_METRICS_JSON"),
+        help="Append per-stage timing and memory records to this JSON-lines file "
+        "(default: $SKYGENI_METRICS_JSON)",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        default=os.environ.get("SKYGENI_METRICS_PROM"),
+        help="Write aggregated stage metrics to this Prometheus text file "
+        "(default: $SKYGENI_METRICS_PROM)",
+    )
+    parser.add_argument(
+        "--metrics-memory",
+        choices=["rss", "tracemalloc", "none"],
+        default="rss",
+        help="Peak memory source for stage metrics; tracemalloc is per stage but slow",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    eda = subparsers.add_parser("eda", help="Run exploratory data analysis checks")
+    eda.add_argument(
+        "--input", nargs="+", default=None, help="Sales files (default: the configured dataset)"
+    )
+    eda.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Summarise in one chunked pass with bounded memory (approximate quartiles)",
+    )
+    eda.add_argument(
+        "--chunk-size", type=int, default=100_000, help="Rows per chunk in streaming mode"
+    )
+    eda.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for files or row groups"
+    )
+    eda.set_defaults(command_module="cli.eda")
+
+    train = subparsers.add_parser("train", help="Train and save the deal risk model")
+    train_model_choice = train.add_mutually_exclusive_group()
+    train_model_choice.add_argument(
+        "--select-model",
+        action="store_true",
+        help="Pick the model type by stratified cross-validation over all configured models",
+    )
+    train_model_choice.add_argument(
+        "--tuned-config", help="Train with a config written by `skygeni tune`"
+    )
+    train.add_argument(
+        "--workers", type=int, default=None, help="Worker processes for model selection"
+    )
+    train.add_argument(
+        "--quantile-error",
+        type=float,
+        default=None,
+        help="Approximate feature medians with quantile sketches of this rank error (e.g. 0.01)",
+    )
+    train.add_argument(
+        "--rolling-window",
+        type=int,
+        default=None,
+        help="Use each deal's segment win rates over this many preceding months for win_prob_*",
+    )
+    train.add_argument(
+        "--rolling-half-life",
+        type=float,
+        default=None,
+        help="Use exponentially decayed segment win rates with this half-life in months",
+    )
+    train.set_defaults(command_module="cli.train")
+
+    tune = subparsers.add_parser("tune", help="Search model hyperparameters by successive halving")
+    tune.add_argument(
+        "--model-type",
+        choices=["gradient_boosting", "random_forest"],
+        default="gradient_boosting",
+        help="Model type to tune",
+    )
+    tune.add_argument(
+        "--candidates", type=int, default=27, help="Configurations sampled at the first rung"
+    )
+    tune.add_argument("--eta", type=int, default=3, help="Keep the best 1/eta at each rung")
+    tune.add_argument(
+        "--time-budget", type=float, default=None, help="Wall-clock budget in seconds"
+    )
+    tune.set_defaults(command_module="cli.tune")
+
+    score = subparsers.add_parser("score", help="Score deals with the trained risk model")
+    score.add_argument("--input", required=True, help="Path to input CSV, Parquet or Feather")
+    score.add_argument("--output", required=True, help="Path to output CSV")
+    score.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Stream the input in chunks of this many rows to bound memory use",
+    )
+    score.add_argument(
+        "--lean",
+        action="store_true",
+        help="Build only model features and write input columns plus the risk columns",
+    )
+    score.add_argument(
+        "--flat-model",
+        action="store_true",
+        help="Predict with the exported flat-array model instead of loading scikit-learn",
+    )
+    score.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Rescore only new or changed deals, carrying other scores forward from the last run",
+    )
+    score.add_argument(
+        "--state-file",
+        default=None,
+        help="Incremental state file (default: data/processed/scoring_state/<tenant>.pkl)",
+    )
+    score.add_argument(
+        "--tenant", default=DEFAULT_TENANT, help="Tenant whose artifact bundle scores the deals"
+    )
+    score.add_argument(
+        "--model-version", default=None, help="Artifact bundle version (default: latest)"
+    )
+    score.add_argument(
+        "--quantile-error",
+        type=float,
+        default=None,
+        help="When fitting on the input, approximate feature medians with sketches of this error",
+    )
+    score.add_argument(
+        "--drift-report",
+        default=None,
+        help="Compare scored features and predictions with the training data; write JSON here",
+    )
+    add_feature_store_arguments(score)
+    score.set_defaults(command_module="cli.score")
+
+    score_tenants = subparsers.add_parser(
+        "score-tenants", help="Score many tenant partitions in parallel"
+    )
+    score_tenants.add_argument(
+        "--input",
+        required=True,
+        nargs="+",
+        help="Tenant input files or directories; the file stem or directory name is the tenant id",
+    )
+    score_tenants.add_argument("--output-dir", required=True, help="Directory for scored outputs")
+    score_tenants.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPU count)"
+    )
+    score_tenants.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Stream each input in chunks of this many rows",
+    )
+    score_tenants.add_argument(
+        "--lean", action="store_true", help="Write input columns plus the risk columns only"
+    )
+    score_tenants.add_argument(
+        "--flat-model", action="store_true", help="Predict with the exported flat-array model"
+    )
+    score_tenants.add_argument(
+        "--model-version",
+        default=None,
+        help="Default bundle version for tenants without their own bundle (default: latest)",
+    )
+    score_tenants.add_argument(
+        "--drift",
+        action="store_true",
+        help="Write a <tenant>_drift.json report comparing each tenant with the training data",
+    )
+    score_tenants.set_defaults(command_module="cli.score_tenants")
+
+    ingest = subparsers.add_parser(
+        "ingest", help="Pull tenants' deals from the CRM into partitioned Parquet files"
+    )
+    ingest.add_argument("--base-url", required=True, help="CRM API base URL")
+    ingest.add_argument("--tenants", required=True, nargs="+", help="Tenant ids to sync")
+    ingest.add_argument(
+        "--output-dir",
+        default=None,
+        help="Directory for <tenant>/part-*.parquet (default: data/raw/crm)",
+    )
+    ingest.add_argument("--page-size", type=int, default=CRM_PAGE_SIZE, help="Deals per page")
+    ingest.add_argument(
+        "--connections",
+        type=int,
+        default=CRM_CONNECTIONS_PER_TENANT,
+        help="Concurrent requests per tenant",
+    )
+    ingest.add_argument(
+        "--tenant-concurrency",
+        type=int,
+        default=CRM_TENANT_CONCURRENCY,
+        help="Tenants synced at once",
+    )
+    ingest.add_argument(
+        "--max-attempts", type=int, default=5, help="Attempts per page before a tenant fails"
+    )
+    ingest.add_argument(
+        "--token-env",
+        default="SKYGENI_CRM_TOKEN",
+        help="Environment variable holding the CRM bearer token",
+    )
+    ingest.set_defaults(command_module="cli.ingest")
+
+    serve = subparsers.add_parser("serve", help="Serve the risk model over HTTP")
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    serve.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    serve.add_argument(
+        "--max-batch-size", type=int, default=64, help="Most requests scored in one batch"
+    )
+    serve.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=5.0,
+        help="How long to hold a batch open for more requests",
+    )
+    serve.add_argument(
+        "--bundle-cache-size",
+        type=int,
+        default=BUNDLE_CACHE_SIZE,
+        help="Tenant artifact bundles kept loaded for X-Tenant-ID requests",
+    )
+    add_feature_store_arguments(serve)
+    serve.set_defaults(command_module="cli.serve")
+
+    update_segments = subparsers.add_parser(
+        "update-segments", help="Fold newly closed deals into the segment win-rate tables"
+    )
+    update_segments.add_argument(
+        "--input", required=True, nargs="+", help="Newly closed deals (CSV, Parquet or Feather)"
+    )
+    update_segments.add_argument(
+        "--tenant", default=DEFAULT_TENANT, help="Tenant whose latest artifact bundle is updated"
+    )
+    update_segments.set_defaults(command_module="cli.update_segments")
+
+    digest = subparsers.add_parser(
+        "digest", help="List each manager's riskiest open deals from scored output"
+    )
+    digest.add_argument("--input", required=True, help="Scored deals CSV from `skygeni score`")
+    digest.add_argument("--output", required=True, help="Path to digest CSV")
+    digest.add_argument(
+        "--by", default="sales_rep_id", help="Column to group deals by (e.g. region)"
+    )
+    digest.add_argument("--top", type=int, default=10, help="Deals per group")
+    digest.set_defaults(command_module="cli.digest")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Parse arguments and run the selected subcommand.
+
+    Args:
+        argv: Arguments without the program name; defaults to sys.argv[1:].
+    """
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    command = importlib.import_module(args.command_module)
+    if not (args.metrics_json or args.metrics_prom):
+        command.run(args)
+        return
+
+    from pathlib import Path
+
+    from utils.instrumentation import disable_instrumentation, enable_instrumentation, stage
+
+    enable_instrumentation(
+        json_log_path=Path(args.metrics_json) if args.metrics_json else None,
+        prometheus_path=Path(args.metrics_prom) if args.metrics_prom else None,
+        memory=args.metrics_memory,
+    )
+    try:
+        with stage(f"cli.{args.command}"):
+            command.run(args)
+    finally:
+        disable_instrumentation()
+
+
+if __name__ == "__main__":
+    main()
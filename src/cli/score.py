@@ -0,0 +1,249 @@
+"""
+Score deals with the trained risk model.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from config import (
+    BUNDLES_DIR,
+    DATA_CACHE_DIR,
+    DEFAULT_TENANT,
+    DRIFT_REFERENCE_FILENAME,
+    FEATURE_STATS_FILENAME,
+    FLAT_MODEL_FILENAME,
+    MODEL_FILENAME,
+    MODELS_DIR,
+    SCORING_STATE_DIR,
+    SEGMENT_PROBS_FILENAME,
+)
+from data.data_loader import load_sales_data, read_source_columns
+from features.feature_store import FeatureStore, open_feature_store
+from features.feature_transformer import RiskFeatureTransformer
+from models.artifact_bundle import load_bundle, resolve_bundle_path
+from models.flat_ensemble import FlatTreeEnsemble
+from pipeline.drift_monitor import FeatureHistograms, drift_report
+from pipeline.incremental import ScoringStateStore, score_incrementally
+from pipeline.scoring import prepare_scoring_frame, score_csv_in_chunks, score_frame
+from utils.instrumentation import stage
+
+
+def load_transformer() -> RiskFeatureTransformer:
+    """
+    Load the saved feature transformer, or an unfitted one if artifacts are missing.
+
+    Returns:
+        RiskFeatureTransformer; fitted unless training artifacts are absent.
+    """
+    segment_path = MODELS_DIR / SEGMENT_PROBS_FILENAME
+    if segment_path.exists() and (MODELS_DIR / FEATURE_STATS_FILENAME).exists():
+        return RiskFeatureTransformer.load(MODELS_DIR)
+    if segment_path.exists():
+        print("[WARN] Feature statistics not found; computing from input data")
+        with segment_path.open("r", encoding="utf-8") as handle:
+            return RiskFeatureTransformer(json.load(handle))
+    print("[WARN] Segment probabilities not found; computing from input data")
+    return RiskFeatureTransformer()
+
+
+def load_model(flat_model: bool = False) -> Any:
+    """
+    Load the trained risk model.
+
+    Args:
+        flat_model: Load the flat-array export instead of the pickled estimator.
+
+    Returns:
+        Model with a predict_proba method.
+
+    Raises:
+        FileNotFoundError: If the model artifact does not exist.
+    """
+    model_path = MODELS_DIR / (FLAT_MODEL_FILENAME if flat_model else MODEL_FILENAME)
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model not found at {model_path}. Run `skygeni train` first.")
+    if flat_model:
+        return FlatTreeEnsemble.load(model_path)
+    # joblib and the pickled estimator pull in scikit-learn; only pay for it here.
+    import joblib
+
+    return joblib.load(model_path)
+
+
+def load_artifacts(
+    flat_model: bool = False,
+    tenant: str = DEFAULT_TENANT,
+    version: Optional[str] = None,
+    drift: bool = False,
+) -> Tuple[Any, RiskFeatureTransformer, Optional[FeatureHistograms]]:
+    """
+    Load the model and transformer, preferring a versioned artifact bundle.
+
+    Falls back to the loose files in MODELS_DIR when the default tenant has
+    no bundle and no specific version was asked for. The drift reference
+    always comes from the same place as the model, so a report compares
+    scores with the holdout of the model that produced them.
+
+    Args:
+        flat_model: Score with the bundle's flat-array export when it has one.
+        tenant: Tenant whose bundle to load.
+        version: Bundle version; the tenant's latest when omitted.
+        drift: Also load the drift reference histograms.
+
+    Returns:
+        Tuple of (model with predict_proba, feature transformer, drift
+        reference or None when drift is False).
+
+    Raises:
+        FileNotFoundError: If a requested tenant or version has no bundle,
+            or drift is set and the loaded artifacts have no drift reference.
+    """
+    try:
+        bundle_dir = resolve_bundle_path(BUNDLES_DIR, tenant, version)
+    except FileNotFoundError:
+        if tenant != DEFAULT_TENANT or version is not None:
+            raise
+        reference = load_drift_reference() if drift else None
+        return load_model(flat_model), load_transformer(), reference
+    bundle = load_bundle(bundle_dir)
+    print(f"[OK] Loaded artifact bundle {bundle.tenant}/{bundle.version}")
+    if drift and bundle.drift_reference is None:
+        raise FileNotFoundError(
+            f"Artifact bundle {bundle_dir} has no drift reference. Retrain to add one."
+        )
+    reference = bundle.drift_reference if drift else None
+    if flat_model and bundle.flat_model is not None:
+        return bundle.flat_model, bundle.transformer, reference
+    return bundle.model, bundle.transformer, reference
+
+
+def _report_feature_store(feature_store: Optional[FeatureStore]) -> None:
+    if feature_store is not None:
+        stats = feature_store.stats()
+        print(
+            f"[OK] Feature store: {stats['hits']:,} hits, {stats['misses']:,} misses, "
+            f"{stats['entries']:,} entries"
+        )
+
+
+def load_drift_reference() -> FeatureHistograms:
+    """
+    Load the reference histograms training saved next to the loose model files.
+
+    Returns:
+        FeatureHistograms of the training holdout.
+
+    Raises:
+        FileNotFoundError: If training has not saved a drift reference.
+    """
+    reference_path = MODELS_DIR / DRIFT_REFERENCE_FILENAME
+    if not reference_path.exists():
+        raise FileNotFoundError(
+            f"Drift reference not found at {reference_path}. Run `skygeni train` first."
+        )
+    return FeatureHistograms.load(reference_path)
+
+
+def _format_score(score: Optional[float]) -> str:
+    return "n/a" if score is None else f"{score:.3f}"
+
+
+def write_drift_report(
+    reference: FeatureHistograms, current: FeatureHistograms, report_path: Path
+) -> None:
+    """Compare scored deals with the reference, save the report and print its summary."""
+    report = drift_report(reference, current)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2, allow_nan=False), encoding="utf-8")
+    drifted = [
+        column for column, result in report["features"].items() if result["status"] != "stable"
+    ]
+    print(
+        f"[{'OK' if report['alert_status'] == 'healthy' else 'WARN'}] Drift "
+        f"{report['alert_status']}: feature PSI {_format_score(report['feature_drift_score'])}, "
+        f"prediction PSI {_format_score(report['prediction_drift_score'])}"
+        + (f" (shifted: {', '.join(drifted)})" if drifted else "")
+    )
+    print(f"[OK] Drift report saved to: {report_path}")
+
+
+def run(args: argparse.Namespace) -> None:
+    """Load model and score deals."""
+    input_path = Path(args.input)
+    output_path = Path(args.output)
+    model, transformer, reference = load_artifacts(
+        args.flat_model, args.tenant, args.model_version, drift=bool(args.drift_report)
+    )
+    if not transformer.is_fitted:
+        transformer.quantile_error = args.quantile_error
+    if args.incremental and args.chunk_size:
+        raise ValueError("--incremental cannot be combined with --chunk-size")
+    if args.incremental and args.drift_report:
+        raise ValueError("--drift-report needs every deal scored; drop --incremental")
+    if args.incremental and not transformer.is_fitted:
+        raise FileNotFoundError(
+            "Incremental scoring needs training artifacts. Run `skygeni train` first."
+        )
+    feature_store = None
+    if args.feature_store:
+        if not (args.lean or args.incremental):
+            raise ValueError("--feature-store caches model features only; add --lean")
+        feature_store = open_feature_store(
+            args.feature_store, args.feature_store_size, args.feature_ttl
+        )
+    drift = reference.empty_copy() if reference is not None else None
+
+    if args.chunk_size:
+        rows = score_csv_in_chunks(
+            input_path,
+            output_path,
+            model,
+            transformer,
+            chunk_size=args.chunk_size,
+            lean=args.lean,
+            feature_store=feature_store,
+            drift=drift,
+        )
+        _report_feature_store(feature_store)
+        print(f"[OK] {rows:,} deals scored in chunks of {args.chunk_size:,}")
+        print(f"[OK] Risk scores saved to: {output_path}")
+        if drift is not None:
+            write_drift_report(reference, drift, Path(args.drift_report))
+        return
+
+    df = load_sales_data(
+        input_path, columns=read_source_columns(input_path), cache_dir=DATA_CACHE_DIR
+    )
+    if args.incremental:
+        state_path = Path(args.state_file or SCORING_STATE_DIR / f"{args.tenant}.pkl")
+        scored, stats = score_incrementally(
+            df, model, transformer, ScoringStateStore(state_path), feature_store=feature_store
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with stage("scoring.to_csv", rows=len(scored)):
+            scored.to_csv(output_path, index=False)
+        reason = f" ({stats.full_rescore_reason})" if stats.full_rescore_reason else ""
+        print(
+            f"[OK] {stats.rescored:,} of {stats.total_deals:,} deals rescored{reason}; "
+            f"{stats.carried_forward:,} carried forward"
+        )
+        _report_feature_store(feature_store)
+        print(f"[OK] Risk scores saved to: {output_path}")
+        return
+
+    df = prepare_scoring_frame(df)
+    if not transformer.is_fitted:
+        transformer.fit(df)
+    df_features = score_frame(
+        df, model, transformer, lean=args.lean, feature_store=feature_store, drift=drift
+    )
+    _report_feature_store(feature_store)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with stage("scoring.to_csv", rows=len(df_features)):
+        df_features.to_csv(output_path, index=False)
+    print(f"[OK] Risk scores saved to: {output_path}")
+    if drift is not None:
+        write_drift_report(reference, drift, Path(args.drift_report))
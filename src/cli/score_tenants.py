@@ -0,0 +1,87 @@
+"""
+Score many tenant partitions in parallel.
+
+Each tenant is scored with its own latest artifact bundle when it has one;
+tenants without a bundle share the default artifacts.
+"""
+
+import argparse
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List
+
+from config import BUNDLES_DIR
+from cli.score import load_artifacts
+from models.artifact_bundle import resolve_bundle_path
+from pipeline.batch_orchestrator import TenantArtifacts, TenantJob, score_tenants
+
+RUN_SUMMARY_FILENAME = "run_summary.json"
+
+
+def has_bundle(tenant: str) -> bool:
+    """Return True if the tenant has its own artifact bundle."""
+    try:
+        resolve_bundle_path(BUNDLES_DIR, tenant)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def run(args: argparse.Namespace) -> None:
+    """Fan tenant inputs out across a process pool and report per-tenant results."""
+    output_dir = Path(args.output_dir)
+    jobs = [
+        TenantJob(
+            Path(path).stem,
+            Path(path),
+            output_dir / f"{Path(path).stem}_risk_scores.csv",
+            output_dir / f"{Path(path).stem}_drift.json" if args.drift else None,
+        )
+        for path in args.input
+    ]
+
+    tenant_artifacts: Dict[str, TenantArtifacts] = {}
+    default_tenants: List[str] = []
+    for tenant in dict.fromkeys(job.tenant_id for job in jobs):
+        if has_bundle(tenant):
+            tenant_artifacts[tenant] = load_artifacts(
+                args.flat_model, tenant=tenant, drift=args.drift
+            )
+        else:
+            default_tenants.append(tenant)
+
+    model = transformer = drift_reference = None
+    if default_tenants:
+        model, transformer, drift_reference = load_artifacts(
+            args.flat_model, version=args.model_version, drift=args.drift
+        )
+        if not transformer.is_fitted:
+            raise FileNotFoundError("Training artifacts not found. Run `skygeni train` first.")
+        print(f"[OK] Tenants without a bundle use the default model: {', '.join(default_tenants)}")
+    results = score_tenants(
+        jobs,
+        model,
+        transformer,
+        max_workers=args.workers,
+        chunk_size=args.chunk_size,
+        lean=args.lean,
+        drift_reference=drift_reference,
+        tenant_artifacts=tenant_artifacts,
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = output_dir / RUN_SUMMARY_FILENAME
+    summary = [asdict(result) for result in results]
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    failed = [result for result in results if not result.succeeded]
+    for result in results:
+        if result.succeeded:
+            drift = f", drift {result.drift_status}" if result.drift_status else ""
+            print(f"[OK] {result.tenant_id}: {result.rows:,} deals in {result.seconds:.1f}s{drift}")
+        else:
+            print(f"[FAIL] {result.tenant_id}: {result.error}")
+    print(f"[OK] Run summary saved to: {summary_path}")
+    if failed:
+        raise SystemExit(f"{len(failed)} of {len(results)} tenants failed")
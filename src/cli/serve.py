@@ -0,0 +1,75 @@
+"""
+Serve the deal risk model over HTTP.
+"""
+
+import argparse
+from typing import Optional
+
+import joblib
+
+from config import BUNDLES_DIR, DEFAULT_TENANT, FLAT_MODEL_FILENAME, MODEL_FILENAME, MODELS_DIR
+from features.feature_store import FeatureStore, open_feature_store
+from features.feature_transformer import RiskFeatureTransformer
+from models.artifact_bundle import BundleCache
+from models.flat_ensemble import FlatTreeEnsemble
+from service.scoring_service import DealScorer, ScoringHTTPServer
+
+
+def load_default_scorer(
+    bundle_cache: BundleCache, feature_store: Optional[FeatureStore] = None
+) -> DealScorer:
+    """
+    Build the scorer for requests without a tenant header.
+
+    Uses the default tenant's latest bundle, falling back to the loose files
+    in MODELS_DIR written by older training runs.
+
+    Args:
+        bundle_cache: Cache to load the default bundle through.
+        feature_store: Optional store the scorer reads features through.
+
+    Returns:
+        DealScorer.
+
+    Raises:
+        FileNotFoundError: If neither a bundle nor the model file exists.
+    """
+    try:
+        return DealScorer.from_bundle(bundle_cache.get(DEFAULT_TENANT), feature_store)
+    except FileNotFoundError:
+        pass
+    model_path = MODELS_DIR / MODEL_FILENAME
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model not found at {model_path}. Run `skygeni train` first.")
+    flat_model_path = MODELS_DIR / FLAT_MODEL_FILENAME
+    flat_model = FlatTreeEnsemble.load(flat_model_path) if flat_model_path.exists() else None
+    return DealScorer(
+        joblib.load(model_path),
+        RiskFeatureTransformer.load(MODELS_DIR),
+        flat_model=flat_model,
+        feature_store=feature_store,
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    """Load artifacts once and serve until interrupted."""
+    bundle_cache = BundleCache(BUNDLES_DIR, max_size=args.bundle_cache_size)
+    feature_store = None
+    if args.feature_store:
+        feature_store = open_feature_store(
+            args.feature_store, args.feature_store_size, args.feature_ttl
+        )
+    server = ScoringHTTPServer(
+        (args.host, args.port),
+        load_default_scorer(bundle_cache, feature_store),
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        bundle_cache=bundle_cache,
+    )
+    print(f"[OK] Scoring service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,166 @@
+"""
+Train the deal risk scoring model.
+"""
+
+import argparse
+import functools
+import json
+from dataclasses import asdict
+
+import joblib
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from config import (
+    DATA_CACHE_DIR,
+    DRIFT_REFERENCE_FILENAME,
+    FEATURE_INPUT_COLUMNS,
+    FEATURE_STATS_FILENAME,
+    FLAT_MODEL_FILENAME,
+    MODEL_FEATURES,
+    MODEL_FILENAME,
+    MODEL_SELECTION_FILENAME,
+    RANDOM_STATE,
+    SALES_DATA_PATH,
+    MODELS_DIR,
+    ROLLING_WIN_RATES_FILENAME,
+    SEGMENT_COLUMNS,
+    SEGMENT_PROBS_FILENAME,
+)
+from data.data_loader import add_temporal_features, load_sales_data, prepare_target_variable
+from features.feature_transformer import RiskFeatureTransformer
+from features.rolling_win_rates import RollingSegmentWinRates
+from models.artifact_bundle import save_bundle
+from models.flat_ensemble import export_flat_model
+from models.model_evaluation import evaluate_classifier
+from models.risk_scorer import train_model
+from pipeline.drift_monitor import FeatureHistograms, monitored_columns
+
+
+def load_training_frame() -> pd.DataFrame:
+    """
+    Load historical deals with the target and temporal columns.
+
+    Returns:
+        DataFrame of FEATURE_INPUT_COLUMNS plus 'is_lost' and 'month'.
+    """
+    df = load_sales_data(
+        SALES_DATA_PATH,
+        columns=FEATURE_INPUT_COLUMNS + ["closed_date", "outcome"],
+        cache_dir=DATA_CACHE_DIR,
+    )
+    df = prepare_target_variable(df)
+    return add_temporal_features(df)
+
+
+def new_transformer(args: argparse.Namespace) -> RiskFeatureTransformer:
+    """
+    Build an unfitted transformer with the train command's feature options.
+
+    Args:
+        args: Parsed train arguments.
+
+    Returns:
+        RiskFeatureTransformer with quantile sketches and rolling win rate
+        tables configured as requested.
+    """
+    rolling_win_rates = None
+    if args.rolling_window or args.rolling_half_life:
+        rolling_win_rates = RollingSegmentWinRates(
+            window=args.rolling_window, half_life=args.rolling_half_life
+        )
+    return RiskFeatureTransformer(
+        quantile_error=args.quantile_error, rolling_win_rates=rolling_win_rates
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    """Train and save the risk model, optionally choosing its type by cross-validation."""
+    print("=" * 80)
+    print("TRAIN DEAL RISK SCORING MODEL")
+    print("=" * 80)
+
+    df = load_training_frame()
+
+    transformer = new_transformer(args)
+    df_features = transformer.fit_transform(df)
+
+    X = df_features[MODEL_FEATURES]
+    y = df_features["is_lost"]
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y
+    )
+
+    model_type = "gradient_boosting"
+    params = None
+    if args.tuned_config:
+        with open(args.tuned_config, "r", encoding="utf-8") as handle:
+            tuned = json.load(handle)
+        model_type, params = tuned["model_type"], tuned["params"]
+        print(f"[OK] Using tuned {model_type} config: {params}")
+    elif args.select_model:
+        # Imported here: the process pool and CV machinery are only needed for selection.
+        from models.model_selection import select_model
+
+        # Folds use the same feature options as the model that ships.
+        selection = select_model(
+            df.loc[X_train.index],
+            max_workers=args.workers,
+            transformer_factory=functools.partial(new_transformer, args),
+        )
+        model_type = selection.best_model_type
+        MODELS_DIR.mkdir(parents=True, exist_ok=True)
+        selection_path = MODELS_DIR / MODEL_SELECTION_FILENAME
+        selection_path.write_text(json.dumps(asdict(selection), indent=2), encoding="utf-8")
+        for name, metrics in selection.mean_metrics.items():
+            print(
+                f"[OK] CV {name} - ROC-AUC: {metrics['roc_auc']:.3f} "
+                f"(+/- {selection.std_metrics[name]['roc_auc']:.3f})"
+            )
+        print(f"[OK] Selected model: {model_type} (report: {selection_path})")
+
+    model = train_model(X_train, y_train, model_type=model_type, params=params)
+
+    y_proba = model.predict_proba(X_test)[:, 1]
+    y_pred = (y_proba >= 0.5).astype(int)
+    metrics = evaluate_classifier(y_test.values, y_pred, y_proba)
+    print(
+        "[OK] Holdout metrics - "
+        f"ROC-AUC: {metrics['roc_auc']:.3f}, "
+        f"Avg Precision: {metrics['avg_precision']:.3f}"
+    )
+
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    model_path = MODELS_DIR / MODEL_FILENAME
+    joblib.dump(model, model_path)
+    transformer.save(MODELS_DIR)
+    # Scoring compares new deals with the holdout, which the model never saw.
+    holdout_features = {column: X_test[column].to_numpy() for column in MODEL_FEATURES}
+    drift_reference = FeatureHistograms.fit(
+        monitored_columns(holdout_features, y_proba),
+        df_features.loc[X_test.index, SEGMENT_COLUMNS],
+        transformer.segment_encoder.vocabularies,
+    )
+    drift_reference.save(MODELS_DIR / DRIFT_REFERENCE_FILENAME)
+    flat_model_path = MODELS_DIR / FLAT_MODEL_FILENAME
+    if model_type in ("gradient_boosting", "random_forest"):
+        export_flat_model(model, MODEL_FEATURES).save(flat_model_path)
+    else:
+        flat_model_path.unlink(missing_ok=True)
+    bundle_path = save_bundle(
+        model,
+        transformer,
+        metadata={"model_type": model_type, "params": params or {}, "holdout_metrics": metrics},
+        drift_reference=drift_reference,
+    )
+
+    print(f"[OK] Model trained and saved: {model_path}")
+    if flat_model_path.exists():
+        print(f"[OK] Flat inference arrays saved: {flat_model_path}")
+    print(f"[OK] Segment probabilities saved: {MODELS_DIR / SEGMENT_PROBS_FILENAME}")
+    print(f"[OK] Feature statistics saved: {MODELS_DIR / FEATURE_STATS_FILENAME}")
+    if transformer.rolling_win_rates is not None:
+        print(f"[OK] Monthly segment win counts saved: {MODELS_DIR / ROLLING_WIN_RATES_FILENAME}")
+    print(f"[OK] Drift reference histograms saved: {MODELS_DIR / DRIFT_REFERENCE_FILENAME}")
+    print(f"[OK] Artifact bundle saved: {bundle_path} (version {bundle_path.name})")
@@ -0,0 +1,49 @@
+"""
+Tune risk model hyperparameters and save the tuned config.
+"""
+
+import argparse
+import json
+from dataclasses import asdict
+
+from sklearn.model_selection import train_test_split
+
+from config import MODEL_FEATURES, MODELS_DIR, RANDOM_STATE, TEST_SIZE, TUNED_CONFIG_FILENAME
+from cli.train import load_training_frame
+from features.feature_transformer import RiskFeatureTransformer
+from models.hyperparameter_search import successive_halving_search
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run successive halving on the training split and write the best config."""
+    df = load_training_frame()
+    # Same holdout as `skygeni train`, so tuning never sees its test rows.
+    df_train, _ = train_test_split(
+        df, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=df["is_lost"]
+    )
+    df_fit, df_valid = train_test_split(
+        df_train, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=df_train["is_lost"]
+    )
+    transformer = RiskFeatureTransformer().fit(df_fit)
+
+    result = successive_halving_search(
+        transformer.transform_matrix(df_fit, MODEL_FEATURES),
+        df_fit["is_lost"].to_numpy(),
+        transformer.transform_matrix(df_valid, MODEL_FEATURES),
+        df_valid["is_lost"].to_numpy(),
+        model_type=args.model_type,
+        n_candidates=args.candidates,
+        eta=args.eta,
+        time_budget_seconds=args.time_budget,
+    )
+
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    config_path = MODELS_DIR / TUNED_CONFIG_FILENAME
+    tuned = {"model_type": result.model_type, "params": result.best_params, **asdict(result)}
+    config_path.write_text(json.dumps(tuned, indent=2), encoding="utf-8")
+
+    print(f"[OK] {len(result.trials)} fits in {result.elapsed_seconds:.1f}s")
+    if result.budget_exhausted:
+        print("[WARN] Time budget exhausted before the final rung")
+    print(f"[OK] Best {result.metric}: {result.best_score:.3f} with {result.best_params}")
+    print(f"[OK] Tuned config saved to: {config_path}")
@@ -0,0 +1,81 @@
+"""
+Fold newly closed deals into the saved segment win-rate tables.
+
+Reads only the new deals; the saved won/total counts stand in for the full
+history. Several input partitions can be passed and are combined. The monthly
+win counts, when the model was trained with rolling win rates, gain buckets
+for the new deals' months.
+
+When the tenant has an artifact bundle (which scoring loads first), the
+updated tables are published as a new bundle version with the same model,
+and the default tenant's loose files in MODELS_DIR are rewritten as well.
+"""
+
+import argparse
+from pathlib import Path
+
+from config import (
+    BUNDLES_DIR,
+    DATA_CACHE_DIR,
+    DEFAULT_TENANT,
+    MODELS_DIR,
+    SEGMENT_COLUMNS,
+    SEGMENT_COUNTS_FILENAME,
+)
+from data.data_loader import add_temporal_features, load_sales_data
+from features.feature_transformer import RiskFeatureTransformer
+from features.segment_probabilities import calculate_segment_counts, merge_segment_counts
+from models.artifact_bundle import load_bundle, resolve_bundle_path, save_bundle
+
+
+def run(args: argparse.Namespace) -> None:
+    """Merge counts from new deals into the saved tables."""
+    tenant = args.tenant
+    try:
+        bundle = load_bundle(resolve_bundle_path(BUNDLES_DIR, tenant))
+    except FileNotFoundError:
+        if tenant != DEFAULT_TENANT:
+            raise
+        bundle = None
+    transformer = bundle.transformer if bundle else RiskFeatureTransformer.load(MODELS_DIR)
+    if transformer.segment_counts is None:
+        source = f"bundle {bundle.tenant}/{bundle.version}" if bundle else str(MODELS_DIR)
+        raise FileNotFoundError(
+            f"{SEGMENT_COUNTS_FILENAME} not found in {source}. Run `skygeni train` first."
+        )
+
+    rolling = transformer.rolling_win_rates
+    partition_counts = []
+    new_deals = 0
+    for input_path in args.input:
+        df = load_sales_data(
+            Path(input_path),
+            parse_dates=rolling is not None,
+            columns=SEGMENT_COLUMNS + ["outcome"] + (["created_date"] if rolling else []),
+            cache_dir=DATA_CACHE_DIR,
+        )
+        partition_counts.append(calculate_segment_counts(df, SEGMENT_COLUMNS))
+        if rolling is not None:
+            rolling.update(add_temporal_features(df, copy=False))
+        new_deals += len(df)
+
+    new_counts = merge_segment_counts(partition_counts, SEGMENT_COLUMNS)
+    transformer.update_segment_counts(new_counts)
+    if tenant == DEFAULT_TENANT:
+        transformer.save(MODELS_DIR)
+
+    print(f"[OK] {new_deals:,} new deals folded into segment tables")
+    print(f"[OK] Overall win rate: {transformer.overall_win_rate * 100:.1f}%")
+    if rolling is not None:
+        print(f"[OK] Monthly segment win counts through {rolling.end}")
+    if bundle is not None:
+        bundle_path = save_bundle(
+            bundle.model,
+            transformer,
+            root=BUNDLES_DIR,
+            tenant=bundle.tenant,
+            feature_columns=bundle.feature_columns,
+            metadata={**bundle.manifest.get("metadata", {}), "updated_from": bundle.version},
+            drift_reference=bundle.drift_reference,
+        )
+        print(f"[OK] Artifact bundle saved: {bundle_path} (version {bundle_path.name})")
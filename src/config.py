@@ -9,10 +9,51 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
+DATA_CACHE_DIR = PROCESSED_DATA_DIR / "cache"
+SCORING_STATE_DIR = PROCESSED_DATA_DIR / "scoring_state"
 MODELS_DIR = PROJECT_ROOT / "models"
 OUTPUTS_DIR = PROJECT_ROOT / "outputs"
 
 SALES_DATA_PATH = RAW_DATA_DIR / "skygeni_sales_data.csv"
+DATE_FORMAT = "%Y-%m-%d"
+
+MODEL_FILENAME = "risk_scoring_model.pkl"
+FLAT_MODEL_FILENAME = "risk_scoring_model_flat.npz"
+SEGMENT_PROBS_FILENAME = "segment_probabilities.json"
+SEGMENT_COUNTS_FILENAME = "segment_counts.json"
+SEGMENT_CODES_FILENAME = "segment_codes.json"
+FEATURE_STATS_FILENAME = "feature_statistics.json"
+MODEL_SELECTION_FILENAME = "model_selection.json"
+TUNED_CONFIG_FILENAME = "tuned_model_config.json"
+ROLLING_WIN_RATES_FILENAME = "rolling_win_rates.json"
+DRIFT_REFERENCE_FILENAME = "drift_reference.json"
+
+# Versioned artifact bundles: BUNDLES_DIR/<tenant>/<version>/.
+BUNDLES_DIR = MODELS_DIR / "bundles"
+DEFAULT_TENANT = "default"
+BUNDLE_CACHE_SIZE = 8
+
+# Per-deal feature cache (system design: recalculated daily).
+FEATURE_STORE_TTL_SECONDS = 24 * 60 * 60
+FEATURE_STORE_MAX_ENTRIES = 1_000_000
+
+# Nightly CRM sync: tenant exports land in CRM_EXPORT_DIR/<tenant>/part-*.parquet.
+CRM_EXPORT_DIR = RAW_DATA_DIR / "crm"
+CRM_PAGE_SIZE = 1000
+CRM_CONNECTIONS_PER_TENANT = 8
+CRM_TENANT_CONCURRENCY = 4
+CRM_ROW_GROUP_SIZE = 100_000
+CRM_ROW_GROUPS_PER_FILE = 10
+
+# Trailing window of rolling segment win rates, in periods of the bucketing column.
+ROLLING_WIN_RATE_WINDOW = 12
+
+# Drift monitoring: reference histograms come from the training holdout.
+DRIFT_BINS = 10
+DRIFT_PSI_WARNING = 0.1
+DRIFT_PSI_ALERT = 0.25
+# Segment values with fewer scored deals are left out of the per-segment report.
+DRIFT_MIN_SEGMENT_DEALS = 200
 
 RANDOM_STATE = 42
 TEST_SIZE = 0.2
@@ -55,8 +96,28 @@ MODEL_CONFIGS = {
     },
 }
 
+# Hyperparameter values searched by successive halving. The tree count is
+# the halving resource, so n_estimators is given as a maximum only.
+TUNING_SEARCH_SPACES = {
+    "gradient_boosting": {
+        "max_depth": [2, 3, 4, 5, 6],
+        "learning_rate": [0.02, 0.05, 0.1, 0.2],
+        "subsample": [0.7, 0.85, 1.0],
+        "min_samples_leaf": [1, 10, 50],
+    },
+    "random_forest": {
+        "max_depth": [6, 10, 14, None],
+        "min_samples_leaf": [1, 5, 20],
+        "max_features": ["sqrt", 0.5, 1.0],
+    },
+}
+TUNING_MAX_ESTIMATORS = 400
+
 SEGMENT_COLUMNS = ["industry", "product_type", "lead_source", "region"]
 
+# Raw columns read by feature engineering.
+FEATURE_INPUT_COLUMNS = SEGMENT_COLUMNS + ["created_date", "deal_amount", "sales_cycle_days"]
+
 MODEL_FEATURES = [
     "win_prob_industry",
     "win_prob_product_type",
@@ -0,0 +1,337 @@
+"""
+Asynchronous client for paginated CRM deal exports.
+
+The CRM exposes each tenant's deals as numbered pages:
+
+    GET /v1/tenants/<tenant>/deals?page=<n>&page_size=<m>
+    -> {"page": n, "total_pages": t, "total_deals": d, "deals": [{...}, ...]}
+
+The first page reports how many pages there are, so the remaining pages are
+requested concurrently rather than one after another. Requests go through
+AsyncHTTPClient, a small HTTP/1.1 client on asyncio streams that keeps
+connections alive and reuses them; its connection limit is also the
+tenant's concurrency limit. Connection failures, timeouts, 429s and 5xx
+responses are retried with exponential backoff and full jitter.
+
+Only the standard library is used, so ingestion adds no dependencies.
+"""
+
+import asyncio
+import json
+import random
+import ssl
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+DEALS_PATH = "/v1/tenants/{tenant}/deals"
+_MAX_HEADER_LINES = 100
+
+
+class CRMError(RuntimeError):
+    """Raised when the CRM returns an error or an unreadable response."""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class HTTPResponse:
+    """Status, lower-cased headers and body of one response."""
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        """Decode the body as JSON."""
+        return json.loads(self.body)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    Attempt n (from 0) waits a random time up to
+    min(max_delay, base_delay * 2**n); a Retry-After header, when the server
+    sends one, sets a floor on the wait.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retrying after failed attempt number attempt."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncHTTPClient:
+    """
+    HTTP/1.1 client with a keep-alive connection pool for one host.
+
+    At most max_connections requests are in flight at once; idle
+    connections are kept and reused by later requests.
+
+    Attributes:
+        connections_opened: Connections opened so far.
+        requests_sent: Requests sent so far, including retries.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 8,
+        timeout: float = 30.0,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported CRM URL: {base_url}")
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.max_connections = max_connections
+        self.connections_opened = 0
+        self.requests_sent = 0
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: List[_Connection] = []
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    async def _connect(self) -> _Connection:
+        if self._idle:
+            return self._idle.pop()
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    def _request_bytes(self, path: str) -> bytes:
+        host = self.host if self.port in (80, 443) else f"{self.host}:{self.port}"
+        lines = [f"GET {self.base_path}{path} HTTP/1.1", f"Host: {host}"]
+        lines += [f"{name}: {value}" for name, value in self.headers.items()]
+        lines += ["Accept: application/json", "Connection: keep-alive", "", ""]
+        return "\r\n".join(lines).encode("latin-1")
+
+    async def _read_response(self, reader: asyncio.StreamReader) -> Tuple[HTTPResponse, bool]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before a response was received")
+        try:
+            version, status, _ = (status_line.decode("latin-1").rstrip("\r\n") + " ").split(" ", 2)
+            status_code = int(status)
+        except ValueError as exc:
+            raise CRMError(f"Malformed status line: {status_line!r}") from exc
+
+        headers: Dict[str, str] = {}
+        for _ in range(_MAX_HEADER_LINES):
+            line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise CRMError("Too many response headers")
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers up to the blank line.
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+            return HTTPResponse(status_code, headers, bytes(body)), keep_alive
+        if "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+            return HTTPResponse(status_code, headers, body), keep_alive
+        return HTTPResponse(status_code, headers, await reader.read()), False
+
+    async def _send(self, path: str) -> HTTPResponse:
+        connection = await self._connect()
+        try:
+            connection.writer.write(self._request_bytes(path))
+            await connection.writer.drain()
+            response, keep_alive = await self._read_response(connection.reader)
+        except BaseException:
+            connection.close()
+            raise
+        if keep_alive:
+            self._idle.append(connection)
+        else:
+            connection.close()
+        return response
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> HTTPResponse:
+        """
+        Send a GET request.
+
+        A pooled connection the server has since closed is replaced by a
+        fresh one once, without counting as a failure.
+
+        Args:
+            path: Path below the base URL.
+            params: Query parameters.
+
+        Returns:
+            HTTPResponse, whatever its status.
+
+        Raises:
+            OSError, asyncio.TimeoutError, asyncio.IncompleteReadError: On
+                connection failures.
+        """
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        async with self._slots:
+            reusing = bool(self._idle)
+            self.requests_sent += 1
+            try:
+                return await asyncio.wait_for(self._send(path), self.timeout)
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+                if not reusing:
+                    raise
+                # The server dropped idle keep-alive connections; start afresh.
+                await self.close()
+            self.requests_sent += 1
+            return await asyncio.wait_for(self._send(path), self.timeout)
+
+
+async def get_json_with_retries(
+    client: AsyncHTTPClient,
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    retry: Optional[RetryPolicy] = None,
+) -> Any:
+    """
+    GET a JSON document, retrying transient failures.
+
+    Args:
+        client: HTTP client for the CRM host.
+        path: Path below the base URL.
+        params: Query parameters.
+        retry: Backoff policy (default: RetryPolicy()).
+
+    Returns:
+        Decoded JSON body of a 200 response.
+
+    Raises:
+        CRMError: On a non-retryable status, or once retries are exhausted.
+    """
+    retry = retry or RetryPolicy()
+    last_error = "no attempts made"
+    status = None
+    for attempt in range(retry.max_attempts):
+        retry_after = None
+        try:
+            response = await client.get(path, params)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+            last_error = f"{type(exc).__name__}: {exc}"
+        else:
+            if response.status == 200:
+                try:
+                    return response.json()
+                except ValueError as exc:
+                    raise CRMError(f"Invalid JSON from {path}: {exc}", 200) from exc
+            status = response.status
+            if status not in RETRYABLE_STATUSES:
+                raise CRMError(f"GET {path} returned HTTP {status}", status)
+            last_error = f"HTTP {status}"
+            try:
+                retry_after = float(response.headers["retry-after"])
+            except (KeyError, ValueError):
+                retry_after = None
+        if attempt + 1 < retry.max_attempts:
+            await asyncio.sleep(retry.delay(attempt, retry_after))
+    raise CRMError(f"GET {path} failed after {retry.max_attempts} attempts: {last_error}", status)
+
+
+async def iter_deal_pages(
+    client: AsyncHTTPClient,
+    tenant: str,
+    page_size: int = 1000,
+    retry: Optional[RetryPolicy] = None,
+) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Fetch every page of a tenant's deals.
+
+    Page 1 is fetched first for the page count; the other pages are then
+    requested concurrently, limited by the client's connection pool, and
+    yielded as they arrive, so their order is not guaranteed.
+
+    Args:
+        client: HTTP client for the CRM host.
+        tenant: Tenant whose deals to fetch.
+        page_size: Deals per page.
+        retry: Backoff policy for each page.
+
+    Yields:
+        Tuples of (page number, deal records).
+
+    Raises:
+        CRMError: If a page cannot be fetched.
+    """
+    path = DEALS_PATH.format(tenant=quote(tenant, safe=""))
+
+    async def fetch(page: int) -> Tuple[int, List[Dict[str, Any]], Dict[str, Any]]:
+        payload = await get_json_with_retries(
+            client, path, {"page": page, "page_size": page_size}, retry
+        )
+        if not isinstance(payload, dict) or not isinstance(payload.get("deals"), list):
+            raise CRMError(f"Page {page} of tenant {tenant} has no 'deals' list")
+        return page, payload["deals"], payload
+
+    _, deals, first = await fetch(1)
+    yield 1, deals
+    total_pages = int(first.get("total_pages", 1))
+    # Keep a few requests queued per connection; pages not yet consumed stay bounded.
+    window = 2 * client.max_connections
+    next_page = 2
+    pending: Set["asyncio.Future[Any]"] = set()
+    try:
+        while next_page <= total_pages or pending:
+            while next_page <= total_pages and len(pending) < window:
+                pending.add(asyncio.ensure_future(fetch(next_page)))
+                next_page += 1
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page, deals, _ = task.result()
+                yield page, deals
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,305 @@
+"""
+Nightly CRM sync: pull every tenant's deals into partitioned Parquet files.
+
+Each tenant gets its own AsyncHTTPClient, so its connection pool bounds how
+many of its pages are fetched at once, and at most tenant_concurrency
+tenants sync at the same time. Pages are validated as they arrive and
+buffered only until a row group is full, then written straight to
+Parquet; a tenant's files are written to a staging directory and swapped
+into ROOT/<tenant>/ only when its sync succeeds, so readers never see a
+partial export. load_sales_data reads a tenant directory (or the whole
+root) directly.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from config import (
+    CRM_CONNECTIONS_PER_TENANT,
+    CRM_PAGE_SIZE,
+    CRM_ROW_GROUP_SIZE,
+    CRM_ROW_GROUPS_PER_FILE,
+    CRM_TENANT_CONCURRENCY,
+    DATE_FORMAT,
+    FEATURE_INPUT_COLUMNS,
+)
+from data.crm_client import AsyncHTTPClient, RetryPolicy, iter_deal_pages
+from data.data_loader import REQUIRED_COLUMNS
+
+STRING_COLUMNS = [
+    column for column in REQUIRED_COLUMNS if column not in ("deal_amount", "sales_cycle_days")
+]
+PART_FILENAME = "part-{index:05d}.parquet"
+
+
+@dataclass
+class TenantIngestion:
+    """Outcome of syncing one tenant."""
+
+    tenant_id: str
+    succeeded: bool
+    rows: int = 0
+    rejected: int = 0
+    duplicates: int = 0
+    pages: int = 0
+    files: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _check_tenant_id(tenant_id: str) -> None:
+    if not tenant_id or tenant_id.startswith((".", "_")) or "/" in tenant_id or "\\" in tenant_id:
+        raise ValueError(f"Tenant id cannot be used as a directory name: {tenant_id!r}")
+
+
+def validate_deal_records(records: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, int]:
+    """
+    Keep the records feature engineering can use, in the ingestion schema.
+
+    A record is rejected when it has no deal_id, lacks a field in
+    FEATURE_INPUT_COLUMNS, has a non-numeric amount or a non-integer cycle
+    length, or a created_date not in DATE_FORMAT. Other fields may be empty
+    (open deals have no closed_date or outcome).
+
+    Args:
+        records: Deal objects from one CRM page.
+
+    Returns:
+        Tuple of (valid deals with REQUIRED_COLUMNS, number rejected). Text
+        columns are strings, deal_amount float64 and sales_cycle_days int64.
+    """
+    df = pd.DataFrame.from_records(records, columns=REQUIRED_COLUMNS)
+    amounts = pd.to_numeric(df["deal_amount"], errors="coerce")
+    cycles = pd.to_numeric(df["sales_cycle_days"], errors="coerce")
+    created = pd.to_datetime(df["created_date"], format=DATE_FORMAT, errors="coerce")
+    valid = (
+        df[["deal_id"] + FEATURE_INPUT_COLUMNS].notna().all(axis=1)
+        & amounts.notna()
+        & (cycles % 1 == 0)
+        & created.notna()
+    )
+    df = df[valid].reset_index(drop=True)
+    df["deal_amount"] = amounts[valid].to_numpy(dtype="float64")
+    df["sales_cycle_days"] = cycles[valid].to_numpy(dtype="int64")
+    for column in STRING_COLUMNS:
+        df[column] = df[column].astype("string")
+    return df, int((~valid).sum())
+
+
+class PartitionWriter:
+    """
+    Write deal frames to numbered Parquet files in one directory.
+
+    Frames are buffered until row_group_size rows are pending, then written
+    as one row group; a new file starts every rows_per_file rows
+    (default: CRM_ROW_GROUPS_PER_FILE row groups).
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        row_group_size: int = CRM_ROW_GROUP_SIZE,
+        rows_per_file: Optional[int] = None,
+    ) -> None:
+        import pyarrow as pa
+
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.rows_per_file = rows_per_file or CRM_ROW_GROUPS_PER_FILE * row_group_size
+        self.files = 0
+        self.rows = 0
+        types = {"deal_amount": pa.float64(), "sales_cycle_days": pa.int64()}
+        self._schema = pa.schema(
+            [(column, types.get(column, pa.string())) for column in REQUIRED_COLUMNS]
+        )
+        self._pending: List[pd.DataFrame] = []
+        self._pending_rows = 0
+        self._writer: Any = None
+        self._file_rows = 0
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Buffer a frame, writing row groups once enough rows are pending."""
+        if len(df):
+            self._pending.append(df)
+            self._pending_rows += len(df)
+        while self._pending_rows >= self.row_group_size:
+            self._flush(self.row_group_size)
+
+    def _flush(self, rows: int) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pending = pd.concat(self._pending, ignore_index=True)
+        batch, rest = pending.iloc[:rows], pending.iloc[rows:]
+        self._pending = [rest] if len(rest) else []
+        self._pending_rows = len(rest)
+
+        if self._writer is None:
+            path = self.directory / PART_FILENAME.format(index=self.files)
+            self._writer = pq.ParquetWriter(path, self._schema)
+            self.files += 1
+        table = pa.Table.from_pandas(batch, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+        self._file_rows += len(batch)
+        self.rows += len(batch)
+        if self._file_rows >= self.rows_per_file:
+            self._writer.close()
+            self._writer = None
+            self._file_rows = 0
+
+    def close(self) -> None:
+        """Write any pending rows and close the current file."""
+        if self._pending_rows:
+            self._flush(self._pending_rows)
+        self.abort()
+
+    def abort(self) -> None:
+        """Close the current file, dropping rows not yet written."""
+        self._pending = []
+        self._pending_rows = 0
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def _replace_directory(staging: Path, target: Path) -> None:
+    """Swap a finished staging directory into place of target."""
+    previous = None
+    if target.exists():
+        previous = target.with_name(f".previous-{target.name}-{os.getpid()}")
+        target.rename(previous)
+    staging.rename(target)
+    if previous is not None:
+        shutil.rmtree(previous)
+
+
+async def ingest_tenant(
+    base_url: str,
+    tenant_id: str,
+    output_root: Path,
+    page_size: int = CRM_PAGE_SIZE,
+    max_connections: int = CRM_CONNECTIONS_PER_TENANT,
+    retry: Optional[RetryPolicy] = None,
+    headers: Optional[Dict[str, str]] = None,
+    row_group_size: int = CRM_ROW_GROUP_SIZE,
+) -> TenantIngestion:
+    """
+    Sync one tenant's deals into output_root/<tenant_id>/.
+
+    Errors are captured in the result rather than raised, and the staging
+    directory is removed, so the tenant's previous export stays in place
+    and other tenants are unaffected. A deal_id seen on an earlier page
+    (pages can shift while the CRM is being edited) is written once and
+    counted in duplicates.
+
+    Args:
+        base_url: CRM API base URL.
+        tenant_id: Tenant to sync.
+        output_root: Directory holding one subdirectory per tenant.
+        page_size: Deals per page.
+        max_connections: Concurrent requests (and pooled connections) for this tenant.
+        retry: Backoff policy for each page.
+        headers: Extra request headers, for example Authorization.
+        row_group_size: Rows per Parquet row group.
+
+    Returns:
+        TenantIngestion with row, page, duplicate and file counts, or the
+        error message.
+    """
+    start = time.perf_counter()
+    result = TenantIngestion(tenant_id, succeeded=False)
+    staging: Optional[Path] = None
+    writer = None
+    seen_ids: Set[str] = set()
+
+    def store(records: List[Dict[str, Any]]) -> Tuple[int, int]:
+        deals, rejected = validate_deal_records(records)
+        repeated = deals["deal_id"].isin(seen_ids) | deals["deal_id"].duplicated()
+        seen_ids.update(deals["deal_id"])
+        writer.write(deals[~repeated])
+        return rejected, int(repeated.sum())
+
+    try:
+        _check_tenant_id(tenant_id)
+        output_root.mkdir(parents=True, exist_ok=True)
+        # A fresh directory per call: concurrent syncs of the same tenant never
+        # share (or delete) each other's staging files.
+        staging = Path(tempfile.mkdtemp(prefix=f".staging-{tenant_id}-", dir=output_root))
+        writer = PartitionWriter(staging, row_group_size)
+        async with AsyncHTTPClient(base_url, max_connections, headers=headers) as client:
+            async for _, records in iter_deal_pages(client, tenant_id, page_size, retry):
+                # Parsing and Parquet encoding run off the event loop, so other
+                # tenants' responses keep being read meanwhile.
+                rejected, duplicates = await asyncio.to_thread(store, records)
+                result.rejected += rejected
+                result.duplicates += duplicates
+                result.pages += 1
+        writer.close()
+        _replace_directory(staging, output_root / tenant_id)
+    except Exception as error:  # noqa: BLE001 - isolate tenant failures
+        if writer is not None:
+            writer.abort()
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+        result.error = f"{type(error).__name__}: {error}"
+        result.seconds = time.perf_counter() - start
+        return result
+    result.succeeded = True
+    result.rows = writer.rows
+    result.files = writer.files
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+async def ingest_tenants_async(
+    base_url: str,
+    tenant_ids: List[str],
+    output_root: Path,
+    tenant_concurrency: int = CRM_TENANT_CONCURRENCY,
+    **tenant_options: Any,
+) -> List[TenantIngestion]:
+    """
+    Sync several tenants, at most tenant_concurrency at a time.
+
+    Args:
+        base_url: CRM API base URL.
+        tenant_ids: Tenants to sync.
+        output_root: Directory holding one subdirectory per tenant.
+        tenant_concurrency: Tenants synced at once.
+        **tenant_options: Passed to ingest_tenant.
+
+    Returns:
+        One TenantIngestion per tenant, in input order.
+    """
+    output_root.mkdir(parents=True, exist_ok=True)
+    slots = asyncio.Semaphore(tenant_concurrency)
+
+    async def run(tenant_id: str) -> TenantIngestion:
+        async with slots:
+            return await ingest_tenant(base_url, tenant_id, output_root, **tenant_options)
+
+    return list(await asyncio.gather(*(run(tenant_id) for tenant_id in tenant_ids)))
+
+
+def ingest_tenants(
+    base_url: str,
+    tenant_ids: List[str],
+    output_root: Path,
+    tenant_concurrency: int = CRM_TENANT_CONCURRENCY,
+    **tenant_options: Any,
+) -> List[TenantIngestion]:
+    """Blocking wrapper around ingest_tenants_async for scripts and the CLI."""
+    return asyncio.run(
+        ingest_tenants_async(
+            base_url, tenant_ids, output_root, tenant_concurrency, **tenant_options
+        )
+    )
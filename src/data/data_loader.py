@@ -2,19 +2,195 @@
 Data loading utilities for SkyGeni Sales Intelligence.
 """
 
+import hashlib
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional
 
 import pandas as pd
 
+from config import DATE_FORMAT
+from utils.instrumentation import instrumented
 
-def load_sales_data(filepath: Path, parse_dates: bool = True) -> pd.DataFrame:
+REQUIRED_COLUMNS: List[str] = [
+    "deal_id",
+    "created_date",
+    "closed_date",
+    "sales_rep_id",
+    "industry",
+    "region",
+    "product_type",
+    "lead_source",
+    "deal_stage",
+    "deal_amount",
+    "sales_cycle_days",
+    "outcome",
+]
+
+CATEGORICAL_COLUMNS: List[str] = ["industry", "region", "product_type", "lead_source", "deal_stage"]
+DATE_COLUMNS: List[str] = ["created_date", "closed_date"]
+NUMERIC_COLUMNS: List[str] = ["deal_amount", "sales_cycle_days"]
+
+CSV_SUFFIXES = {".csv"}
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+FEATHER_SUFFIXES = {".feather", ".arrow"}
+DATA_FILE_SUFFIXES = CSV_SUFFIXES | PARQUET_SUFFIXES | FEATHER_SUFFIXES
+
+# Bump when the parsed representation changes so stale cache entries are ignored.
+_CACHE_VERSION = 1
+
+
+def list_data_files(path: Path) -> List[Path]:
+    """
+    The data files behind a path: the file itself, or a directory's data files.
+
+    Directories are searched recursively, in sorted order, for CSV, Parquet
+    and Feather files; names starting with '.' or '_' (staging areas,
+    markers) are skipped at any depth.
+
+    Args:
+        path: Data file or directory of partition files.
+
+    Returns:
+        List of file paths.
+
+    Raises:
+        FileNotFoundError: If a directory holds no data files.
+    """
+    if not path.is_dir():
+        return [path]
+    files = sorted(
+        file
+        for file in path.rglob("*")
+        if file.is_file()
+        and file.suffix.lower() in DATA_FILE_SUFFIXES
+        and not any(part.startswith((".", "_")) for part in file.relative_to(path).parts)
+    )
+    if not files:
+        raise FileNotFoundError(f"No data files found in {path}")
+    return files
+
+
+def read_source_columns(filepath: Path) -> List[str]:
+    """
+    Read the column names of a CSV, Parquet or Feather file without loading data.
+
+    Args:
+        filepath: Path to the data file, or a directory of partition files
+            (whose first file is read).
+
+    Returns:
+        Column names in file order.
+    """
+    filepath = list_data_files(filepath)[0]
+    suffix = filepath.suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        return list(pd.read_csv(filepath, nrows=0).columns)
+    if suffix in PARQUET_SUFFIXES:
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(filepath).names)
+    if suffix in FEATHER_SUFFIXES:
+        import pyarrow.ipc as ipc
+
+        with ipc.open_file(filepath) as reader:
+            return list(reader.schema.names)
+    raise ValueError(f"Unsupported data file format: {filepath.suffix}")
+
+
+def parse_date_columns(df: pd.DataFrame, date_format: Optional[str] = DATE_FORMAT) -> pd.DataFrame:
+    """
+    Parse date columns in place with a fixed format.
+
+    Args:
+        df: DataFrame with optional 'created_date' / 'closed_date' columns.
+        date_format: strftime format of the dates; None infers the format.
+
+    Returns:
+        The same DataFrame with datetime columns.
+    """
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format=date_format, errors="coerce")
+    return df
+
+
+def apply_sales_schema(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Load sales data from CSV file.
+    Convert segment columns to categoricals and downcast integer columns in place.
 
     Args:
-        filepath: Path to CSV file.
+        df: Raw sales DataFrame.
+
+    Returns:
+        The same DataFrame with compact dtypes.
+    """
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns and pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+def _read_data_file(filepath: Path, columns: Optional[List[str]]) -> pd.DataFrame:
+    """Read a CSV, Parquet or Feather file, restricted to columns if given."""
+    suffix = filepath.suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        dtypes: Dict[str, str] = {column: "category" for column in CATEGORICAL_COLUMNS}
+        df = pd.read_csv(filepath, usecols=columns, dtype=dtypes)
+        return df if columns is None else df[columns]
+    if suffix in PARQUET_SUFFIXES:
+        return pd.read_parquet(filepath, columns=columns)
+    if suffix in FEATHER_SUFFIXES:
+        return pd.read_feather(filepath, columns=columns)
+    raise ValueError(f"Unsupported data file format: {filepath.suffix}")
+
+
+def _cache_path(
+    filepath: Path,
+    files: List[Path],
+    cache_dir: Path,
+    columns: Optional[List[str]],
+    parse_dates: bool,
+    date_format: Optional[str],
+) -> Path:
+    """Cache location keyed by source file contents and loader options."""
+    digest = hashlib.sha256()
+    for file in files:
+        if file != filepath:
+            digest.update(str(file.relative_to(filepath)).encode("utf-8"))
+        with file.open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+    options = f"{_CACHE_VERSION}|{columns}|{parse_dates}|{date_format}"
+    digest.update(options.encode("utf-8"))
+    return cache_dir / f"{filepath.stem}-{digest.hexdigest()[:32]}.pkl"
+
+
+@instrumented()
+def load_sales_data(
+    filepath: Path,
+    parse_dates: bool = True,
+    columns: Optional[List[str]] = None,
+    date_format: Optional[str] = DATE_FORMAT,
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Load sales data from a CSV, Parquet or Feather file, or a directory of them.
+
+    Segment columns are read as categoricals and integer columns are
+    downcast. A directory, such as a tenant partition written by CRM
+    ingestion, is read as the concatenation of its data files (see
+    list_data_files). When cache_dir is given, the parsed frame is cached
+    there, keyed by a hash of the source files, and reused on later calls.
+
+    Args:
+        filepath: Path to the data file or directory.
         parse_dates: Whether to parse date columns.
+        columns: Columns to read; all columns when omitted.
+        date_format: strftime format of the date columns; None infers it.
+        cache_dir: Directory for the parsed-data cache; disabled when omitted.
 
     Returns:
         DataFrame with sales data.
@@ -23,63 +199,130 @@ def load_sales_data(filepath: Path, parse_dates: bool = True) -> pd.DataFrame:
         FileNotFoundError: If file does not exist.
         ValueError: If required columns are missing.
     """
-    required_columns: List[str] = [
-        "deal_id",
-        "created_date",
-        "closed_date",
-        "sales_rep_id",
-        "industry",
-        "region",
-        "product_type",
-        "lead_source",
-        "deal_stage",
-        "deal_amount",
-        "sales_cycle_days",
-        "outcome",
-    ]
-
     if not filepath.exists():
         raise FileNotFoundError(f"Data file not found: {filepath}")
 
-    df = pd.read_csv(filepath)
-    missing_cols = set(required_columns) - set(df.columns)
-    if missing_cols:
-        missing_list = ", ".join(sorted(missing_cols))
-        raise ValueError(f"Missing required columns: {missing_list}")
+    files = list_data_files(filepath)
+    required_columns = REQUIRED_COLUMNS if columns is None else columns
+    for file in files:
+        missing_cols = set(required_columns) - set(read_source_columns(file))
+        if missing_cols:
+            missing_list = ", ".join(sorted(missing_cols))
+            location = "" if file == filepath else f" in {file}"
+            raise ValueError(f"Missing required columns{location}: {missing_list}")
 
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = _cache_path(filepath, files, cache_dir, columns, parse_dates, date_format)
+        if cache_path.exists():
+            return pd.read_pickle(cache_path)
+
+    if len(files) == 1:
+        df = _read_data_file(files[0], columns)
+    else:
+        df = pd.concat([_read_data_file(file, columns) for file in files], ignore_index=True)
+    df = apply_sales_schema(df)
     if parse_dates:
-        df["created_date"] = pd.to_datetime(df["created_date"], errors="coerce")
-        df["closed_date"] = pd.to_datetime(df["closed_date"], errors="coerce")
+        parse_date_columns(df, date_format)
 
+    if cache_path is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        df.to_pickle(cache_path)
     return df
 
 
-def prepare_target_variable(df: pd.DataFrame) -> pd.DataFrame:
+def parquet_row_group_count(filepath: Path) -> int:
+    """Number of row groups in a Parquet file."""
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(filepath).num_row_groups
+
+
+def iter_sales_data_chunks(
+    filepath: Path,
+    chunk_size: int,
+    columns: Optional[List[str]] = None,
+    parse_dates: bool = True,
+    date_format: Optional[str] = DATE_FORMAT,
+    row_groups: Optional[List[int]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV, Parquet or Feather sales file in chunks, with the load_sales_data schema.
+
+    Args:
+        filepath: Path to the data file.
+        chunk_size: Rows per chunk (at most).
+        columns: Columns to read; all columns when omitted.
+        parse_dates: Whether to parse date columns.
+        date_format: strftime format of the date columns; None infers it.
+        row_groups: Parquet row groups to read; all when omitted.
+
+    Yields:
+        DataFrame chunks with categorical segments and parsed dates.
+
+    Raises:
+        ValueError: If chunk_size is not positive or the format is unsupported.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer")
+    suffix = filepath.suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        dtypes = {column: "category" for column in CATEGORICAL_COLUMNS}
+        chunks: Iterable[pd.DataFrame] = pd.read_csv(
+            filepath, usecols=columns, dtype=dtypes, chunksize=chunk_size
+        )
+    elif suffix in PARQUET_SUFFIXES:
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(filepath).iter_batches(
+            batch_size=chunk_size, row_groups=row_groups, columns=columns
+        )
+        chunks = (batch.to_pandas() for batch in batches)
+    elif suffix in FEATHER_SUFFIXES:
+        import pyarrow.feather as feather
+
+        # Memory-mapped, so uncompressed files are paged in one batch at a time.
+        table = feather.read_table(filepath, columns=columns, memory_map=True)
+        chunks = (batch.to_pandas() for batch in table.to_batches(max_chunksize=chunk_size))
+    else:
+        raise ValueError(f"Unsupported data file format: {filepath.suffix}")
+    for chunk in chunks:
+        chunk = apply_sales_schema(chunk)
+        if parse_dates:
+            parse_date_columns(chunk, date_format)
+        yield chunk
+
+
+@instrumented()
+def prepare_target_variable(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
     Create target variable for risk scoring (1 = Lost, 0 = Won).
 
     Args:
         df: DataFrame with 'outcome' column.
+        copy: Whether to work on a copy; False adds the column to df in place.
 
     Returns:
         DataFrame with 'is_lost' target variable.
     """
-    df_copy = df.copy()
+    df_copy = df.copy() if copy else df
     df_copy["is_lost"] = (df_copy["outcome"] == "Lost").astype(int)
     return df_copy
 
 
-def add_temporal_features(df: pd.DataFrame) -> pd.DataFrame:
+@instrumented()
+def add_temporal_features(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
     Add temporal features from date columns.
 
     Args:
         df: DataFrame with date columns.
+        copy: Whether to work on a copy; False adds the columns to df in place.
 
     Returns:
         DataFrame with additional temporal features.
     """
-    df_copy = df.copy()
+    df_copy = df.copy() if copy else df
     if "created_date" not in df_copy.columns:
         raise ValueError("created_date column is required to add temporal features")
     df_copy["created_quarter"] = df_copy["created_date"].dt.to_period("Q")
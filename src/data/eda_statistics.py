@@ -0,0 +1,336 @@
+"""
+One-pass, mergeable summary statistics for exploratory data analysis.
+
+EDAAccumulator reads deals chunk by chunk and keeps, per column, Welford
+running moments (count, mean, variance, min, max) and a KLL quantile sketch,
+plus per-segment won/total counts, the overall win count and the created
+date range. Accumulators built on different chunks or files merge into one,
+so a file larger than memory, or many partitions read by parallel workers,
+produce the same report as df.describe() on the whole dataset (quantiles
+are approximate once a column outgrows its sketch).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import SEGMENT_COLUMNS
+from data.data_loader import (
+    PARQUET_SUFFIXES,
+    add_temporal_features,
+    iter_sales_data_chunks,
+    list_data_files,
+    parquet_row_group_count,
+)
+from features.segment_probabilities import calculate_segment_counts, merge_segment_counts
+from utils.quantile_sketch import QuantileSketch
+
+DESCRIBE_QUANTILES = [0.25, 0.5, 0.75]
+EDA_CHUNK_SIZE = 100_000
+
+
+class RunningMoments:
+    """
+    Count, mean, sum of squared deviations, min and max of a stream.
+
+    Chunks are folded in with the parallel form of Welford's update (Chan et
+    al.), which is also how two accumulators merge.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _combine(self, count: int, mean: float, m2: float, low: float, high: float) -> None:
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def update(self, values: np.ndarray) -> "RunningMoments":
+        """Add a chunk of values; NaNs are ignored."""
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = float(values.mean())
+            m2 = float(((values - mean) ** 2).sum())
+            self._combine(len(values), mean, m2, float(values.min()), float(values.max()))
+        return self
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Fold another accumulator into this one."""
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), as DataFrame.describe reports."""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float("nan")
+
+
+def _column_values(series: pd.Series) -> np.ndarray:
+    """Float values of a numeric or datetime column; datetimes in seconds, NaN for missing."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        nanoseconds = series.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+        return np.where(series.isna().to_numpy(), np.nan, nanoseconds / 1e9)
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _described_columns(df: pd.DataFrame) -> List[str]:
+    """Columns DataFrame.describe() summarises by default: numbers and datetimes."""
+    return [
+        column
+        for column in df.columns
+        if not pd.api.types.is_bool_dtype(df[column])
+        and (
+            pd.api.types.is_numeric_dtype(df[column])
+            or pd.api.types.is_datetime64_any_dtype(df[column])
+        )
+    ]
+
+
+class EDAAccumulator:
+    """
+    Mergeable EDA statistics over chunks of deals.
+
+    Attributes:
+        rows: Deals accumulated.
+        won: Deals with outcome 'Won'.
+        has_outcome: Whether any chunk had an 'outcome' column.
+        moments: Column -> RunningMoments.
+        sketches: Column -> QuantileSketch.
+        datetime_columns: Described columns holding datetimes.
+        segment_counts: Segment column -> won/total table per value.
+    """
+
+    def __init__(
+        self,
+        segment_columns: Optional[List[str]] = None,
+        sketch_k: int = 200,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.segment_columns = list(segment_columns or SEGMENT_COLUMNS)
+        self.sketch_k = sketch_k
+        self.seed = seed
+        self.rows = 0
+        self.won = 0
+        self.has_outcome = False
+        self.moments: Dict[str, RunningMoments] = {}
+        self.sketches: Dict[str, QuantileSketch] = {}
+        self.datetime_columns: List[str] = []
+        self.segment_counts: Dict[str, pd.DataFrame] = {}
+
+    def _column(self, column: str) -> Tuple[RunningMoments, QuantileSketch]:
+        if column not in self.moments:
+            seed = None if self.seed is None else self.seed + len(self.moments)
+            self.moments[column] = RunningMoments()
+            self.sketches[column] = QuantileSketch(self.sketch_k, seed=seed)
+        return self.moments[column], self.sketches[column]
+
+    def update(self, df: pd.DataFrame) -> "EDAAccumulator":
+        """
+        Add one chunk of deals.
+
+        Args:
+            df: Deals, typically with temporal features already added.
+
+        Returns:
+            self.
+        """
+        for column in _described_columns(df):
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                if column not in self.datetime_columns:
+                    self.datetime_columns.append(column)
+            values = _column_values(df[column])
+            moments, sketch = self._column(column)
+            moments.update(values)
+            sketch.update(values)
+
+        if "outcome" in df.columns:
+            self.has_outcome = True
+            self.won += int((df["outcome"] == "Won").sum())
+            for segment in self.segment_columns:
+                if segment in df.columns:
+                    counts = calculate_segment_counts(df, [segment])
+                    previous = self.segment_counts.get(segment)
+                    tables = [counts] if previous is None else [previous, counts]
+                    self.segment_counts[segment] = merge_segment_counts(tables, [segment])
+        self.rows += len(df)
+        return self
+
+    def merge(self, other: "EDAAccumulator") -> "EDAAccumulator":
+        """Fold another accumulator into this one."""
+        for column, moments in other.moments.items():
+            own_moments, own_sketch = self._column(column)
+            own_moments.merge(moments)
+            own_sketch.merge(other.sketches[column])
+        for column in other.datetime_columns:
+            if column not in self.datetime_columns:
+                self.datetime_columns.append(column)
+        for segment, counts in other.segment_counts.items():
+            previous = self.segment_counts.get(segment)
+            tables = [counts] if previous is None else [previous, counts]
+            self.segment_counts[segment] = merge_segment_counts(tables, [segment])
+        self.rows += other.rows
+        self.won += other.won
+        self.has_outcome = self.has_outcome or other.has_outcome
+        return self
+
+    @property
+    def win_rate(self) -> float:
+        """Share of deals won; NaN without outcomes."""
+        if not self.has_outcome or self.rows == 0:
+            return float("nan")
+        return self.won / self.rows
+
+    @property
+    def date_range(self) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """First and last created_date."""
+        moments = self.moments.get("created_date")
+        if moments is None or moments.count == 0:
+            return None, None
+        return _timestamp(moments.min), _timestamp(moments.max)
+
+    def segment_win_rates(self) -> Dict[str, pd.Series]:
+        """Win rate per value of each segment column."""
+        return {
+            segment: (counts.set_index(segment)["won"] / counts.set_index(segment)["total"])
+            for segment, counts in self.segment_counts.items()
+        }
+
+    def describe(self) -> pd.DataFrame:
+        """
+        Summary table in the layout of DataFrame.describe().
+
+        Returns:
+            DataFrame with count, mean, std, min, quartiles and max per column;
+            datetime columns hold Timestamps and no std, and when present the
+            std row moves last, as pandas orders it.
+        """
+        summary = {}
+        for column, moments in self.moments.items():
+            quartiles = self.sketches[column].quantiles(DESCRIBE_QUANTILES)
+            if column in self.datetime_columns:
+                stats = {"count": moments.count}
+                stats.update(
+                    {
+                        "mean": _timestamp(moments.mean),
+                        "min": _timestamp(moments.min),
+                        **{
+                            _percent_label(q): _timestamp(value)
+                            for q, value in zip(DESCRIBE_QUANTILES, quartiles)
+                        },
+                        "max": _timestamp(moments.max),
+                        "std": np.nan,
+                    }
+                )
+            else:
+                stats = {"count": float(moments.count)}
+                stats.update(
+                    {
+                        "mean": moments.mean if moments.count else np.nan,
+                        "std": moments.std,
+                        "min": moments.min if moments.count else np.nan,
+                        **{
+                            _percent_label(q): value
+                            for q, value in zip(DESCRIBE_QUANTILES, quartiles)
+                        },
+                        "max": moments.max if moments.count else np.nan,
+                    }
+                )
+            summary[column] = stats
+        index = ["count", "mean", "std", "min"] + [_percent_label(q) for q in DESCRIBE_QUANTILES]
+        index.append("max")
+        if self.datetime_columns:
+            index.remove("std")
+            index.append("std")
+        return pd.DataFrame(summary, index=index)
+
+
+def _timestamp(seconds: float) -> Optional[pd.Timestamp]:
+    if np.isnan(seconds) or np.isinf(seconds):
+        return pd.NaT
+    return pd.Timestamp(seconds, unit="s").round("us")
+
+
+def _percent_label(q: float) -> str:
+    return f"{q * 100:g}%"
+
+
+def _summarize_part(
+    filepath: Path,
+    row_groups: Optional[List[int]],
+    chunk_size: int,
+    sketch_k: int,
+    seed: Optional[int],
+) -> EDAAccumulator:
+    """Accumulate statistics for one file or one slice of a Parquet file's row groups."""
+    accumulator = EDAAccumulator(sketch_k=sketch_k, seed=seed)
+    for chunk in iter_sales_data_chunks(filepath, chunk_size, row_groups=row_groups):
+        accumulator.update(add_temporal_features(chunk, copy=False))
+    return accumulator
+
+
+def _plan_parts(paths: Iterable[Path], workers: int) -> List[Tuple[Path, Optional[List[int]]]]:
+    """One part per file; a single Parquet file is split by row group across workers."""
+    paths = [file for path in paths for file in list_data_files(path)]
+    if len(paths) == 1 and paths[0].suffix.lower() in PARQUET_SUFFIXES and workers > 1:
+        groups = parquet_row_group_count(paths[0])
+        slices = np.array_split(np.arange(groups), min(workers, max(groups, 1)))
+        return [(paths[0], part.tolist()) for part in slices if len(part)]
+    return [(path, None) for path in paths]
+
+
+def summarize_sales_data(
+    paths: Iterable[Path],
+    chunk_size: int = EDA_CHUNK_SIZE,
+    workers: int = 1,
+    sketch_k: int = 200,
+    seed: Optional[int] = 0,
+) -> EDAAccumulator:
+    """
+    Summarise sales files in one streaming pass.
+
+    Each file (or, for a single Parquet file, each slice of its row groups)
+    is accumulated separately, in a worker process when workers > 1, and the
+    partial accumulators are merged in input order.
+
+    Args:
+        paths: CSV or Parquet files, or directories of them.
+        chunk_size: Rows read at a time.
+        workers: Worker processes; 1 reads everything in this process.
+        sketch_k: Quantile sketch size.
+        seed: Seed for the sketches' compaction coin flips.
+
+    Returns:
+        Merged EDAAccumulator.
+    """
+    parts = _plan_parts(paths, workers)
+    seeds = [None if seed is None else seed + 1000 * index for index in range(len(parts))]
+    if workers > 1 and len(parts) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as executor:
+            futures = [
+                executor.submit(_summarize_part, path, groups, chunk_size, sketch_k, part_seed)
+                for (path, groups), part_seed in zip(parts, seeds)
+            ]
+            partials = [future.result() for future in futures]
+    else:
+        partials = [
+            _summarize_part(path, groups, chunk_size, sketch_k, part_seed)
+            for (path, groups), part_seed in zip(parts, seeds)
+        ]
+
+    result = EDAAccumulator(sketch_k=sketch_k, seed=seed)
+    for partial in partials:
+        result.merge(partial)
+    return result
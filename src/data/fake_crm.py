@@ -0,0 +1,218 @@
+"""
+Local stand-in for the CRM deal export API, for tests and benchmarks.
+
+Serves synthetic deals (see data.synthetic_data) for a fixed set of tenants
+with the paging contract crm_client expects, over HTTP/1.1 keep-alive, from
+an asyncio server on a background thread. Latency, transient failures and
+connection recycling can be injected, and the server counts connections,
+requests and the peak number of concurrent requests per tenant so tests
+can check pooling and concurrency limits.
+
+Usage:
+    with FakeCRMServer({"acme": 100_000, "globex": 50_000}, latency=0.02) as crm:
+        ingest_tenants(crm.url, ["acme", "globex"], Path("data/raw/crm"))
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+
+from config import RANDOM_STATE
+from data.synthetic_data import generate_sales_data
+
+_DEALS_ROUTE = re.compile(r"^/v1/tenants/([^/]+)/deals$")
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    503: "Service Unavailable",
+}
+
+
+class FakeCRMServer:
+    """
+    Paginated deal export server on 127.0.0.1.
+
+    Args:
+        tenants: Tenant id -> number of deals to serve.
+        latency: Seconds each page request takes.
+        failure_rate: Share of requests answered with 503 and Retry-After: 0.
+        max_requests_per_connection: Close connections after this many requests.
+        token: Bearer token required in the Authorization header, if any.
+        max_page_size: Largest page_size honoured.
+        seed: Seed for the synthetic deals and the injected failures.
+        host: Interface to bind.
+        port: Port to bind; 0 picks a free one.
+
+    Attributes:
+        url: Base URL, once started.
+        connections: Connections accepted.
+        requests: Requests served, including injected failures.
+        failures: Requests answered with an injected 503.
+        max_concurrent: Tenant -> peak number of requests in flight.
+    """
+
+    def __init__(
+        self,
+        tenants: Dict[str, int],
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        max_requests_per_connection: Optional[int] = None,
+        token: Optional[str] = None,
+        max_page_size: int = 5000,
+        seed: int = RANDOM_STATE,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.deals = {
+            tenant: generate_sales_data(n_rows, seed=seed + index)
+            for index, (tenant, n_rows) in enumerate(tenants.items())
+        }
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.max_requests_per_connection = max_requests_per_connection
+        self.token = token
+        self.max_page_size = max_page_size
+        self.host = host
+        self.port = port
+        self.url: Optional[str] = None
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+        self.max_concurrent: Dict[str, int] = defaultdict(int)
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._rng = random.Random(seed)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "FakeCRMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> "FakeCRMServer":
+        """Start serving on a background thread."""
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def serve() -> None:
+            asyncio.set_event_loop(self._loop)
+            server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port)
+            )
+            self.port = server.sockets[0].getsockname()[1]
+            self.url = f"http://{self.host}:{self.port}"
+            started.set()
+            self._loop.run_forever()
+            server.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name="fake-crm", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and close open connections."""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+            self._thread = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        served = 0
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                served += 1
+                close = headers.get("connection", "").lower() == "close" or (
+                    self.max_requests_per_connection is not None
+                    and served >= self.max_requests_per_connection
+                )
+                target = request_line.decode("latin-1").split(" ")[1]
+                status, body, extra = await self._respond(target, headers)
+                lines = [
+                    f"HTTP/1.1 {status} {_REASONS[status]}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(body)}",
+                    f"Connection: {'close' if close else 'keep-alive'}",
+                ]
+                lines += [f"{name}: {value}" for name, value in extra.items()]
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, target: str, headers: Dict[str, str]) -> Tuple[int, bytes, dict]:
+        self.requests += 1
+        parts = urlsplit(target)
+        match = _DEALS_ROUTE.match(parts.path)
+        if match is None:
+            return 404, b'{"error": "not found"}', {}
+        if self.token is not None and headers.get("authorization") != f"Bearer {self.token}":
+            return 401, b'{"error": "unauthorized"}', {}
+        tenant = unquote(match.group(1))
+        if tenant not in self.deals:
+            return 404, b'{"error": "unknown tenant"}', {}
+        query = parse_qs(parts.query)
+        try:
+            page = int(query.get("page", ["1"])[0])
+            page_size = min(int(query.get("page_size", ["1000"])[0]), self.max_page_size)
+        except ValueError:
+            return 400, b'{"error": "page and page_size must be integers"}', {}
+        if page < 1 or page_size < 1:
+            return 400, b'{"error": "page and page_size must be positive"}', {}
+
+        self._in_flight[tenant] += 1
+        self.max_concurrent[tenant] = max(self.max_concurrent[tenant], self._in_flight[tenant])
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self._rng.random() < self.failure_rate:
+                self.failures += 1
+                return 503, b'{"error": "try again"}', {"Retry-After": "0"}
+            return 200, self._page_body(tenant, page, page_size), {}
+        finally:
+            self._in_flight[tenant] -= 1
+
+    def _page_body(self, tenant: str, page: int, page_size: int) -> bytes:
+        deals: pd.DataFrame = self.deals[tenant]
+        total_pages = max(1, -(-len(deals) // page_size))
+        records = deals.iloc[(page - 1) * page_size : page * page_size].to_json(orient="records")
+        header = json.dumps(
+            {
+                "page": page,
+                "page_size": page_size,
+                "total_pages": total_pages,
+                "total_deals": len(deals),
+            }
+        )
+        return f'{header[:-1]}, "deals": {records}}}'.encode("utf-8")
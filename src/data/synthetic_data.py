@@ -0,0 +1,141 @@
+"""
+Synthetic deal generator matching the load_sales_data schema.
+
+Distributions follow the historical sample: five industries, four regions,
+three product types and four lead sources with near-uniform volume; a
+log-normal deal amount (median ~14K, clipped to 2K-100K); uniform 7-120 day
+sales cycles; and a ~45% win rate with small per-segment offsets, so
+segment win-rate features carry the same weak signal as the real data.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import DATE_FORMAT, RANDOM_STATE
+from data.data_loader import REQUIRED_COLUMNS
+
+SEGMENT_VALUES: Dict[str, Dict[str, float]] = {
+    # Segment value -> log-odds offset of winning.
+    "industry": {
+        "FinTech": 0.09,
+        "SaaS": -0.01,
+        "Ecommerce": -0.02,
+        "HealthTech": -0.03,
+        "EdTech": -0.05,
+    },
+    "region": {"India": 0.02, "Europe": 0.02, "APAC": -0.01, "North America": -0.02},
+    "product_type": {"Core": 0.01, "Pro": 0.0, "Enterprise": -0.01},
+    "lead_source": {"Inbound": 0.03, "Referral": 0.01, "Outbound": 0.01, "Partner": -0.05},
+}
+DEAL_STAGES = ["Qualified", "Demo", "Proposal", "Negotiation", "Closed"]
+
+BASE_WIN_RATE = 0.453
+AMOUNT_MEDIAN = 14_000
+AMOUNT_LOG_SIGMA = 1.3
+AMOUNT_RANGE = (2_000, 100_000)
+CYCLE_RANGE = (7, 120)
+CREATED_START = pd.Timestamp("2023-01-01")
+CREATED_SPAN_DAYS = 450
+DEALS_PER_REP = 200
+
+
+def generate_sales_data(
+    n_rows: int, seed: int = RANDOM_STATE, start_id: int = 0, n_reps: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Generate synthetic deals with the raw sales data columns.
+
+    Args:
+        n_rows: Number of deals.
+        seed: Random seed.
+        start_id: Number of the first deal_id, so chunks can be concatenated.
+        n_reps: Distinct sales reps (default: one per DEALS_PER_REP deals, at least 25).
+
+    Returns:
+        DataFrame with REQUIRED_COLUMNS, dates formatted as DATE_FORMAT strings.
+    """
+    rng = np.random.default_rng(seed)
+    n_reps = n_reps or max(25, n_rows // DEALS_PER_REP)
+
+    columns = {}
+    win_logit = np.full(n_rows, np.log(BASE_WIN_RATE / (1 - BASE_WIN_RATE)))
+    for column, offsets in SEGMENT_VALUES.items():
+        codes = rng.integers(0, len(offsets), n_rows)
+        columns[column] = pd.Categorical.from_codes(codes, list(offsets))
+        win_logit += np.array(list(offsets.values()))[codes]
+
+    created_offset = rng.integers(0, CREATED_SPAN_DAYS, n_rows)
+    cycle = rng.integers(CYCLE_RANGE[0], CYCLE_RANGE[1] + 1, n_rows)
+    # Format each distinct day once and gather, instead of formatting every row.
+    days = CREATED_START + pd.to_timedelta(np.arange(CREATED_SPAN_DAYS + CYCLE_RANGE[1]), unit="D")
+    day_labels = np.asarray(days.strftime(DATE_FORMAT), dtype=object)
+
+    amount = np.exp(rng.normal(np.log(AMOUNT_MEDIAN), AMOUNT_LOG_SIGMA, n_rows))
+    won = rng.random(n_rows) < 1 / (1 + np.exp(-win_logit))
+
+    df = pd.DataFrame(
+        {
+            "deal_id": [f"D{number:08d}" for number in range(start_id, start_id + n_rows)],
+            "created_date": day_labels[created_offset],
+            "closed_date": day_labels[created_offset + cycle],
+            "sales_rep_id": pd.Categorical.from_codes(
+                rng.integers(0, n_reps, n_rows),
+                [f"rep_{number}" for number in range(1, n_reps + 1)],
+            ),
+            **columns,
+            "deal_stage": pd.Categorical.from_codes(
+                rng.integers(0, len(DEAL_STAGES), n_rows), DEAL_STAGES
+            ),
+            "deal_amount": np.clip(np.round(amount), *AMOUNT_RANGE).astype(np.int64),
+            "sales_cycle_days": cycle,
+            "outcome": np.where(won, "Won", "Lost"),
+        }
+    )
+    return df[REQUIRED_COLUMNS]
+
+
+def write_sales_data(
+    path: Path, n_rows: int, seed: int = RANDOM_STATE, chunk_size: int = 1_000_000
+) -> Path:
+    """
+    Write synthetic deals to CSV or Parquet in bounded-memory chunks.
+
+    Args:
+        path: Output file; '.parquet' writes Parquet (needs pyarrow), anything else CSV.
+        n_rows: Total number of deals.
+        seed: Random seed; each chunk derives its own stream from it.
+        chunk_size: Deals generated per chunk.
+
+    Returns:
+        The output path.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n_reps = max(25, n_rows // DEALS_PER_REP)
+    writer = None
+    try:
+        for chunk_index, start in enumerate(range(0, n_rows, chunk_size)):
+            chunk = generate_sales_data(
+                min(chunk_size, n_rows - start),
+                seed=seed + chunk_index,
+                start_id=start,
+                n_reps=n_reps,
+            )
+            if path.suffix.lower() == ".parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                # Plain strings keep the schema identical across chunks.
+                categories = chunk.select_dtypes("category").columns
+                chunk = chunk.astype({column: str for column in categories})
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
@@ -2,7 +2,7 @@
 Feature engineering utilities for risk scoring.
 """
 
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import numpy as np
 import pandas as pd
@@ -12,15 +12,271 @@ from config import (
     DEAL_SIZE_LABELS,
     LARGE_DEAL_PERCENTILE,
     LONG_CYCLE_THRESHOLD,
+    MODEL_FEATURES,
     OVERALL_WIN_RATE,
     SEGMENT_COLUMNS,
 )
+from features.rolling_win_rates import RollingSegmentWinRates
+from features.segment_encoding import SegmentEncoder, segment_win_probabilities
+from utils.instrumentation import instrumented
+from utils.quantile_sketch import QuantileSketch
 
 
+@instrumented()
+def compute_feature_statistics(
+    df: pd.DataFrame, quantile_error: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Compute the dataset-wide statistics used by engineer_risk_features.
+
+    Args:
+        df: DataFrame with segment, 'sales_cycle_days' and 'deal_amount' columns.
+        quantile_error: When set, medians and the large deal threshold come
+            from quantile sketches with this rank error bound instead of
+            exact quantiles (see FeatureStatisticsAccumulator).
+
+    Returns:
+        Dictionary with per-segment median cycles, overall median and mean
+        cycle, and the large deal amount threshold.
+    """
+    if quantile_error is not None:
+        return FeatureStatisticsAccumulator(quantile_error=quantile_error).update(df).finalize()
+    median_cycle = {
+        segment_type: df.groupby(segment_type, observed=True)["sales_cycle_days"].median().to_dict()
+        for segment_type in SEGMENT_COLUMNS
+    }
+    return {
+        "median_cycle": median_cycle,
+        "overall_median_cycle": float(df["sales_cycle_days"].median()),
+        "large_deal_threshold": float(df["deal_amount"].quantile(LARGE_DEAL_PERCENTILE / 100)),
+        "mean_cycle": float(df["sales_cycle_days"].mean()),
+    }
+
+
+def _quantile_from_counts(counts: pd.Series, q: float) -> float:
+    """Linear-interpolated quantile of a sorted value -> count Series."""
+    total = int(counts.sum())
+    if total == 0:
+        return float("nan")
+    values = counts.index.to_numpy(dtype=float)
+    cumulative = counts.to_numpy().cumsum()
+    position = q * (total - 1)
+    lower_rank = int(np.floor(position))
+    upper_rank = int(np.ceil(position))
+    lower = values[np.searchsorted(cumulative, lower_rank, side="right")]
+    upper = values[np.searchsorted(cumulative, upper_rank, side="right")]
+    fraction = position - lower_rank
+    # Same interpolation rule as numpy's linear quantile method.
+    if fraction >= 0.5:
+        return float(upper - (upper - lower) * (1 - fraction))
+    return float(lower + (upper - lower) * fraction)
+
+
+def _add_counts(left: Optional[pd.Series], right: pd.Series) -> pd.Series:
+    """Add two value-count Series, treating missing values as zero."""
+    if left is None or left.empty:
+        return right.astype("int64")
+    return left.add(right, fill_value=0).astype("int64")
+
+
+class FeatureStatisticsAccumulator:
+    """
+    Accumulate feature statistics over chunks of a dataset.
+
+    By default statistics are exact and kept as value counts, so memory is
+    bounded by the number of distinct cycle lengths and deal amounts rather
+    than by the number of rows. With quantile_error set, the medians and the
+    large deal threshold come from QuantileSketches instead, whose size does
+    not grow with the data and whose rank error stays below quantile_error.
+    Accumulators built on separate chunks or partitions, for example in
+    parallel workers, can be combined with merge().
+    """
+
+    required_columns = SEGMENT_COLUMNS + ["sales_cycle_days", "deal_amount"]
+
+    def __init__(self, quantile_error: Optional[float] = None, seed: int = 0) -> None:
+        self.quantile_error = quantile_error
+        self.seed = seed
+        self.cycle_counts: Dict[str, Optional[pd.Series]] = {
+            segment_type: None for segment_type in SEGMENT_COLUMNS
+        }
+        self.overall_cycle_counts: Optional[pd.Series] = None
+        self.amount_counts: Optional[pd.Series] = None
+        self.cycle_sketches: Dict[str, Dict[Any, QuantileSketch]] = {
+            segment_type: {} for segment_type in SEGMENT_COLUMNS
+        }
+        self.overall_cycle_sketch: Optional[QuantileSketch] = None
+        self.amount_sketch: Optional[QuantileSketch] = None
+        self.cycle_sum = 0.0
+        self._sketches_created = 0
+        self.rows = 0
+        self.won = 0
+        self.has_outcome = False
+
+    @property
+    def uses_sketches(self) -> bool:
+        """Whether quantiles are approximated with sketches."""
+        return self.quantile_error is not None
+
+    def _new_sketch(self) -> QuantileSketch:
+        self._sketches_created += 1
+        return QuantileSketch.for_error(
+            self.quantile_error, seed=self.seed + self._sketches_created
+        )
+
+    def _segment_sketch(self, segment_type: str, segment_value: Any) -> QuantileSketch:
+        sketches = self.cycle_sketches[segment_type]
+        if segment_value not in sketches:
+            sketches[segment_value] = self._new_sketch()
+        return sketches[segment_value]
+
+    def _update_sketches(self, df: pd.DataFrame) -> None:
+        cycles = df["sales_cycle_days"].to_numpy(dtype=np.float64, na_value=np.nan)
+        for segment_type in SEGMENT_COLUMNS:
+            groups = df.groupby(segment_type, observed=True).indices
+            for segment_value, positions in groups.items():
+                self._segment_sketch(segment_type, segment_value).update(cycles[positions])
+        if self.overall_cycle_sketch is None:
+            self.overall_cycle_sketch = self._new_sketch()
+            self.amount_sketch = self._new_sketch()
+        self.overall_cycle_sketch.update(cycles)
+        self.amount_sketch.update(df["deal_amount"].to_numpy(dtype=np.float64, na_value=np.nan))
+        self.cycle_sum += float(np.nansum(cycles))
+
+    def _merge_sketches(self, other: "FeatureStatisticsAccumulator") -> None:
+        for segment_type in SEGMENT_COLUMNS:
+            for segment_value, sketch in other.cycle_sketches[segment_type].items():
+                self._segment_sketch(segment_type, segment_value).merge(sketch)
+        if other.overall_cycle_sketch is not None:
+            if self.overall_cycle_sketch is None:
+                self.overall_cycle_sketch = self._new_sketch()
+                self.amount_sketch = self._new_sketch()
+            self.overall_cycle_sketch.merge(other.overall_cycle_sketch)
+            self.amount_sketch.merge(other.amount_sketch)
+        self.cycle_sum += other.cycle_sum
+
+    def update(self, df: pd.DataFrame) -> "FeatureStatisticsAccumulator":
+        """Add one chunk of deals to the accumulated statistics."""
+        if self.uses_sketches:
+            self._update_sketches(df)
+            self._record_rows(df)
+            return self
+        for segment_type in SEGMENT_COLUMNS:
+            chunk_counts = df.groupby([segment_type, "sales_cycle_days"], observed=True).size()
+            self.cycle_counts[segment_type] = _add_counts(
+                self.cycle_counts[segment_type], chunk_counts
+            )
+        self.overall_cycle_counts = _add_counts(
+            self.overall_cycle_counts, df["sales_cycle_days"].value_counts()
+        )
+        self.amount_counts = _add_counts(self.amount_counts, df["deal_amount"].value_counts())
+        self._record_rows(df)
+        return self
+
+    def _record_rows(self, df: pd.DataFrame) -> None:
+        self.rows += len(df)
+        if "outcome" in df.columns:
+            self.won += int((df["outcome"] == "Won").sum())
+            self.has_outcome = True
+
+    def merge(self, other: "FeatureStatisticsAccumulator") -> "FeatureStatisticsAccumulator":
+        """
+        Fold another accumulator into this one.
+
+        Raises:
+            ValueError: If one accumulator uses sketches and the other does not.
+        """
+        if self.uses_sketches != other.uses_sketches:
+            raise ValueError("Cannot merge exact and sketched feature statistics")
+        if self.uses_sketches:
+            self._merge_sketches(other)
+        for segment_type in SEGMENT_COLUMNS:
+            if other.cycle_counts[segment_type] is not None:
+                self.cycle_counts[segment_type] = _add_counts(
+                    self.cycle_counts[segment_type], other.cycle_counts[segment_type]
+                )
+        if other.overall_cycle_counts is not None:
+            self.overall_cycle_counts = _add_counts(
+                self.overall_cycle_counts, other.overall_cycle_counts
+            )
+        if other.amount_counts is not None:
+            self.amount_counts = _add_counts(self.amount_counts, other.amount_counts)
+        self.rows += other.rows
+        self.won += other.won
+        self.has_outcome = self.has_outcome or other.has_outcome
+        return self
+
+    @property
+    def overall_win_rate(self) -> float:
+        """Share of accumulated deals with outcome 'Won'."""
+        if not self.has_outcome or self.rows == 0:
+            return OVERALL_WIN_RATE
+        return self.won / self.rows
+
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Build statistics identical to compute_feature_statistics on the full data.
+
+        With sketches the quantiles are approximate, within quantile_error in
+        rank; the mean cycle stays exact.
+
+        Returns:
+            Dictionary in the compute_feature_statistics format.
+        """
+        if self.uses_sketches:
+            return self._finalize_sketches()
+        if self.overall_cycle_counts is None or self.amount_counts is None:
+            raise ValueError("No data accumulated; call update() first")
+
+        median_cycle: Dict[str, Dict[Any, float]] = {}
+        for segment_type, counts in self.cycle_counts.items():
+            counts = counts.sort_index()
+            median_cycle[segment_type] = {
+                segment_value: _quantile_from_counts(group.droplevel(0), 0.5)
+                for segment_value, group in counts.groupby(level=0, sort=True)
+            }
+
+        cycle_counts = self.overall_cycle_counts.sort_index()
+        cycle_total = cycle_counts.sum()
+        cycle_sum = float(
+            (cycle_counts.index.to_numpy(dtype=float) * cycle_counts.to_numpy()).sum()
+        )
+        return {
+            "median_cycle": median_cycle,
+            "overall_median_cycle": _quantile_from_counts(cycle_counts, 0.5),
+            "large_deal_threshold": _quantile_from_counts(
+                self.amount_counts.sort_index(), LARGE_DEAL_PERCENTILE / 100
+            ),
+            "mean_cycle": cycle_sum / cycle_total if cycle_total else float("nan"),
+        }
+
+    def _finalize_sketches(self) -> Dict[str, Any]:
+        if self.overall_cycle_sketch is None:
+            raise ValueError("No data accumulated; call update() first")
+        median_cycle = {
+            segment_type: {
+                segment_value: sketches[segment_value].quantile(0.5)
+                for segment_value in sorted(sketches, key=str)
+            }
+            for segment_type, sketches in self.cycle_sketches.items()
+        }
+        cycle_total = self.overall_cycle_sketch.count
+        return {
+            "median_cycle": median_cycle,
+            "overall_median_cycle": self.overall_cycle_sketch.quantile(0.5),
+            "large_deal_threshold": self.amount_sketch.quantile(LARGE_DEAL_PERCENTILE / 100),
+            "mean_cycle": self.cycle_sum / cycle_total if cycle_total else float("nan"),
+        }
+
+
+@instrumented()
 def engineer_risk_features(
     df: pd.DataFrame,
     segment_probs: Dict[str, Dict[str, float]],
     overall_win_rate: Optional[float] = None,
+    feature_stats: Optional[Dict[str, Any]] = None,
+    rolling_win_rates: Optional[RollingSegmentWinRates] = None,
+    segment_encoder: Optional[SegmentEncoder] = None,
 ) -> pd.DataFrame:
     """
     Create feature set for risk scoring model.
@@ -28,11 +284,21 @@ def engineer_risk_features(
     Args:
         df: Raw DataFrame.
         segment_probs: Segment win rate lookups.
+        overall_win_rate: Fallback win rate for unseen segments.
+        feature_stats: Precomputed dataset-wide statistics from
+            compute_feature_statistics; computed from df when omitted.
+        rolling_win_rates: Time-bucketed win rates; when given, win_prob_*
+            are each deal's point-in-time windowed or decayed rate, falling
+            back to segment_probs and then the overall rate.
+        segment_encoder: Value codes covering segment_probs; built from it
+            when omitted.
 
     Returns:
         DataFrame with engineered features.
     """
     df_features = df.copy()
+    if feature_stats is None:
+        feature_stats = compute_feature_statistics(df_features)
     if overall_win_rate is not None:
         global_win_rate = overall_win_rate
     elif "outcome" in df_features.columns:
@@ -40,10 +306,15 @@ def engineer_risk_features(
     else:
         global_win_rate = OVERALL_WIN_RATE
 
-    for segment_type, prob_dict in segment_probs.items():
-        feature_name = f"win_prob_{segment_type}"
-        mapped = df_features[segment_type].map(prob_dict)
-        df_features[feature_name] = mapped.fillna(global_win_rate)
+    win_probs = segment_win_probabilities(
+        df_features, segment_probs, global_win_rate, segment_encoder
+    )
+    recent_rates = rolling_win_rates.deal_rates(df_features) if rolling_win_rates else {}
+    for segment_type, probs in win_probs.items():
+        if segment_type in recent_rates:
+            recent = recent_rates[segment_type]
+            probs = np.where(np.isnan(recent), probs, recent)
+        df_features[f"win_prob_{segment_type}"] = probs
 
     prob_columns = [f"win_prob_{seg}" for seg in SEGMENT_COLUMNS]
     df_features["blended_win_prob"] = df_features[prob_columns].mean(axis=1)
@@ -51,12 +322,12 @@ def engineer_risk_features(
 
     segment_cycle_columns = []
     for segment_type in SEGMENT_COLUMNS:
-        median_cycle_map = df_features.groupby(segment_type)["sales_cycle_days"].median()
+        median_cycle_map = feature_stats["median_cycle"][segment_type]
         median_col = f"median_cycle_{segment_type}"
-        df_features[median_col] = df_features[segment_type].map(median_cycle_map)
+        df_features[median_col] = df_features[segment_type].map(median_cycle_map).astype(float)
         segment_cycle_columns.append(median_col)
 
-    overall_median_cycle = df_features["sales_cycle_days"].median()
+    overall_median_cycle = feature_stats["overall_median_cycle"]
     segment_median_cycle = df_features[segment_cycle_columns].mean(axis=1)
     segment_median_cycle = segment_median_cycle.fillna(overall_median_cycle)
     cycle_denominator = df_features["sales_cycle_days"].replace(0, np.nan)
@@ -69,11 +340,11 @@ def engineer_risk_features(
     rem_score = (df_features["blended_win_prob"] * df_features["deal_amount"]) / cycle_denominator
     df_features["rem_score"] = rem_score.fillna(0.0)
 
-    df_features["deal_amount_log"] = np.log1p(df_features["deal_amount"])
-    median_amount = df_features["deal_amount"].quantile(LARGE_DEAL_PERCENTILE / 100)
+    df_features["deal_amount_log"] = np.log1p(df_features["deal_amount"].astype(float))
+    median_amount = feature_stats["large_deal_threshold"]
     df_features["is_large_deal"] = (df_features["deal_amount"] > median_amount).astype(int)
 
-    mean_cycle = df_features["sales_cycle_days"].mean()
+    mean_cycle = feature_stats["mean_cycle"]
     df_features["sales_cycle_normalized"] = df_features["sales_cycle_days"] / mean_cycle
     df_features["is_long_cycle"] = (
         df_features["sales_cycle_days"] > LONG_CYCLE_THRESHOLD
@@ -89,3 +360,134 @@ def engineer_risk_features(
     )
 
     return df_features
+
+
+def _compute_matrix_feature(
+    name: str,
+    df: pd.DataFrame,
+    get: Callable[[str], np.ndarray],
+    segment_probs: Dict[str, Dict[str, float]],
+    global_win_rate: float,
+    feature_stats: Dict[str, Any],
+    segment_encoder: Optional[SegmentEncoder],
+    rolling_win_rates: Optional[RollingSegmentWinRates] = None,
+) -> np.ndarray:
+    """Compute one engineered feature as a float array, mirroring engineer_risk_features."""
+    if name.startswith("win_prob_"):
+        segment_type = name[len("win_prob_") :]
+        probs = {segment_type: segment_probs[segment_type]}
+        static = segment_win_probabilities(df, probs, global_win_rate, segment_encoder)[
+            segment_type
+        ]
+        if rolling_win_rates is None or segment_type not in rolling_win_rates.segment_columns:
+            return static
+        recent = rolling_win_rates.deal_rates(df, segments=[segment_type])[segment_type]
+        return np.where(np.isnan(recent), static, recent)
+    if name.startswith("median_cycle_"):
+        segment_type = name[len("median_cycle_") :]
+        mapped = df[segment_type].map(feature_stats["median_cycle"][segment_type])
+        return mapped.astype(float).to_numpy()
+    if name == "blended_win_prob":
+        probs = np.column_stack([get(f"win_prob_{seg}") for seg in SEGMENT_COLUMNS])
+        return probs.sum(axis=1) / len(SEGMENT_COLUMNS)
+    if name == "blended_risk_prob":
+        return 1 - get("blended_win_prob")
+    if name == "sales_cycle_days":
+        return df["sales_cycle_days"].to_numpy(dtype=float)
+    if name == "deal_amount":
+        return df["deal_amount"].to_numpy(dtype=float)
+    if name == "cycle_denominator":
+        cycle = get("sales_cycle_days")
+        return np.where(cycle == 0, np.nan, cycle)
+    if name == "aging_factor":
+        medians = np.column_stack([get(f"median_cycle_{seg}") for seg in SEGMENT_COLUMNS])
+        known = ~np.isnan(medians)
+        counts = known.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            segment_median = np.where(known, medians, 0.0).sum(axis=1) / counts
+            segment_median = np.where(
+                counts == 0, feature_stats["overall_median_cycle"], segment_median
+            )
+            aging = np.minimum(segment_median / get("cycle_denominator"), 1.0)
+        return np.where(np.isnan(aging), 1.0, aging)
+    if name == "rapv_aging_value":
+        return get("deal_amount") * get("blended_win_prob") * get("aging_factor")
+    if name == "rem_score":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rem = (get("blended_win_prob") * get("deal_amount")) / get("cycle_denominator")
+        return np.where(np.isnan(rem), 0.0, rem)
+    if name == "deal_amount_log":
+        return np.log1p(get("deal_amount"))
+    if name == "is_large_deal":
+        return (get("deal_amount") > feature_stats["large_deal_threshold"]).astype(float)
+    if name == "sales_cycle_normalized":
+        return get("sales_cycle_days") / feature_stats["mean_cycle"]
+    if name == "is_long_cycle":
+        return (get("sales_cycle_days") > LONG_CYCLE_THRESHOLD).astype(float)
+    if name == "is_q4":
+        return df["month"].isin([10, 11, 12]).to_numpy(dtype=float)
+    if name == "is_quarter_end":
+        return df["month"].isin([3, 6, 9, 12]).to_numpy(dtype=float)
+    raise ValueError(f"Unsupported matrix feature: {name}")
+
+
+@instrumented()
+def build_feature_matrix(
+    df: pd.DataFrame,
+    segment_probs: Dict[str, Dict[str, float]],
+    overall_win_rate: float,
+    feature_stats: Dict[str, Any],
+    columns: Optional[List[str]] = None,
+    dtype: Any = np.float64,
+    out: Optional[np.ndarray] = None,
+    segment_encoder: Optional[SegmentEncoder] = None,
+    rolling_win_rates: Optional[RollingSegmentWinRates] = None,
+) -> np.ndarray:
+    """
+    Build only the requested engineered features into one float matrix.
+
+    Produces the same values as engineer_risk_features without copying df or
+    materialising intermediate columns; only the inputs of the requested
+    features are computed.
+
+    Args:
+        df: Deals with segment, cycle, amount and month columns. Not modified.
+        segment_probs: Segment win rate lookups.
+        overall_win_rate: Fallback win rate for unseen segments.
+        feature_stats: Statistics from compute_feature_statistics.
+        columns: Feature names to build; defaults to MODEL_FEATURES.
+        dtype: Matrix dtype when out is not given.
+        out: Optional preallocated (len(df), len(columns)) array to fill.
+        segment_encoder: Value codes covering segment_probs; built from it
+            when omitted.
+        rolling_win_rates: Time-bucketed win rates, as in engineer_risk_features.
+
+    Returns:
+        Array of shape (len(df), len(columns)).
+    """
+    columns = MODEL_FEATURES if columns is None else columns
+    shape = (len(df), len(columns))
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+
+    cache: Dict[str, np.ndarray] = {}
+
+    def get(name: str) -> np.ndarray:
+        if name not in cache:
+            cache[name] = _compute_matrix_feature(
+                name,
+                df,
+                get,
+                segment_probs,
+                overall_win_rate,
+                feature_stats,
+                segment_encoder,
+                rolling_win_rates,
+            )
+        return cache[name]
+
+    for index, name in enumerate(columns):
+        out[:, index] = get(name)
+    return out
@@ -0,0 +1,401 @@
+"""
+Read-through feature store for per-deal model features.
+
+Engineered feature rows are cached under
+``deal_features:{tenant}:{transformer_version}:{deal_id}:{fingerprint}``,
+where the transformer version hashes the fitted segment tables and
+statistics and the fingerprint hashes the deal's raw inputs. A deal whose
+fields change, or a refitted transformer, therefore never reads a stale row;
+superseded entries age out through the TTL and LRU bounds.
+
+Two interchangeable backends are provided: InMemoryFeatureStore for a single
+process and SQLiteFeatureStore, a local file-backed stand-in for the Redis
+cache in the system design that several processes can share.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import FEATURE_STORE_MAX_ENTRIES, FEATURE_STORE_TTL_SECONDS, MODEL_FEATURES
+from features.feature_transformer import RiskFeatureTransformer
+
+# SQLite limits bound parameters per statement; stay well below it.
+SQLITE_BATCH_SIZE = 500
+
+
+class FeatureStore:
+    """
+    Base class for feature stores holding 1-D float64 arrays by key.
+
+    Subclasses implement _get_many, _put_many, __len__ and purge_expired;
+    this class keeps the hit/miss/put counters.
+
+    Attributes:
+        max_entries: Most entries kept; least recently used are evicted first.
+        default_ttl_seconds: TTL for puts without one; None never expires.
+    """
+
+    def __init__(self, max_entries: int, default_ttl_seconds: Optional[float]) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.evictions = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up several keys at once.
+
+        Args:
+            keys: Keys to read.
+
+        Returns:
+            Dictionary of the keys that were present and unexpired.
+        """
+        found = self._get_many(keys)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray], ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store several values at once, evicting least recently used entries.
+
+        Args:
+            items: Key to 1-D float array.
+            ttl_seconds: Lifetime of these entries (default: default_ttl_seconds).
+        """
+        if not items:
+            return
+        self._put_many(items, self.default_ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self.puts += len(items)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up one key; None when absent or expired."""
+        return self.get_many([key]).get(key)
+
+    def put(self, key: str, value: np.ndarray, ttl_seconds: Optional[float] = None) -> None:
+        """Store one value."""
+        self.put_many({key: value}, ttl_seconds)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters and current size."""
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "puts": self.puts,
+            "evictions": self.evictions,
+        }
+
+    def _get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    def _put_many(self, items: Dict[str, np.ndarray], ttl_seconds: Optional[float]) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        raise NotImplementedError
+
+
+class InMemoryFeatureStore(FeatureStore):
+    """Thread-safe in-process store backed by an OrderedDict in LRU order."""
+
+    def __init__(
+        self,
+        max_entries: int = FEATURE_STORE_MAX_ENTRIES,
+        default_ttl_seconds: Optional[float] = FEATURE_STORE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(max_entries, default_ttl_seconds)
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        now = self._clock()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[1]
+        return found
+
+    def _put_many(self, items: Dict[str, np.ndarray], ttl_seconds: Optional[float]) -> None:
+        expires_at = float("inf") if ttl_seconds is None else self._clock() + ttl_seconds
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, np.array(value, dtype=np.float64))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def purge_expired(self) -> int:
+        now = self._clock()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+
+class SQLiteFeatureStore(FeatureStore):
+    """
+    File-backed store in one SQLite table, shareable between processes.
+
+    Values are stored as raw float64 bytes. Recency is the wall-clock time
+    of the last read or write, indexed so eviction deletes the oldest rows
+    without a scan. The row count is tracked from this connection's own
+    writes and recounted exactly only when it passes max_entries, so rows
+    added by other processes are noticed at the next eviction check.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = FEATURE_STORE_MAX_ENTRIES,
+        default_ttl_seconds: Optional[float] = FEATURE_STORE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(max_entries, default_ttl_seconds)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS features ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires_at REAL, last_access REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS features_last_access ON features (last_access)"
+            )
+        self._size = self._count()
+
+    def _get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        now = self._clock()
+        found = {}
+        expired = []
+        with self._lock, self._connection:
+            for batch in _batches(keys, SQLITE_BATCH_SIZE):
+                rows = self._connection.execute(
+                    "SELECT key, value, expires_at FROM features "
+                    f"WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+                for key, value, expires_at in rows:
+                    if expires_at is not None and expires_at <= now:
+                        expired.append((key,))
+                    else:
+                        found[key] = np.frombuffer(value, dtype=np.float64)
+            self._connection.executemany(
+                "UPDATE features SET last_access = ? WHERE key = ?", ((now, key) for key in found)
+            )
+            self._connection.executemany("DELETE FROM features WHERE key = ?", expired)
+            self._size -= len(expired)
+        return found
+
+    def _put_many(self, items: Dict[str, np.ndarray], ttl_seconds: Optional[float]) -> None:
+        now = self._clock()
+        expires_at = None if ttl_seconds is None else now + ttl_seconds
+        rows = [
+            (key, np.ascontiguousarray(value, dtype=np.float64).tobytes(), expires_at, now)
+            for key, value in items.items()
+        ]
+        with self._lock, self._connection:
+            keys = list(items)
+            existing = sum(
+                self._connection.execute(
+                    f"SELECT COUNT(*) FROM features WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchone()[0]
+                for batch in _batches(keys, SQLITE_BATCH_SIZE)
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO features (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._size += len(rows) - existing
+            if self._size > self.max_entries:
+                self._size = self._count()
+                excess = self._size - self.max_entries
+                if excess > 0:
+                    self._connection.execute(
+                        "DELETE FROM features WHERE key IN "
+                        "(SELECT key FROM features ORDER BY last_access LIMIT ?)",
+                        (excess,),
+                    )
+                    self.evictions += excess
+                    self._size -= excess
+
+    def _count(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._size = self._count()
+            return self._size
+
+    def purge_expired(self) -> int:
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM features WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (self._clock(),),
+            )
+            self._size -= cursor.rowcount
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+
+def _batches(items: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def open_feature_store(
+    spec: str,
+    max_entries: int = FEATURE_STORE_MAX_ENTRIES,
+    ttl_seconds: Optional[float] = FEATURE_STORE_TTL_SECONDS,
+) -> FeatureStore:
+    """
+    Open a store from a command line value.
+
+    Args:
+        spec: 'memory' for the in-process store, otherwise a SQLite file path.
+        max_entries: Entry bound.
+        ttl_seconds: Default TTL; None never expires.
+
+    Returns:
+        FeatureStore.
+    """
+    if spec == "memory":
+        return InMemoryFeatureStore(max_entries, ttl_seconds)
+    return SQLiteFeatureStore(Path(spec), max_entries, ttl_seconds)
+
+
+def transformer_version(transformer: RiskFeatureTransformer) -> str:
+    """
+    Short hash of the fitted statistics that feature values depend on.
+
+    Args:
+        transformer: Fitted feature transformer.
+
+    Returns:
+        First 16 hex characters of a SHA-256 digest.
+    """
+    statistics = {
+        "segment_probs": transformer.segment_probs,
+        "overall_win_rate": transformer.overall_win_rate,
+        "feature_stats": transformer.feature_stats,
+    }
+    if transformer.rolling_win_rates is not None:
+        statistics["rolling_win_rates"] = transformer.rolling_win_rates.to_dict()
+    payload = json.dumps(statistics, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def deal_feature_keys(df: pd.DataFrame, tenant: str, version: str, columns: List[str]) -> List[str]:
+    """
+    Build the store key of every deal.
+
+    Args:
+        df: Deals with the feature input columns and optionally 'deal_id'.
+        tenant: Tenant id.
+        version: transformer_version of the transformer building the rows.
+        columns: Feature columns; part of the key so different column sets
+            never share entries.
+
+    Returns:
+        One key per row.
+    """
+    # Imported here: pipeline.incremental imports the scoring pipeline, which
+    # imports this module.
+    from pipeline.incremental import deal_fingerprints
+
+    fingerprints = deal_fingerprints(df)
+    if "deal_id" in df.columns:
+        deal_ids = df["deal_id"].astype(str).fillna("").tolist()
+    else:
+        deal_ids = [""] * len(df)
+    namespace = f"deal_features:{tenant}:{version}"
+    if columns != MODEL_FEATURES:
+        namespace += ":" + hashlib.sha256(",".join(columns).encode("utf-8")).hexdigest()[:8]
+    return [
+        f"{namespace}:{deal_id}:{fingerprint:016x}"
+        for deal_id, fingerprint in zip(deal_ids, fingerprints.tolist())
+    ]
+
+
+def cached_transform_matrix(
+    df: pd.DataFrame,
+    transformer: RiskFeatureTransformer,
+    store: FeatureStore,
+    columns: Optional[List[str]] = None,
+    tenant: str = "default",
+    version: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Build the feature matrix, reading cached rows and computing only misses.
+
+    Args:
+        df: Deals with segment, cycle, amount, created_date and month columns.
+        transformer: Fitted feature transformer.
+        store: Feature store to read through.
+        columns: Feature names (default: MODEL_FEATURES).
+        tenant: Tenant id used in the keys.
+        version: Precomputed transformer_version, to skip rehashing per call.
+
+    Returns:
+        Array of shape (len(df), len(columns)), equal to
+        transformer.transform_matrix(df, columns).
+    """
+    columns = columns or MODEL_FEATURES
+    keys = deal_feature_keys(df, tenant, version or transformer_version(transformer), columns)
+    cached = store.get_many(keys)
+
+    X = np.empty((len(df), len(columns)), dtype=np.float64)
+    missing = []
+    for position, key in enumerate(keys):
+        row = cached.get(key)
+        if row is None:
+            missing.append(position)
+        else:
+            X[position] = row
+    if missing:
+        computed = transformer.transform_matrix(df.iloc[missing], columns)
+        X[missing] = computed
+        store.put_many({keys[position]: row for position, row in zip(missing, computed)})
+    return X
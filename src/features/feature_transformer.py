@@ -0,0 +1,343 @@
+"""
+Fitted feature transformer for risk scoring.
+
+Learns the dataset-wide statistics behind engineer_risk_features once, at
+training time, so scoring only performs lookups and arithmetic.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    FEATURE_STATS_FILENAME,
+    OVERALL_WIN_RATE,
+    ROLLING_WIN_RATES_FILENAME,
+    SEGMENT_CODES_FILENAME,
+    SEGMENT_COLUMNS,
+    SEGMENT_COUNTS_FILENAME,
+    SEGMENT_PROBS_FILENAME,
+)
+from features.feature_engineering import (
+    FeatureStatisticsAccumulator,
+    build_feature_matrix,
+    compute_feature_statistics,
+    engineer_risk_features,
+)
+from features.rolling_win_rates import RollingSegmentWinRates
+from features.segment_encoding import SegmentEncoder, cross_segment_win_probabilities
+from features.segment_probabilities import (
+    calculate_segment_counts,
+    merge_segment_counts,
+    segment_probabilities_from_counts,
+)
+
+
+class RiskFeatureTransformer:
+    """
+    Fit/transform wrapper around engineer_risk_features.
+
+    Attributes:
+        segment_probs: Segment win rate lookups.
+        overall_win_rate: Fallback win rate for unseen segment values.
+        feature_stats: Statistics in the compute_feature_statistics format.
+        segment_counts: Won/total counts behind segment_probs, when known.
+        segment_encoder: Stable value codes for the segment columns.
+        quantile_error: When set, fitting approximates the median cycles and
+            large deal threshold with quantile sketches of this rank error.
+        rolling_win_rates: Time-bucketed win counts; when set, win_prob_* are
+            each deal's windowed or decayed rate (see engineer_risk_features).
+    """
+
+    def __init__(
+        self,
+        segment_probs: Optional[Dict[str, Dict[str, float]]] = None,
+        overall_win_rate: Optional[float] = None,
+        feature_stats: Optional[Dict[str, Any]] = None,
+        segment_counts: Optional[pd.DataFrame] = None,
+        segment_encoder: Optional[SegmentEncoder] = None,
+        quantile_error: Optional[float] = None,
+        rolling_win_rates: Optional[RollingSegmentWinRates] = None,
+    ) -> None:
+        self.segment_probs = segment_probs
+        self.overall_win_rate = overall_win_rate
+        self.feature_stats = feature_stats
+        self.segment_counts = segment_counts
+        self.segment_encoder = segment_encoder
+        self.quantile_error = quantile_error
+        self.rolling_win_rates = rolling_win_rates
+        self._cross_tables: Dict[Tuple[str, str], np.ndarray] = {}
+        if segment_probs is not None:
+            self._refresh_encoder()
+
+    def _refresh_encoder(self) -> None:
+        """Give codes to new segment values; existing codes never change."""
+        if self.segment_encoder is None:
+            self.segment_encoder = SegmentEncoder.from_values(self.segment_probs)
+        else:
+            self.segment_encoder = self.segment_encoder.extended(self.segment_probs)
+        self._cross_tables.clear()
+
+    @property
+    def is_fitted(self) -> bool:
+        """Whether all statistics needed by transform() are available."""
+        return (
+            self.segment_probs is not None
+            and self.overall_win_rate is not None
+            and self.feature_stats is not None
+        )
+
+    def fit(self, df: pd.DataFrame) -> "RiskFeatureTransformer":
+        """
+        Learn feature statistics from historical deals.
+
+        Segment win rates are only computed when none were supplied, and
+        rolling win rate tables are only filled when they are empty.
+
+        Args:
+            df: DataFrame with segment, cycle, amount and outcome columns,
+                plus the period column when rolling win rates are used.
+
+        Returns:
+            The fitted transformer.
+        """
+        if self.segment_probs is None:
+            self.segment_counts = calculate_segment_counts(df, SEGMENT_COLUMNS)
+            self.segment_probs = segment_probabilities_from_counts(
+                self.segment_counts, SEGMENT_COLUMNS
+            )
+            self._refresh_encoder()
+        if self.rolling_win_rates is not None and self.rolling_win_rates.start is None:
+            self.rolling_win_rates.update(df)
+        if "outcome" in df.columns:
+            self.overall_win_rate = float((df["outcome"] == "Won").mean())
+        else:
+            self.overall_win_rate = OVERALL_WIN_RATE
+        self.feature_stats = compute_feature_statistics(df, quantile_error=self.quantile_error)
+        return self
+
+    def fit_chunks(self, chunks: Iterable[pd.DataFrame]) -> "RiskFeatureTransformer":
+        """
+        Learn feature statistics from an iterable of DataFrame chunks.
+
+        Produces the same statistics as fit() on the concatenated chunks while
+        holding only value counts (or, with quantile_error, fixed-size
+        sketches) in memory.
+
+        Args:
+            chunks: DataFrame chunks with the columns required by fit().
+
+        Returns:
+            The fitted transformer.
+        """
+        accumulator = FeatureStatisticsAccumulator(quantile_error=self.quantile_error)
+        chunk_counts = []
+        fill_rolling = self.rolling_win_rates is not None and self.rolling_win_rates.start is None
+        for chunk in chunks:
+            accumulator.update(chunk)
+            if self.segment_probs is None:
+                chunk_counts.append(calculate_segment_counts(chunk, SEGMENT_COLUMNS))
+            if fill_rolling:
+                self.rolling_win_rates.update(chunk)
+
+        if self.segment_probs is None:
+            self.segment_counts = merge_segment_counts(chunk_counts, SEGMENT_COLUMNS)
+            self.segment_probs = segment_probabilities_from_counts(
+                self.segment_counts, SEGMENT_COLUMNS
+            )
+            self._refresh_encoder()
+        self.overall_win_rate = accumulator.overall_win_rate
+        self.feature_stats = accumulator.finalize()
+        return self
+
+    def update_segment_counts(self, new_counts: pd.DataFrame) -> "RiskFeatureTransformer":
+        """
+        Fold counts from newly closed deals into the segment tables.
+
+        The existing counts stand in for the full history, so only the new
+        deals need to be aggregated. Feature statistics are left unchanged.
+
+        Args:
+            new_counts: Table from calculate_segment_counts on the new deals.
+
+        Returns:
+            The updated transformer.
+
+        Raises:
+            ValueError: If the transformer has no segment counts to update.
+        """
+        if self.segment_counts is None:
+            raise ValueError("Segment counts are not available; refit the transformer")
+        self.segment_counts = merge_segment_counts(
+            [self.segment_counts, new_counts], SEGMENT_COLUMNS
+        )
+        self.segment_probs = segment_probabilities_from_counts(self.segment_counts, SEGMENT_COLUMNS)
+        self.overall_win_rate = float(
+            self.segment_counts["won"].sum() / self.segment_counts["total"].sum()
+        )
+        self._refresh_encoder()
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Engineer risk features using the fitted statistics.
+
+        Args:
+            df: Deals with segment, cycle, amount and month columns.
+
+        Returns:
+            DataFrame with engineered features.
+        """
+        if not self.is_fitted:
+            raise ValueError("RiskFeatureTransformer must be fitted before transform")
+        return engineer_risk_features(
+            df,
+            self.segment_probs,
+            overall_win_rate=self.overall_win_rate,
+            feature_stats=self.feature_stats,
+            rolling_win_rates=self.rolling_win_rates,
+            segment_encoder=self.segment_encoder,
+        )
+
+    def transform_matrix(
+        self, df: pd.DataFrame, columns: Optional[List[str]] = None, dtype: Any = np.float64
+    ) -> np.ndarray:
+        """
+        Build only the requested features into one preallocated matrix.
+
+        Args:
+            df: Deals with segment, cycle, amount and month columns. Not modified.
+            columns: Feature names; defaults to MODEL_FEATURES.
+            dtype: Matrix dtype.
+
+        Returns:
+            Array of shape (len(df), len(columns)).
+        """
+        if not self.is_fitted:
+            raise ValueError("RiskFeatureTransformer must be fitted before transform")
+        return build_feature_matrix(
+            df,
+            self.segment_probs,
+            self.overall_win_rate,
+            self.feature_stats,
+            columns=columns,
+            dtype=dtype,
+            segment_encoder=self.segment_encoder,
+            rolling_win_rates=self.rolling_win_rates,
+        )
+
+    def cross_win_probabilities(self, df: pd.DataFrame, segments: Tuple[str, str]) -> np.ndarray:
+        """
+        Win rate of each deal's combination of two segments (e.g. industry x region).
+
+        The 2-D table is built from segment_counts on first use and cached.
+
+        Args:
+            df: Deals with both segment columns.
+            segments: The two segment columns.
+
+        Returns:
+            float64 array of len(df); the overall win rate for unknown values
+            and combinations without history.
+
+        Raises:
+            ValueError: If the transformer has no segment counts.
+        """
+        if self.segment_counts is None or not self.is_fitted:
+            raise ValueError("Cross-segment rates need a transformer fitted with segment counts")
+        segments = tuple(segments)
+        if segments not in self._cross_tables:
+            self._cross_tables[segments] = self.segment_encoder.cross_rate_table(
+                self.segment_counts, segments, self.overall_win_rate
+            )
+        return cross_segment_win_probabilities(
+            df, self.segment_encoder, segments, self._cross_tables[segments]
+        )
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fit on df and return its engineered features."""
+        return self.fit(df).transform(df)
+
+    def save(self, directory: Path) -> None:
+        """
+        Save segment win rates, codes, counts, feature statistics and any
+        rolling win rate tables as JSON.
+
+        Args:
+            directory: Target directory, usually MODELS_DIR.
+        """
+        if not self.is_fitted:
+            raise ValueError("Cannot save an unfitted RiskFeatureTransformer")
+        directory.mkdir(parents=True, exist_ok=True)
+        with (directory / SEGMENT_PROBS_FILENAME).open("w", encoding="utf-8") as handle:
+            json.dump(self.segment_probs, handle, indent=2, sort_keys=True)
+        stats = {"overall_win_rate": self.overall_win_rate, **self.feature_stats}
+        with (directory / FEATURE_STATS_FILENAME).open("w", encoding="utf-8") as handle:
+            json.dump(stats, handle, indent=2, sort_keys=True)
+        with (directory / SEGMENT_CODES_FILENAME).open("w", encoding="utf-8") as handle:
+            json.dump(self.segment_encoder.to_dict(), handle, indent=2, sort_keys=True)
+        if self.segment_counts is not None:
+            records = self.segment_counts.astype({"won": int, "total": int}).to_dict(
+                orient="records"
+            )
+            with (directory / SEGMENT_COUNTS_FILENAME).open("w", encoding="utf-8") as handle:
+                json.dump(records, handle, indent=2)
+        rolling_path = directory / ROLLING_WIN_RATES_FILENAME
+        if self.rolling_win_rates is not None:
+            self.rolling_win_rates.save(rolling_path)
+        else:
+            # A stale table would switch scoring to rolling rates this model never saw.
+            rolling_path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, directory: Path) -> "RiskFeatureTransformer":
+        """
+        Load a transformer saved with save().
+
+        Args:
+            directory: Directory containing the JSON artifacts.
+
+        Returns:
+            Fitted transformer.
+
+        Raises:
+            FileNotFoundError: If either artifact is missing.
+        """
+        segment_path = directory / SEGMENT_PROBS_FILENAME
+        stats_path = directory / FEATURE_STATS_FILENAME
+        for path in (segment_path, stats_path):
+            if not path.exists():
+                raise FileNotFoundError(f"Feature artifact not found: {path}")
+        with segment_path.open("r", encoding="utf-8") as handle:
+            segment_probs = json.load(handle)
+        with stats_path.open("r", encoding="utf-8") as handle:
+            stats = json.load(handle)
+        overall_win_rate = stats.pop("overall_win_rate")
+
+        segment_counts = None
+        counts_path = directory / SEGMENT_COUNTS_FILENAME
+        if counts_path.exists():
+            with counts_path.open("r", encoding="utf-8") as handle:
+                segment_counts = pd.DataFrame.from_records(
+                    json.load(handle), columns=SEGMENT_COLUMNS + ["won", "total"]
+                )
+        segment_encoder = None
+        codes_path = directory / SEGMENT_CODES_FILENAME
+        if codes_path.exists():
+            with codes_path.open("r", encoding="utf-8") as handle:
+                segment_encoder = SegmentEncoder(json.load(handle))
+        rolling_path = directory / ROLLING_WIN_RATES_FILENAME
+        rolling_win_rates = (
+            RollingSegmentWinRates.load(rolling_path) if rolling_path.exists() else None
+        )
+        return cls(
+            segment_probs,
+            overall_win_rate=overall_win_rate,
+            feature_stats=stats,
+            segment_counts=segment_counts,
+            segment_encoder=segment_encoder,
+            rolling_win_rates=rolling_win_rates,
+        )
@@ -0,0 +1,394 @@
+"""
+Time-bucketed segment win rates with windowed and exponentially decayed queries.
+
+Won and total deal counts are kept per segment value and per period (the
+'created_month' column from add_temporal_features by default) as prefix sums,
+so the win rate over any run of periods is two subtractions. Exponentially
+decayed counts follow D[t] = decay * D[t - 1] + count[t] and are cached per
+half-life, so decayed queries are also constant time per segment value.
+
+Appending a new period only touches the new columns of each table (and the
+cached decayed sums are extended lazily), so a monthly update costs time
+proportional to the new deals, not to the history.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import ROLLING_WIN_RATE_WINDOW, SEGMENT_COLUMNS
+
+
+class _SegmentCounts:
+    """Prefix-summed won/total counts of one segment column, one row per value."""
+
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+        self.rows: Dict[Any, int] = {}
+        # Column t + 1 holds the counts of periods 0..t; column 0 is zero.
+        self.cum_won = np.zeros((0, 1), dtype=np.int64)
+        self.cum_total = np.zeros((0, 1), dtype=np.int64)
+        # half-life -> (decayed won, decayed total, periods computed so far)
+        self.decayed: Dict[float, Tuple[np.ndarray, np.ndarray, int]] = {}
+
+    def row_codes(self, values: pd.Series) -> np.ndarray:
+        """Row index of each value, adding rows for unseen values."""
+        codes, uniques = pd.factorize(values)
+        if not len(uniques):
+            return np.full(len(values), -1, dtype=np.int64)
+        for value in uniques:
+            if value not in self.rows:
+                self.rows[value] = len(self.values)
+                self.values.append(value)
+        mapping = np.array([self.rows[value] for value in uniques], dtype=np.int64)
+        return np.where(codes >= 0, mapping[codes], -1)
+
+    def lookup_codes(self, values: pd.Series) -> np.ndarray:
+        """Row index of each value; -1 for values never counted."""
+        return pd.Index(self.values, dtype=object).get_indexer(values.astype(object))
+
+    def counts(self, n_periods: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-period won and total counts, shape (values, n_periods)."""
+        return (
+            np.diff(self.cum_won[:, : n_periods + 1], axis=1),
+            np.diff(self.cum_total[:, : n_periods + 1], axis=1),
+        )
+
+
+def _grown(array: np.ndarray, rows: int, columns: int) -> np.ndarray:
+    """Return array with at least (rows, columns) capacity, doubling as needed."""
+    if array.shape[0] >= rows and array.shape[1] >= columns:
+        return array
+    new_rows = rows if array.shape[0] >= rows else max(rows, 2 * array.shape[0])
+    new_columns = columns if array.shape[1] >= columns else max(columns, 2 * array.shape[1])
+    grown = np.zeros((new_rows, new_columns), dtype=array.dtype)
+    grown[: array.shape[0], : array.shape[1]] = array
+    return grown
+
+
+class RollingSegmentWinRates:
+    """
+    Per-period segment win counts answering window and decay queries.
+
+    Windows and half-lives are measured in periods of period_column
+    (months for 'created_month', quarters for 'closed_quarter').
+
+    Attributes:
+        segment_columns: Segment columns counted.
+        period_column: Period-dtype column deals are bucketed by.
+        window: Default trailing window for deal_rates; None uses all history.
+        half_life: Default half-life for deal_rates; overrides window when set.
+        start: First period in the tables, or None before any update.
+        n_periods: Number of periods from start to the latest one counted.
+    """
+
+    def __init__(
+        self,
+        segment_columns: Optional[List[str]] = None,
+        period_column: str = "created_month",
+        window: Optional[int] = ROLLING_WIN_RATE_WINDOW,
+        half_life: Optional[float] = None,
+    ) -> None:
+        self.segment_columns = list(segment_columns or SEGMENT_COLUMNS)
+        self.period_column = period_column
+        self.window = window
+        self.half_life = half_life
+        self.start: Optional[pd.Period] = None
+        self.n_periods = 0
+        self._segments = {segment: _SegmentCounts() for segment in self.segment_columns}
+
+    @property
+    def end(self) -> Optional[pd.Period]:
+        """Latest period in the tables, or None before any update."""
+        if self.start is None:
+            return None
+        return self.start + (self.n_periods - 1)
+
+    def _period_offsets(self, periods: pd.Series) -> np.ndarray:
+        """Offset of each period from start; periods must share start's frequency."""
+        if not isinstance(periods.dtype, pd.PeriodDtype):
+            raise ValueError(
+                f"'{self.period_column}' must have a period dtype; run add_temporal_features first"
+            )
+        if self.start is not None and periods.dtype.freq != self.start.freq:
+            raise ValueError(
+                f"'{self.period_column}' has frequency {periods.dtype.freq}, "
+                f"tables use {self.start.freq}"
+            )
+        ordinals = periods.array.asi8
+        if self.start is None:
+            return ordinals
+        return ordinals - self.start.ordinal
+
+    def update(self, df: pd.DataFrame) -> "RollingSegmentWinRates":
+        """
+        Add closed deals to the tables.
+
+        Deals in periods after the latest one append new buckets; only those
+        buckets are written. Deals in earlier periods are allowed but shift
+        every later prefix sum and invalidate the cached decayed sums.
+
+        Args:
+            df: Deals with the segment columns, 'outcome' and period_column.
+
+        Returns:
+            self.
+        """
+        periods = df[self.period_column]
+        known = periods.notna().to_numpy()
+        if not known.any():
+            return self
+        offsets = self._period_offsets(periods)[known]
+        if self.start is None:
+            self.start = pd.Period(ordinal=int(offsets.min()), freq=periods.dtype.freq)
+            offsets = offsets - self.start.ordinal
+        if offsets.min() < 0:
+            self._prepend(int(-offsets.min()))
+            offsets = offsets - offsets.min()
+
+        first, last = int(offsets.min()), int(offsets.max())
+        old_periods = self.n_periods
+        self.n_periods = max(self.n_periods, last + 1)
+        won = (df["outcome"] == "Won").to_numpy()[known]
+        for segment, table in self._segments.items():
+            rows = table.row_codes(df[segment][known])
+            present = rows >= 0
+            self._add(table, rows[present], offsets[present], won[present], first, old_periods)
+        return self
+
+    def _add(
+        self,
+        table: _SegmentCounts,
+        rows: np.ndarray,
+        offsets: np.ndarray,
+        won: np.ndarray,
+        first: int,
+        old_periods: int,
+    ) -> None:
+        n_rows = len(table.values)
+        table.cum_won = _grown(table.cum_won, n_rows, self.n_periods + 1)
+        table.cum_total = _grown(table.cum_total, n_rows, self.n_periods + 1)
+        # New buckets start at the running total of the last existing one.
+        for cumulative in (table.cum_won, table.cum_total):
+            cumulative[:n_rows, old_periods + 1 : self.n_periods + 1] = cumulative[
+                :n_rows, old_periods : old_periods + 1
+            ]
+
+        span = self.n_periods - first
+        for cumulative, weights in ((table.cum_won, won), (table.cum_total, None)):
+            delta = np.zeros((n_rows, span), dtype=np.int64)
+            increments = 1 if weights is None else weights.astype(np.int64)
+            np.add.at(delta, (rows, offsets - first), increments)
+            cumulative[:n_rows, first + 1 : self.n_periods + 1] += np.cumsum(delta, axis=1)
+
+        for half_life, (won_decayed, total_decayed, computed) in table.decayed.items():
+            table.decayed[half_life] = (won_decayed, total_decayed, min(computed, first))
+
+    def _prepend(self, periods: int) -> None:
+        """Add empty periods before start."""
+        self.start = self.start - periods
+        self.n_periods += periods
+        for table in self._segments.values():
+            table.cum_won = np.pad(table.cum_won, ((0, 0), (periods, 0)))
+            table.cum_total = np.pad(table.cum_total, ((0, 0), (periods, 0)))
+            table.decayed.clear()
+
+    def _decayed(self, table: _SegmentCounts, half_life: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Decayed won/total sums per value and period, extended up to n_periods."""
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        n_rows = len(table.values)
+        won_decayed, total_decayed, computed = table.decayed.get(
+            half_life, (np.zeros((0, 0)), np.zeros((0, 0)), 0)
+        )
+        # Rows added for new values are zero before the period that introduced
+        # them, which _add already marked as the recompute point.
+        won_decayed = _grown(won_decayed, n_rows, self.n_periods)
+        total_decayed = _grown(total_decayed, n_rows, self.n_periods)
+        if computed < self.n_periods:
+            decay = 0.5 ** (1.0 / half_life)
+            won_counts, total_counts = table.counts(self.n_periods)
+            for period in range(computed, self.n_periods):
+                previous_won = won_decayed[:n_rows, period - 1] if period else 0.0
+                previous_total = total_decayed[:n_rows, period - 1] if period else 0.0
+                won_decayed[:n_rows, period] = decay * previous_won + won_counts[:, period]
+                total_decayed[:n_rows, period] = decay * previous_total + total_counts[:, period]
+            table.decayed[half_life] = (won_decayed, total_decayed, self.n_periods)
+        return won_decayed[:n_rows], total_decayed[:n_rows]
+
+    def _sums(
+        self,
+        table: _SegmentCounts,
+        rows: np.ndarray,
+        end: np.ndarray,
+        window: Optional[int],
+        half_life: Optional[float],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Won and total over periods ending at end (inclusive); end -1 means no history."""
+        if half_life is not None:
+            won_decayed, total_decayed = self._decayed(table, half_life)
+            column = np.maximum(end, 0)
+            won = np.where(end >= 0, won_decayed[rows, column], 0.0)
+            total = np.where(end >= 0, total_decayed[rows, column], 0.0)
+            return won, total
+        stop = end + 1
+        begin = np.zeros_like(stop) if window is None else np.maximum(stop - window, 0)
+        won = table.cum_won[rows, stop] - table.cum_won[rows, begin]
+        total = table.cum_total[rows, stop] - table.cum_total[rows, begin]
+        return won.astype(float), total.astype(float)
+
+    def _end_offset(self, end: Optional[Any]) -> int:
+        if self.start is None:
+            raise ValueError("No deals counted; call update() first")
+        if end is None:
+            return self.n_periods - 1
+        offset = pd.Period(end, freq=self.start.freq).ordinal - self.start.ordinal
+        return max(min(offset, self.n_periods - 1), -1)
+
+    def window_rates(
+        self, window: Optional[int] = None, end: Optional[Any] = None
+    ) -> Dict[str, Dict[Any, float]]:
+        """
+        Win rates over a trailing window, in the calculate_segment_probabilities format.
+
+        Args:
+            window: Number of periods up to and including end; None for all history.
+            end: Last period to include (a Period or a string such as '2024-06');
+                defaults to the latest period.
+
+        Returns:
+            Dictionary mapping segment types to win rate dictionaries; values
+            without deals in the window are omitted.
+        """
+        if window is not None and window < 1:
+            raise ValueError("window must be at least 1")
+        return self._rates(self._end_offset(end), window, None)
+
+    def decayed_rates(
+        self, half_life: float, end: Optional[Any] = None
+    ) -> Dict[str, Dict[Any, float]]:
+        """
+        Exponentially decayed win rates, in the calculate_segment_probabilities format.
+
+        A deal half_life periods before end counts half as much as one in end.
+
+        Args:
+            half_life: Half-life in periods.
+            end: Last period to include; defaults to the latest period.
+
+        Returns:
+            Dictionary mapping segment types to win rate dictionaries.
+        """
+        return self._rates(self._end_offset(end), None, half_life)
+
+    def _rates(
+        self, end: int, window: Optional[int], half_life: Optional[float]
+    ) -> Dict[str, Dict[Any, float]]:
+        segment_probs: Dict[str, Dict[Any, float]] = {}
+        for segment, table in self._segments.items():
+            rows = np.arange(len(table.values))
+            won, total = self._sums(table, rows, np.full(len(rows), end), window, half_life)
+            segment_probs[segment] = {
+                table.values[row]: float(won[row] / total[row]) for row in np.flatnonzero(total > 0)
+            }
+        return segment_probs
+
+    def deal_rates(
+        self,
+        df: pd.DataFrame,
+        window: Optional[int] = None,
+        half_life: Optional[float] = None,
+        segments: Optional[List[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Point-in-time win rate of each deal's segments.
+
+        Each deal sees only periods strictly before its own, so historical
+        deals get the rates that were known when they were created.
+
+        Args:
+            df: Deals with the segment columns and period_column.
+            window: Trailing window in periods (default: self.window).
+            half_life: Half-life in periods (default: self.half_life); takes
+                precedence over window.
+            segments: Segment columns to look up; defaults to all counted.
+
+        Returns:
+            Dictionary mapping segment types to float arrays; NaN where the
+            segment value has no earlier deals.
+        """
+        window = self.window if window is None else window
+        half_life = self.half_life if half_life is None else half_life
+        segments = self.segment_columns if segments is None else segments
+        if self.start is None:
+            return {segment: np.full(len(df), np.nan) for segment in segments}
+        periods = df[self.period_column]
+        offsets = np.where(periods.notna(), self._period_offsets(periods), self.n_periods)
+        end = np.clip(offsets - 1, -1, self.n_periods - 1)
+
+        rates: Dict[str, np.ndarray] = {}
+        for segment in segments:
+            table = self._segments[segment]
+            rows = table.lookup_codes(df[segment])
+            known = rows >= 0
+            won, total = self._sums(table, np.maximum(rows, 0), end, window, half_life)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rate = won / total
+            rates[segment] = np.where(known & (total > 0), rate, np.nan)
+        return rates
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialisable per-period counts."""
+        segments = {}
+        for segment, table in self._segments.items():
+            won, total = table.counts(self.n_periods)
+            segments[segment] = {
+                "values": table.values,
+                "won": won.tolist(),
+                "total": total.tolist(),
+            }
+        return {
+            "segment_columns": self.segment_columns,
+            "period_column": self.period_column,
+            "window": self.window,
+            "half_life": self.half_life,
+            "freq": None if self.start is None else self.start.freqstr,
+            "start": None if self.start is None else str(self.start),
+            "n_periods": self.n_periods,
+            "segments": segments,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RollingSegmentWinRates":
+        """Rebuild tables written by to_dict."""
+        rates = cls(
+            data["segment_columns"], data["period_column"], data["window"], data["half_life"]
+        )
+        if data["start"] is None:
+            return rates
+        rates.start = pd.Period(data["start"], freq=data["freq"])
+        rates.n_periods = data["n_periods"]
+        for segment, stored in data["segments"].items():
+            table = rates._segments[segment]
+            table.values = list(stored["values"])
+            table.rows = {value: row for row, value in enumerate(table.values)}
+            n_rows = len(table.values)
+            shape = (n_rows, rates.n_periods)
+            won = np.asarray(stored["won"], dtype=np.int64).reshape(shape)
+            total = np.asarray(stored["total"], dtype=np.int64).reshape(shape)
+            table.cum_won = np.pad(np.cumsum(won, axis=1), ((0, 0), (1, 0)))
+            table.cum_total = np.pad(np.cumsum(total, axis=1), ((0, 0), (1, 0)))
+        return rates
+
+    def save(self, path: Path) -> None:
+        """Write the tables as JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), default=str), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "RollingSegmentWinRates":
+        """Read tables written by save."""
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
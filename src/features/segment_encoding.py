@@ -0,0 +1,214 @@
+"""
+Integer codes for segment values and dense win rate lookup tables.
+
+Each segment column gets a stable value -> code vocabulary (sorted at fit
+time; values seen later are appended, so existing codes never move). Win
+rates become float arrays indexed by code with one extra trailing slot for
+the fallback rate, so the code -1 used for unknown values selects the
+fallback and a lookup is a single np.take. Pairs of segments use 2-D arrays
+of shape (len(a) + 1, len(b) + 1) with the same trailing fallback row and
+column.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SegmentEncoder:
+    """
+    Stable category -> int code dictionaries, one per segment column.
+
+    Attributes:
+        vocabularies: Segment column -> values in code order.
+    """
+
+    def __init__(self, vocabularies: Dict[str, List[Any]]) -> None:
+        self.vocabularies = {segment: list(values) for segment, values in vocabularies.items()}
+        self._indexes = {
+            segment: pd.Index(values, dtype=object) for segment, values in self.vocabularies.items()
+        }
+
+    @classmethod
+    def from_values(cls, values: Dict[str, Iterable[Any]]) -> "SegmentEncoder":
+        """
+        Build an encoder with each segment's distinct values in sorted order.
+
+        Args:
+            values: Segment column -> values (for example segment_probs).
+
+        Returns:
+            SegmentEncoder.
+        """
+        return cls(
+            {
+                segment: sorted({value for value in segment_values if not pd.isna(value)}, key=str)
+                for segment, segment_values in values.items()
+            }
+        )
+
+    def extended(self, values: Dict[str, Iterable[Any]]) -> "SegmentEncoder":
+        """
+        Return an encoder that also covers values, keeping every existing code.
+
+        Args:
+            values: Segment column -> values that may include unseen ones.
+
+        Returns:
+            self when nothing is new, otherwise a new SegmentEncoder.
+        """
+        vocabularies = {segment: list(known) for segment, known in self.vocabularies.items()}
+        changed = False
+        for segment, segment_values in values.items():
+            known = vocabularies.setdefault(segment, [])
+            index = self._indexes.get(segment, pd.Index([], dtype=object))
+            new = sorted(
+                {value for value in segment_values if not pd.isna(value) and value not in index},
+                key=str,
+            )
+            if new or segment not in self.vocabularies:
+                known.extend(new)
+                changed = True
+        return SegmentEncoder(vocabularies) if changed else self
+
+    def encode(self, values: pd.Series, segment: str) -> np.ndarray:
+        """
+        Code of each value; -1 for missing or unknown values.
+
+        Categorical columns are encoded through their categories, so only
+        the category labels are hashed, not every row.
+
+        Args:
+            values: Segment values.
+            segment: Segment column the values belong to.
+
+        Returns:
+            int64 array of codes.
+        """
+        index = self._indexes[segment]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Trailing -1 so missing values (category code -1) stay -1.
+            category_codes = np.append(index.get_indexer(values.cat.categories), -1)
+            return category_codes[values.cat.codes.to_numpy()]
+        return index.get_indexer(values.astype(object))
+
+    def lookup(self, values: pd.Series, segment: str, table: np.ndarray) -> np.ndarray:
+        """
+        Gather table entries for values.
+
+        For categorical columns the table is first reduced to one entry per
+        category, so the per-row work is a single np.take on the int8/int16
+        category codes.
+
+        Args:
+            values: Segment values.
+            segment: Segment column the values belong to.
+            table: Array from rate_table for this segment.
+
+        Returns:
+            Array of len(values).
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            per_category = table[self.encode(values.cat.categories.to_series(), segment)]
+            # Trailing fallback entry for missing values (category code -1).
+            per_category = np.append(per_category, table[-1])
+            return np.take(per_category, values.cat.codes.to_numpy())
+        return np.take(table, self.encode(values, segment))
+
+    def rate_table(self, segment: str, rates: Dict[Any, float], fallback: float) -> np.ndarray:
+        """
+        Dense rate array for one segment, indexed by code.
+
+        Args:
+            segment: Segment column.
+            rates: Value -> win rate; values missing here get the fallback.
+            fallback: Rate for unknown values, stored in the last slot.
+
+        Returns:
+            float64 array of length len(vocabulary) + 1.
+        """
+        vocabulary = self.vocabularies[segment]
+        table = np.full(len(vocabulary) + 1, fallback, dtype=np.float64)
+        for code, value in enumerate(vocabulary):
+            rate = rates.get(value)
+            if rate is not None and not pd.isna(rate):
+                table[code] = rate
+        return table
+
+    def cross_rate_table(
+        self, counts: pd.DataFrame, segments: Tuple[str, str], fallback: float
+    ) -> np.ndarray:
+        """
+        Dense win rate array for a pair of segments.
+
+        Args:
+            counts: Joint won/total table from calculate_segment_counts.
+            segments: The two segment columns, rows then columns.
+            fallback: Rate for unknown values and combinations without deals.
+
+        Returns:
+            float64 array of shape (len(first) + 1, len(second) + 1).
+        """
+        first, second = segments
+        totals = counts.groupby([first, second], observed=True)[["won", "total"]].sum()
+        rows = self._indexes[first].get_indexer(totals.index.get_level_values(0).astype(object))
+        columns = self._indexes[second].get_indexer(totals.index.get_level_values(1).astype(object))
+        known = (rows >= 0) & (columns >= 0) & (totals["total"].to_numpy() > 0)
+        table = np.full(
+            (len(self.vocabularies[first]) + 1, len(self.vocabularies[second]) + 1),
+            fallback,
+            dtype=np.float64,
+        )
+        won = totals["won"].to_numpy(dtype=np.float64)
+        total = totals["total"].to_numpy(dtype=np.float64)
+        table[rows[known], columns[known]] = won[known] / total[known]
+        return table
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """Vocabularies for JSON serialisation."""
+        return {segment: list(values) for segment, values in self.vocabularies.items()}
+
+
+def segment_win_probabilities(
+    df: pd.DataFrame,
+    segment_probs: Dict[str, Dict[Any, float]],
+    fallback: float,
+    encoder: Optional[SegmentEncoder] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Look up each deal's win rate for every segment in segment_probs.
+
+    Args:
+        df: Deals with the segment columns.
+        segment_probs: Segment win rate lookups.
+        fallback: Rate for unknown or missing values (NaN to leave them unset).
+        encoder: Encoder covering segment_probs; built from it when omitted.
+
+    Returns:
+        Dictionary mapping segment types to float64 arrays of len(df).
+    """
+    encoder = encoder or SegmentEncoder.from_values(segment_probs)
+    return {
+        segment: encoder.lookup(df[segment], segment, encoder.rate_table(segment, rates, fallback))
+        for segment, rates in segment_probs.items()
+    }
+
+
+def cross_segment_win_probabilities(
+    df: pd.DataFrame, encoder: SegmentEncoder, segments: Tuple[str, str], table: np.ndarray
+) -> np.ndarray:
+    """
+    Look up each deal's win rate in a table from SegmentEncoder.cross_rate_table.
+
+    Args:
+        df: Deals with both segment columns.
+        encoder: Encoder the table was built with.
+        segments: The table's two segment columns.
+        table: 2-D rate array.
+
+    Returns:
+        float64 array of len(df).
+    """
+    first, second = segments
+    return table[encoder.encode(df[first], first), encoder.encode(df[second], second)]
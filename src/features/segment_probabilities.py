@@ -2,11 +2,84 @@
 Calculate segment-based win probabilities for RAPV metric.
 """
 
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
+import numpy as np
 import pandas as pd
 
+from features.segment_encoding import segment_win_probabilities
+from utils.instrumentation import instrumented
 
+
+@instrumented()
+def calculate_segment_counts(df: pd.DataFrame, segment_columns: List[str]) -> pd.DataFrame:
+    """
+    Count won and total deals per combination of segment values.
+
+    A single grouped aggregation over all segment columns produces the joint
+    table; per-segment rates are marginals of it. Tables built on separate
+    partitions can be combined with merge_segment_counts.
+
+    Args:
+        df: DataFrame with historical deals and an 'outcome' column.
+        segment_columns: Categorical columns to count by.
+
+    Returns:
+        DataFrame with the segment columns plus integer 'won' and 'total'.
+    """
+    is_won = (df["outcome"] == "Won").astype("int64")
+    grouped = is_won.groupby(
+        [df[segment] for segment in segment_columns], observed=True, dropna=False
+    )
+    counts = grouped.agg(["sum", "size"]).rename(columns={"sum": "won", "size": "total"})
+    return counts.reset_index()
+
+
+def merge_segment_counts(
+    counts: Iterable[pd.DataFrame], segment_columns: List[str]
+) -> pd.DataFrame:
+    """
+    Combine segment count tables from several partitions or time periods.
+
+    Args:
+        counts: Tables produced by calculate_segment_counts.
+        segment_columns: Segment columns the tables were counted by.
+
+    Returns:
+        Single table with summed 'won' and 'total' per segment combination.
+    """
+    tables = [table for table in counts if not table.empty]
+    if not tables:
+        return pd.DataFrame(columns=segment_columns + ["won", "total"])
+    combined = pd.concat(
+        [table.astype({segment: object for segment in segment_columns}) for table in tables],
+        ignore_index=True,
+    )
+    merged = combined.groupby(segment_columns, dropna=False)[["won", "total"]].sum()
+    return merged.reset_index()
+
+
+def segment_probabilities_from_counts(
+    counts: pd.DataFrame, segment_columns: List[str]
+) -> Dict[str, Dict[str, float]]:
+    """
+    Derive per-segment win rates from a segment count table.
+
+    Args:
+        counts: Table produced by calculate_segment_counts or merge_segment_counts.
+        segment_columns: Segment columns to derive rates for.
+
+    Returns:
+        Dictionary mapping segment types to win rate dictionaries.
+    """
+    segment_probs: Dict[str, Dict[str, float]] = {}
+    for segment in segment_columns:
+        marginal = counts.groupby(segment, observed=True)[["won", "total"]].sum()
+        segment_probs[segment] = (marginal["won"] / marginal["total"]).to_dict()
+    return segment_probs
+
+
+@instrumented()
 def calculate_segment_probabilities(
     df: pd.DataFrame, segment_columns: List[str]
 ) -> Dict[str, Dict[str, float]]:
@@ -20,19 +93,13 @@ def calculate_segment_probabilities(
     Returns:
         Dictionary mapping segment types to win rate dictionaries.
     """
-    segment_probs: Dict[str, Dict[str, float]] = {}
-
-    for segment in segment_columns:
-        win_rates = df.groupby(segment).apply(
-            lambda x: (x["outcome"] == "Won").mean()
-        )
-        segment_probs[segment] = win_rates.to_dict()
-
-    return segment_probs
+    counts = calculate_segment_counts(df, segment_columns)
+    return segment_probabilities_from_counts(counts, segment_columns)
 
 
+@instrumented()
 def apply_segment_probabilities(
-    df: pd.DataFrame, segment_probabilities: Dict[str, Dict[str, float]]
+    df: pd.DataFrame, segment_probabilities: Dict[str, Dict[str, float]], copy: bool = True
 ) -> pd.DataFrame:
     """
     Map segment win probabilities to each deal as features.
@@ -40,21 +107,22 @@ def apply_segment_probabilities(
     Args:
         df: DataFrame to add probability features to.
         segment_probabilities: Pre-calculated segment win rates.
+        copy: Whether to work on a copy; False adds the columns to df in place.
 
     Returns:
         DataFrame with probability features added.
     """
-    df_with_probs = df.copy()
+    df_with_probs = df.copy() if copy else df
 
-    for segment_type, prob_dict in segment_probabilities.items():
-        feature_name = f"win_prob_{segment_type}"
-        df_with_probs[feature_name] = df_with_probs[segment_type].map(prob_dict)
+    win_probs = segment_win_probabilities(df_with_probs, segment_probabilities, np.nan)
+    for segment_type, probs in win_probs.items():
+        df_with_probs[f"win_prob_{segment_type}"] = probs
 
     return df_with_probs
 
 
 def calculate_blended_probability(
-    df: pd.DataFrame, segment_columns: List[str]
+    df: pd.DataFrame, segment_columns: List[str], copy: bool = True
 ) -> pd.DataFrame:
     """
     Calculate blended win probability across all segments.
@@ -62,11 +130,12 @@ def calculate_blended_probability(
     Args:
         df: DataFrame with segment probability features.
         segment_columns: List of segment types.
+        copy: Whether to work on a copy; False adds the columns to df in place.
 
     Returns:
         DataFrame with 'blended_win_prob' column added.
     """
-    df_with_blend = df.copy()
+    df_with_blend = df.copy() if copy else df
 
     prob_columns = [f"win_prob_{seg}" for seg in segment_columns]
     df_with_blend["blended_win_prob"] = df_with_blend[prob_columns].mean(axis=1)
@@ -0,0 +1,387 @@
+"""
+Versioned, integrity-checked bundles of scoring artifacts.
+
+A bundle is one directory, BUNDLES_DIR/<tenant>/<version>/, holding
+everything scoring needs: the fitted estimator, the flat-array export of
+tree ensembles (one .npy file per node array, so loading memory-maps them
+instead of unpickling), the feature transformer's segment tables and
+statistics, the drift reference histograms when training saved them, and
+a manifest listing the feature columns and a SHA-256 per file. The content
+hash covers the manifest's file hashes and feature list; unless a version
+is given it also names the bundle, so retraining on the same data yields
+the same version. Each tenant directory has a LATEST file
+naming its current version.
+
+BundleCache keeps recently used bundles in memory for long-running
+processes, keyed by (tenant, version) and bounded by entry count.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    BUNDLE_CACHE_SIZE,
+    BUNDLES_DIR,
+    DEFAULT_TENANT,
+    DRIFT_REFERENCE_FILENAME,
+    MODEL_FEATURES,
+)
+from features.feature_transformer import RiskFeatureTransformer
+from models.flat_ensemble import FlatTreeEnsemble, export_flat_model
+from pipeline.drift_monitor import FeatureHistograms
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+MODEL_ARTIFACT = "model.joblib"
+FLAT_MODEL_DIR = "flat_model"
+LATEST_FILENAME = "LATEST"
+HASH_CHUNK_BYTES = 1 << 20
+
+
+@dataclass
+class ArtifactBundle:
+    """
+    Loaded scoring artifacts of one tenant and version.
+
+    The estimator is unpickled on first access to model, so scoring with
+    the flat export never imports joblib or scikit-learn.
+
+    Attributes:
+        tenant: Tenant the bundle belongs to.
+        version: Bundle version (directory name).
+        content_hash: SHA-256 over the bundle's files and feature list.
+        transformer: Fitted feature transformer.
+        feature_columns: Model feature columns in training order.
+        flat_model: Memory-mapped flat export, for tree ensembles.
+        drift_reference: Holdout histograms for drift reports, when bundled.
+        manifest: Raw manifest contents.
+        model_path: Pickled estimator loaded by model.
+        mmap_mode: joblib memory-map mode for the estimator's arrays.
+    """
+
+    tenant: str
+    version: str
+    content_hash: str
+    transformer: RiskFeatureTransformer
+    feature_columns: List[str]
+    flat_model: Optional[FlatTreeEnsemble] = None
+    drift_reference: Optional[FeatureHistograms] = None
+    manifest: Dict[str, Any] = field(default_factory=dict)
+    model_path: Optional[Path] = None
+    mmap_mode: Optional[str] = "r"
+    _model: Any = field(default=None, repr=False)
+
+    @property
+    def model(self) -> Any:
+        """Fitted estimator, loaded from model_path on first access."""
+        if self._model is None:
+            import joblib
+
+            self._model = joblib.load(self.model_path, mmap_mode=self.mmap_mode)
+        return self._model
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _content_hash(files: Dict[str, str], feature_columns: List[str]) -> str:
+    """Hash the per-file digests and feature list in a canonical order."""
+    payload = json.dumps(
+        {"format": BUNDLE_FORMAT_VERSION, "files": files, "features": feature_columns},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _hash_files(directory: Path) -> Dict[str, str]:
+    """SHA-256 of every file under directory except the manifest, by relative path."""
+    return {
+        path.relative_to(directory).as_posix(): _file_sha256(path)
+        for path in sorted(directory.rglob("*"))
+        if path.is_file() and path.name != MANIFEST_FILENAME
+    }
+
+
+def _write_text_atomic(path: Path, text: str) -> None:
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(text, encoding="utf-8")
+    os.replace(temporary, path)
+
+
+def save_bundle(
+    model: Any,
+    transformer: RiskFeatureTransformer,
+    root: Path = BUNDLES_DIR,
+    tenant: str = DEFAULT_TENANT,
+    version: Optional[str] = None,
+    feature_columns: Optional[List[str]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    drift_reference: Optional[FeatureHistograms] = None,
+) -> Path:
+    """
+    Write a bundle and point the tenant's LATEST file at it.
+
+    The bundle is assembled in a temporary directory and renamed into
+    place, so readers never see a partial bundle.
+
+    Args:
+        model: Fitted estimator.
+        transformer: Fitted feature transformer.
+        root: Directory holding one subdirectory per tenant.
+        tenant: Tenant id.
+        version: Bundle version; defaults to the first 12 characters of the
+            content hash.
+        feature_columns: Model feature columns (default: MODEL_FEATURES).
+        metadata: Extra JSON-serialisable values stored in the manifest,
+            e.g. the model type or holdout metrics.
+        drift_reference: Holdout histograms that drift reports of this
+            bundle's scores are compared against.
+
+    Returns:
+        Path of the bundle directory.
+
+    Raises:
+        ValueError: If the transformer is unfitted, or the version already
+            exists with different contents.
+    """
+    import joblib
+
+    if not transformer.is_fitted:
+        raise ValueError("Cannot bundle an unfitted RiskFeatureTransformer")
+    feature_columns = list(feature_columns or MODEL_FEATURES)
+    tenant_dir = root / tenant
+    tenant_dir.mkdir(parents=True, exist_ok=True)
+    staging = tenant_dir / f".staging-{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    try:
+        # Uncompressed, so joblib can memory-map the estimator's arrays on load.
+        joblib.dump(model, staging / MODEL_ARTIFACT)
+        transformer.save(staging)
+        try:
+            export_flat_model(model, feature_columns).save_arrays(staging / FLAT_MODEL_DIR)
+        except ValueError:
+            pass  # Not a supported tree ensemble; scoring uses the estimator.
+        if drift_reference is not None:
+            drift_reference.save(staging / DRIFT_REFERENCE_FILENAME)
+
+        files = _hash_files(staging)
+        content_hash = _content_hash(files, feature_columns)
+        version = version or content_hash[:12]
+        manifest = {
+            "format_version": BUNDLE_FORMAT_VERSION,
+            "tenant": tenant,
+            "version": version,
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "feature_columns": feature_columns,
+            "files": files,
+            "content_hash": content_hash,
+            "metadata": metadata or {},
+        }
+        (staging / MANIFEST_FILENAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        bundle_dir = tenant_dir / version
+        if bundle_dir.exists():
+            existing = json.loads((bundle_dir / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+            if existing["content_hash"] != content_hash:
+                raise ValueError(
+                    f"Bundle {tenant}/{version} already exists with different contents"
+                )
+        else:
+            os.replace(staging, bundle_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    _write_text_atomic(tenant_dir / LATEST_FILENAME, version + "\n")
+    return bundle_dir
+
+
+def resolve_bundle_path(
+    root: Path = BUNDLES_DIR, tenant: str = DEFAULT_TENANT, version: Optional[str] = None
+) -> Path:
+    """
+    Locate a bundle directory.
+
+    Args:
+        root: Directory holding one subdirectory per tenant.
+        tenant: Tenant id.
+        version: Bundle version; the tenant's LATEST version when omitted.
+
+    Returns:
+        Path of the bundle directory.
+
+    Raises:
+        FileNotFoundError: If the tenant has no bundles or the version is missing.
+    """
+    tenant_dir = root / tenant
+    if version is None:
+        latest_path = tenant_dir / LATEST_FILENAME
+        if not latest_path.exists():
+            raise FileNotFoundError(f"No artifact bundle for tenant '{tenant}' in {root}")
+        version = latest_path.read_text(encoding="utf-8").strip()
+    bundle_dir = tenant_dir / version
+    if not (bundle_dir / MANIFEST_FILENAME).exists():
+        raise FileNotFoundError(f"Artifact bundle not found: {bundle_dir}")
+    return bundle_dir
+
+
+def load_bundle(bundle_dir: Path, mmap: bool = True, verify: bool = True) -> ArtifactBundle:
+    """
+    Load a bundle written by save_bundle.
+
+    Args:
+        bundle_dir: Bundle directory.
+        mmap: Memory-map numeric arrays (flat node arrays and the
+            estimator's arrays) instead of reading them into memory.
+        verify: Check every file against the manifest's SHA-256.
+
+    Returns:
+        ArtifactBundle.
+
+    Raises:
+        ValueError: If the bundle format is unsupported, a file fails the
+            integrity check, or its features differ from MODEL_FEATURES.
+    """
+    manifest = json.loads((bundle_dir / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported bundle format in {bundle_dir}: {manifest.get('format_version')}"
+        )
+    if verify:
+        files = _hash_files(bundle_dir)
+        if files != manifest["files"] or (
+            _content_hash(files, manifest["feature_columns"]) != manifest["content_hash"]
+        ):
+            changed = sorted(
+                name
+                for name in set(files) | set(manifest["files"])
+                if files.get(name) != manifest["files"].get(name)
+            )
+            raise ValueError(f"Artifact bundle {bundle_dir} failed integrity check: {changed}")
+    if manifest["feature_columns"] != MODEL_FEATURES:
+        raise ValueError(
+            f"Artifact bundle {bundle_dir} was built for features {manifest['feature_columns']}, "
+            f"but this code computes {MODEL_FEATURES}"
+        )
+
+    mmap_mode = "r" if mmap else None
+    flat_dir = bundle_dir / FLAT_MODEL_DIR
+    drift_path = bundle_dir / DRIFT_REFERENCE_FILENAME
+    return ArtifactBundle(
+        tenant=manifest["tenant"],
+        version=manifest["version"],
+        content_hash=manifest["content_hash"],
+        transformer=RiskFeatureTransformer.load(bundle_dir),
+        feature_columns=manifest["feature_columns"],
+        flat_model=FlatTreeEnsemble.load_arrays(flat_dir, mmap_mode) if flat_dir.exists() else None,
+        drift_reference=FeatureHistograms.load(drift_path) if drift_path.exists() else None,
+        manifest=manifest,
+        model_path=bundle_dir / MODEL_ARTIFACT,
+        mmap_mode=mmap_mode,
+    )
+
+
+class BundleCache:
+    """
+    Size-bounded LRU cache of loaded bundles keyed by (tenant, version).
+
+    Requests for a tenant's latest version re-read its LATEST file (a few
+    bytes) on every call, so a newly published version is picked up without
+    restarting; the bundle itself is loaded only on a miss. Safe to share
+    between threads.
+    """
+
+    def __init__(
+        self,
+        root: Path = BUNDLES_DIR,
+        max_size: int = BUNDLE_CACHE_SIZE,
+        mmap: bool = True,
+        verify: bool = True,
+        on_evict: Optional[Callable[[Tuple[str, str], ArtifactBundle], None]] = None,
+    ) -> None:
+        """
+        Args:
+            root: Directory holding one subdirectory per tenant.
+            max_size: Most bundles kept loaded.
+            mmap: Passed to load_bundle.
+            verify: Passed to load_bundle.
+            on_evict: Called with the key and bundle of each evicted entry.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.root = root
+        self.max_size = max_size
+        self.mmap = mmap
+        self.verify = verify
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bundles: "OrderedDict[Tuple[str, str], ArtifactBundle]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bundles)
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """Cached (tenant, version) keys, least recently used first."""
+        with self._lock:
+            return list(self._bundles)
+
+    def get(self, tenant: str = DEFAULT_TENANT, version: Optional[str] = None) -> ArtifactBundle:
+        """
+        Return a tenant's bundle, loading it from disk on a miss.
+
+        Args:
+            tenant: Tenant id.
+            version: Bundle version; the tenant's LATEST version when omitted.
+
+        Returns:
+            ArtifactBundle.
+
+        Raises:
+            FileNotFoundError: If the bundle does not exist.
+        """
+        bundle_dir = resolve_bundle_path(self.root, tenant, version)
+        key = (tenant, bundle_dir.name)
+        with self._lock:
+            bundle = self._bundles.get(key)
+            if bundle is not None:
+                self._bundles.move_to_end(key)
+                self.hits += 1
+                return bundle
+            self.misses += 1
+
+        # Load outside the lock so other tenants are served meanwhile; two
+        # threads missing on the same key both load it and the last one wins.
+        bundle = load_bundle(bundle_dir, mmap=self.mmap, verify=self.verify)
+        evicted = []
+        with self._lock:
+            self._bundles[key] = bundle
+            self._bundles.move_to_end(key)
+            while len(self._bundles) > self.max_size:
+                evicted.append(self._bundles.popitem(last=False))
+                self.evictions += 1
+        if self.on_evict is not None:
+            for evicted_key, evicted_bundle in evicted:
+                self.on_evict(evicted_key, evicted_bundle)
+        return bundle
+
+    def clear(self) -> None:
+        """Drop every cached bundle."""
+        with self._lock:
+            self._bundles.clear()
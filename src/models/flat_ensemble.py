@@ -0,0 +1,296 @@
+"""
+Flat-array export and vectorized inference for tree ensemble risk models.
+
+All trees are packed into shared node arrays. Prediction walks every tree
+for every row at once, one depth level per step, so small batches avoid
+sklearn's per-call validation and per-estimator dispatch.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+LOGISTIC_LINK = "logistic"
+IDENTITY_LINK = "identity"
+
+NODE_ARRAYS = ("roots", "feature", "threshold", "left", "value")
+FLAT_METADATA_FILENAME = "flat_model.json"
+
+# Rows traversed together; keeps the (rows x trees) node index arrays cache sized.
+ROW_BLOCK_SIZE = 256
+
+
+@dataclass
+class FlatTreeEnsemble:
+    """
+    Packed node arrays for a binary tree ensemble.
+
+    Nodes are laid out so that each right child directly follows its left
+    sibling. Leaves have an infinite threshold and point to themselves, so
+    traversal can run a fixed number of levels for every tree.
+
+    Attributes:
+        roots: Index of each tree's root node.
+        feature: Split feature per node (0 for leaves).
+        threshold: float32 split threshold per node (inf for leaves).
+        left: Left child per node; the right child is left + 1.
+        value: Output contribution per node (only leaves are read).
+        init: Constant added to the summed leaf values.
+        link: 'logistic' (apply the sigmoid) or 'identity'.
+        max_depth: Deepest root-to-leaf path across all trees.
+        feature_names: Feature columns in training order.
+    """
+
+    roots: np.ndarray
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    value: np.ndarray
+    init: float
+    link: str
+    max_depth: int
+    feature_names: List[str]
+
+    def predict_loss_probability(self, X: Any) -> np.ndarray:
+        """
+        Predict positive-class probabilities.
+
+        Args:
+            X: Feature matrix (DataFrame or array) in feature_names order.
+
+        Returns:
+            Array of probabilities, matching the source model's
+            predict_proba(X)[:, 1].
+
+        Raises:
+            ValueError: If X has the wrong shape or contains NaN, infinity or a
+                value too large for float32, as sklearn's predict_proba does.
+        """
+        # Trees compare float32 features, as in sklearn's own predict. Values
+        # too large for float32 become inf and are rejected below.
+        with np.errstate(over="ignore"):
+            X_values = np.asarray(X, dtype=np.float32)
+        if X_values.ndim != 2 or X_values.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected {len(self.feature_names)} features, got array of shape {X_values.shape}"
+            )
+        # NaN > threshold is False, so the walk would quietly send NaN left.
+        if not np.isfinite(X_values).all():
+            raise ValueError("Input X contains NaN, infinity or a value too large for float32")
+        probabilities = np.empty(X_values.shape[0], dtype=np.float64)
+        for start in range(0, X_values.shape[0], ROW_BLOCK_SIZE):
+            block = X_values[start : start + ROW_BLOCK_SIZE]
+            probabilities[start : start + len(block)] = self._predict_block(block)
+        return probabilities
+
+    def _predict_block(self, X_values: np.ndarray) -> np.ndarray:
+        """Walk all trees for one block of float32 rows."""
+        flat_values = X_values.ravel()
+        row_offsets = (np.arange(X_values.shape[0]) * X_values.shape[1])[:, None]
+        nodes = np.broadcast_to(self.roots, (X_values.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            split_values = np.take(flat_values, row_offsets + np.take(self.feature, nodes))
+            go_right = split_values > np.take(self.threshold, nodes)
+            nodes = np.take(self.left, nodes) + go_right
+
+        raw = self.init + np.take(self.value, nodes).sum(axis=1)
+        return 1.0 / (1.0 + np.exp(-raw)) if self.link == LOGISTIC_LINK else raw
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """
+        Predict class probabilities, as sklearn's predict_proba does.
+
+        Args:
+            X: Feature matrix (DataFrame or array) in feature_names order.
+
+        Returns:
+            Array of shape (n_rows, 2) with won and lost probabilities.
+        """
+        loss_probability = self.predict_loss_probability(X)
+        return np.column_stack([1.0 - loss_probability, loss_probability])
+
+    def save(self, path: Path) -> None:
+        """Save the packed arrays to an .npz file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            roots=self.roots,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            value=self.value,
+            init=np.array(self.init),
+            link=np.array(self.link),
+            max_depth=np.array(self.max_depth),
+            feature_names=np.array(self.feature_names),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "FlatTreeEnsemble":
+        """Load an ensemble saved with save()."""
+        with np.load(path) as arrays:
+            return cls(
+                roots=arrays["roots"],
+                feature=arrays["feature"],
+                threshold=arrays["threshold"],
+                left=arrays["left"],
+                value=arrays["value"],
+                init=float(arrays["init"]),
+                link=str(arrays["link"]),
+                max_depth=int(arrays["max_depth"]),
+                feature_names=[str(name) for name in arrays["feature_names"]],
+            )
+
+    def save_arrays(self, directory: Path) -> List[Path]:
+        """
+        Save node arrays as separate .npy files that can be memory-mapped.
+
+        Args:
+            directory: Target directory.
+
+        Returns:
+            Paths of the written files.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for name in NODE_ARRAYS:
+            path = directory / f"{name}.npy"
+            np.save(path, getattr(self, name))
+            paths.append(path)
+        metadata = {
+            "init": self.init,
+            "link": self.link,
+            "max_depth": self.max_depth,
+            "feature_names": self.feature_names,
+        }
+        metadata_path = directory / FLAT_METADATA_FILENAME
+        metadata_path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+        return paths + [metadata_path]
+
+    @classmethod
+    def load_arrays(cls, directory: Path, mmap_mode: Optional[str] = "r") -> "FlatTreeEnsemble":
+        """
+        Load an ensemble saved with save_arrays().
+
+        Args:
+            directory: Directory holding the .npy files.
+            mmap_mode: numpy memory-map mode; None reads the arrays into memory.
+
+        Returns:
+            Ensemble whose node arrays are read-only memory maps by default.
+        """
+        metadata = json.loads((directory / FLAT_METADATA_FILENAME).read_text(encoding="utf-8"))
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in NODE_ARRAYS
+        }
+        return cls(**arrays, **metadata)
+
+
+def _float32_floor(thresholds: np.ndarray) -> np.ndarray:
+    """
+    Round float64 thresholds down to float32.
+
+    For float32 inputs x, ``x <= t`` holds exactly when ``x <= floor32(t)``,
+    so splits stay identical while the comparison runs in single precision.
+    """
+    rounded = thresholds.astype(np.float32)
+    too_high = rounded.astype(np.float64) > thresholds
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _sibling_order(tree: Any) -> Tuple[np.ndarray, int]:
+    """
+    Breadth-first node order in which every right child follows its left sibling.
+
+    Args:
+        tree: Fitted sklearn Tree.
+
+    Returns:
+        Tuple of (original node ids in packed order, depth of the deepest leaf).
+    """
+    order = [0]
+    depth = {0: 0}
+    for node in order:
+        if tree.children_left[node] != -1:
+            for child in (tree.children_left[node], tree.children_right[node]):
+                order.append(child)
+                depth[child] = depth[node] + 1
+    return np.array(order, dtype=np.intp), max(depth.values())
+
+
+def export_flat_model(model: Any, feature_names: List[str]) -> FlatTreeEnsemble:
+    """
+    Pack a fitted binary tree ensemble into flat arrays.
+
+    Args:
+        model: Fitted GradientBoostingClassifier or RandomForestClassifier.
+        feature_names: Feature columns in training order.
+
+    Returns:
+        FlatTreeEnsemble reproducing model.predict_proba(X)[:, 1].
+
+    Raises:
+        ValueError: If the model type or its init estimator is not supported.
+    """
+    # Imported here so loading and evaluating an export does not need scikit-learn.
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+    if isinstance(model, GradientBoostingClassifier):
+        if model.n_classes_ != 2:
+            raise ValueError("Only binary GradientBoostingClassifier models are supported")
+        if model.init_ == "zero":
+            init = 0.0
+        elif hasattr(model.init_, "class_prior_"):
+            prior = model.init_.class_prior_[1]
+            init = float(np.log(prior / (1.0 - prior)))
+        else:
+            raise ValueError("Only the default prior or 'zero' init estimators are supported")
+        trees = [
+            (estimator.tree_, model.learning_rate * estimator.tree_.value[:, 0, 0])
+            for estimator in model.estimators_[:, 0]
+        ]
+        link = LOGISTIC_LINK
+    elif isinstance(model, RandomForestClassifier):
+        trees = []
+        for estimator in model.estimators_:
+            class_values = estimator.tree_.value[:, 0, :]
+            positive = class_values[:, -1] / class_values.sum(axis=1)
+            trees.append((estimator.tree_, positive / len(model.estimators_)))
+        init = 0.0
+        link = IDENTITY_LINK
+    else:
+        raise ValueError(f"Unsupported model for flat export: {type(model).__name__}")
+
+    roots, features, thresholds, lefts, values = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree, node_values in trees:
+        order, depth = _sibling_order(tree)
+        packed_ids = np.empty(tree.node_count, dtype=np.intp)
+        packed_ids[order] = np.arange(tree.node_count)
+        is_leaf = tree.children_left[order] == -1
+        left_ids = packed_ids[np.where(is_leaf, order, tree.children_left[order])]
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature[order]))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+        lefts.append(np.where(is_leaf, np.arange(tree.node_count), left_ids) + offset)
+        values.append(node_values[order])
+        max_depth = max(max_depth, depth)
+        offset += tree.node_count
+
+    return FlatTreeEnsemble(
+        roots=np.array(roots, dtype=np.int32),
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=_float32_floor(np.concatenate(thresholds)),
+        left=np.concatenate(lefts).astype(np.int32),
+        value=np.concatenate(values).astype(np.float64),
+        init=init,
+        link=link,
+        max_depth=max_depth,
+        feature_names=list(feature_names),
+    )
@@ -0,0 +1,229 @@
+"""
+Budgeted hyperparameter search for tree ensemble risk models.
+
+Successive halving starts many sampled configurations on a small slice of
+the training rows with few trees, keeps the best third and grows the
+survivors' data and tree count at each rung. Survivors are warm-started, so
+trees fitted at earlier rungs are kept rather than refitted. After every fit
+the validation log loss is tracked tree by tree; a candidate whose loss has
+stopped improving is frozen at its best tree count.
+"""
+
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingClassifier
+
+from config import RANDOM_STATE, TUNING_MAX_ESTIMATORS, TUNING_SEARCH_SPACES
+from models.model_evaluation import evaluate_classifier
+from models.risk_scorer import build_model
+
+
+@dataclass
+class TrialResult:
+    """One candidate fitted at one rung."""
+
+    params: Dict[str, Any]
+    rung: int
+    n_rows: int
+    n_estimators: int
+    best_n_estimators: int
+    validation_loss: float
+    score: float
+    early_stopped: bool
+    seconds: float
+
+
+@dataclass
+class TuningResult:
+    """Outcome of a successive-halving search."""
+
+    model_type: str
+    metric: str
+    best_params: Dict[str, Any]
+    best_score: float
+    elapsed_seconds: float
+    budget_exhausted: bool
+    trials: List[TrialResult] = field(default_factory=list)
+
+
+@dataclass
+class _Candidate:
+    params: Dict[str, Any]
+    model: Any = None
+    best_n_estimators: int = 0
+    early_stopped: bool = False
+    last_trial: Optional[TrialResult] = None
+
+
+def sample_candidates(
+    search_space: Dict[str, List[Any]], n_candidates: int, seed: int = RANDOM_STATE
+) -> List[Dict[str, Any]]:
+    """
+    Sample distinct parameter combinations from a grid.
+
+    Args:
+        search_space: Parameter name to list of values.
+        n_candidates: Number of combinations (capped at the grid size).
+        seed: Random seed.
+
+    Returns:
+        List of parameter dictionaries.
+    """
+    names = list(search_space)
+    grid = list(itertools.product(*(search_space[name] for name in names)))
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(grid), size=min(n_candidates, len(grid)), replace=False)
+    return [dict(zip(names, grid[index])) for index in chosen]
+
+
+def staged_probabilities(model: Any, X: np.ndarray) -> np.ndarray:
+    """
+    Positive-class probabilities after each tree of a fitted ensemble.
+
+    Args:
+        model: Fitted GradientBoostingClassifier or RandomForestClassifier.
+        X: Feature matrix.
+
+    Returns:
+        Array of shape (n_estimators, n_rows); row k uses the first k + 1 trees.
+    """
+    if isinstance(model, GradientBoostingClassifier):
+        return np.array([proba[:, 1] for proba in model.staged_predict_proba(X)])
+    per_tree = np.array([tree.predict_proba(X)[:, 1] for tree in model.estimators_])
+    return np.cumsum(per_tree, axis=0) / np.arange(1, len(per_tree) + 1)[:, None]
+
+
+def log_loss_by_stage(staged: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Binary log loss of every row of staged_probabilities output."""
+    staged = np.clip(staged, 1e-15, 1 - 1e-15)
+    return -np.mean(y * np.log(staged) + (1 - y) * np.log(1 - staged), axis=1)
+
+
+def successive_halving_search(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_valid: np.ndarray,
+    y_valid: np.ndarray,
+    model_type: str = "gradient_boosting",
+    search_space: Optional[Dict[str, List[Any]]] = None,
+    n_candidates: int = 27,
+    eta: int = 3,
+    max_estimators: int = TUNING_MAX_ESTIMATORS,
+    min_rows: int = 500,
+    patience: int = 20,
+    time_budget_seconds: Optional[float] = None,
+    metric: str = "roc_auc",
+) -> TuningResult:
+    """
+    Search hyperparameters by successive halving on rows and trees.
+
+    Rows of X_train are used as prefixes, so they should already be
+    shuffled. Rung r of R uses eta**(r - R + 1) of the rows and of
+    max_estimators. A candidate is early-stopped when its best validation
+    loss is more than `patience` trees behind its current tree count; it
+    then keeps its last score and stops growing. The first rung always runs;
+    after that, once the time budget is spent no further fits start and the
+    best-scoring candidate so far wins.
+
+    Args:
+        X_train: Shuffled training features.
+        y_train: Training labels (0/1).
+        X_valid: Validation features.
+        y_valid: Validation labels (0/1).
+        model_type: 'gradient_boosting' or 'random_forest'.
+        search_space: Parameter grid (default: TUNING_SEARCH_SPACES[model_type]).
+        n_candidates: Configurations sampled at the first rung.
+        eta: Halving rate; the best 1/eta of candidates advance.
+        max_estimators: Tree count at the final rung.
+        min_rows: Fewest training rows used at any rung.
+        patience: Trees without validation improvement before stopping.
+        time_budget_seconds: Optional wall-clock budget.
+        metric: evaluate_classifier metric used to rank candidates.
+
+    Returns:
+        TuningResult with the best parameters, including the tuned
+        n_estimators, and every trial.
+
+    Raises:
+        ValueError: If the model type has no search space.
+    """
+    if search_space is None:
+        if model_type not in TUNING_SEARCH_SPACES:
+            raise ValueError(f"No search space for model_type: {model_type}")
+        search_space = TUNING_SEARCH_SPACES[model_type]
+
+    start = time.perf_counter()
+    candidates = [_Candidate(params) for params in sample_candidates(search_space, n_candidates)]
+    n_rungs = 1
+    while eta**n_rungs <= len(candidates):
+        n_rungs += 1
+    trials: List[TrialResult] = []
+    budget_exhausted = False
+
+    for rung in range(n_rungs):
+        fraction = eta ** (rung - n_rungs + 1)
+        n_rows = min(len(X_train), max(min_rows, int(len(X_train) * fraction)))
+        n_estimators = max(patience, int(max_estimators * fraction))
+
+        for candidate in candidates:
+            elapsed = time.perf_counter() - start
+            if rung > 0 and time_budget_seconds is not None and elapsed > time_budget_seconds:
+                budget_exhausted = True
+                break
+            if candidate.early_stopped:
+                continue
+            fit_start = time.perf_counter()
+            if candidate.model is None:
+                params = {**candidate.params, "n_estimators": n_estimators, "warm_start": True}
+                candidate.model = build_model(model_type, params)
+            else:
+                candidate.model.set_params(n_estimators=n_estimators)
+            candidate.model.fit(X_train[:n_rows], y_train[:n_rows])
+
+            staged = staged_probabilities(candidate.model, X_valid)
+            losses = log_loss_by_stage(staged, y_valid)
+            best_stage = int(np.argmin(losses))
+            candidate.best_n_estimators = best_stage + 1
+            candidate.early_stopped = n_estimators - candidate.best_n_estimators > patience
+
+            # Score the candidate as it would be trained: stopped at its best tree count.
+            y_proba = staged[best_stage]
+            metrics = evaluate_classifier(y_valid, (y_proba >= 0.5).astype(int), y_proba)
+            candidate.last_trial = TrialResult(
+                params=candidate.params,
+                rung=rung,
+                n_rows=n_rows,
+                n_estimators=n_estimators,
+                best_n_estimators=candidate.best_n_estimators,
+                validation_loss=float(losses[best_stage]),
+                score=float(metrics[metric]),
+                early_stopped=candidate.early_stopped,
+                seconds=time.perf_counter() - fit_start,
+            )
+            trials.append(candidate.last_trial)
+
+        ranked = sorted(
+            (candidate for candidate in candidates if candidate.last_trial is not None),
+            key=lambda candidate: candidate.last_trial.score,
+            reverse=True,
+        )
+        if budget_exhausted or rung == n_rungs - 1:
+            candidates = ranked
+            break
+        candidates = ranked[: max(1, math.ceil(len(ranked) / eta))]
+
+    best = candidates[0]
+    return TuningResult(
+        model_type=model_type,
+        metric=metric,
+        best_params={**best.params, "n_estimators": best.best_n_estimators},
+        best_score=best.last_trial.score,
+        elapsed_seconds=time.perf_counter() - start,
+        budget_exhausted=budget_exhausted,
+        trials=trials,
+    )
@@ -0,0 +1,164 @@
+"""
+Cross-validated model selection across all configured model types.
+
+Fold features are engineered once per fold, with the feature transformer
+fitted on that fold's training rows only, and reused by every model. The
+(model, fold) fits then run in parallel on a process pool; the fold
+matrices reach each worker once, through the pool initializer.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+from config import CV_FOLDS, MODEL_CONFIGS, MODEL_FEATURES, RANDOM_STATE
+from features.feature_transformer import RiskFeatureTransformer
+from models.model_evaluation import evaluate_classifier
+from models.risk_scorer import build_model
+
+# (X_train, y_train, X_valid, y_valid) per fold, installed in each worker.
+_WORKER_FOLDS: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+
+
+@dataclass
+class FoldScore:
+    """Validation metrics of one model on one fold."""
+
+    model_type: str
+    fold: int
+    metrics: Dict[str, float]
+    fit_seconds: float
+
+
+@dataclass
+class ModelSelectionResult:
+    """Cross-validated comparison of model types."""
+
+    best_model_type: str
+    metric: str
+    mean_metrics: Dict[str, Dict[str, float]]
+    std_metrics: Dict[str, Dict[str, float]]
+    fold_scores: List[FoldScore] = field(default_factory=list)
+
+
+def build_fold_matrices(
+    df: pd.DataFrame,
+    target_column: str = "is_lost",
+    n_folds: int = CV_FOLDS,
+    feature_columns: Optional[List[str]] = None,
+    transformer_factory: Callable[[], RiskFeatureTransformer] = RiskFeatureTransformer,
+) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Engineer train and validation feature matrices for stratified folds.
+
+    The transformer is fitted on each fold's training rows, so segment win
+    rates never see the validation outcomes.
+
+    Args:
+        df: Prepared deals with temporal features and target_column.
+        target_column: Binary label column.
+        n_folds: Number of stratified folds.
+        feature_columns: Feature columns (default: MODEL_FEATURES).
+        transformer_factory: Returns a new unfitted transformer configured
+            like the one the final model is trained with (quantile sketches,
+            rolling win rates).
+
+    Returns:
+        List of (X_train, y_train, X_valid, y_valid) arrays per fold.
+    """
+    feature_columns = feature_columns or MODEL_FEATURES
+    y = df[target_column].to_numpy()
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=RANDOM_STATE)
+
+    folds = []
+    for train_rows, valid_rows in splitter.split(np.zeros(len(df)), y):
+        df_train = df.iloc[train_rows]
+        transformer = transformer_factory().fit(df_train)
+        folds.append(
+            (
+                transformer.transform_matrix(df_train, feature_columns),
+                y[train_rows],
+                transformer.transform_matrix(df.iloc[valid_rows], feature_columns),
+                y[valid_rows],
+            )
+        )
+    return folds
+
+
+def _init_worker(folds: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]) -> None:
+    """Keep the fold matrices for every task this worker runs."""
+    _WORKER_FOLDS[:] = folds
+
+
+def _score_fold(model_type: str, fold: int) -> FoldScore:
+    """Fit one model type on one fold and evaluate it on the validation rows."""
+    X_train, y_train, X_valid, y_valid = _WORKER_FOLDS[fold]
+    start = time.perf_counter()
+    model = build_model(model_type)
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    y_proba = model.predict_proba(X_valid)[:, 1]
+    y_pred = (y_proba >= 0.5).astype(int)
+    metrics = evaluate_classifier(y_valid, y_pred, y_proba)
+    metrics = {name: float(value) for name, value in metrics.items()}
+    return FoldScore(model_type, fold, metrics, fit_seconds)
+
+
+def select_model(
+    df: pd.DataFrame,
+    target_column: str = "is_lost",
+    model_types: Optional[List[str]] = None,
+    n_folds: int = CV_FOLDS,
+    metric: str = "roc_auc",
+    max_workers: Optional[int] = None,
+    transformer_factory: Callable[[], RiskFeatureTransformer] = RiskFeatureTransformer,
+) -> ModelSelectionResult:
+    """
+    Compare model types with stratified cross-validation and pick the best.
+
+    Args:
+        df: Prepared deals with temporal features and target_column.
+        target_column: Binary label column.
+        model_types: Model types to compare (default: every MODEL_CONFIGS entry).
+        n_folds: Number of stratified folds.
+        metric: evaluate_classifier metric to maximise.
+        max_workers: Worker processes (default: CPU count).
+        transformer_factory: Passed to build_fold_matrices.
+
+    Returns:
+        ModelSelectionResult with per-fold scores and mean/std per model.
+
+    Raises:
+        ValueError: If a model type is not configured.
+    """
+    model_types = model_types or list(MODEL_CONFIGS)
+    unknown = [model_type for model_type in model_types if model_type not in MODEL_CONFIGS]
+    if unknown:
+        raise ValueError(f"Unsupported model types: {unknown}")
+
+    folds = build_fold_matrices(df, target_column, n_folds, transformer_factory=transformer_factory)
+    tasks = [(model_type, fold) for model_type in model_types for fold in range(n_folds)]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(folds,)
+    ) as pool:
+        fold_scores = list(pool.map(_score_fold, *zip(*tasks)))
+
+    mean_metrics = {}
+    std_metrics = {}
+    for model_type in model_types:
+        scores = pd.DataFrame(
+            [score.metrics for score in fold_scores if score.model_type == model_type]
+        )
+        mean_metrics[model_type] = scores.mean().to_dict()
+        std_metrics[model_type] = scores.std(ddof=0).to_dict()
+
+    best_model_type = max(model_types, key=lambda model_type: mean_metrics[model_type][metric])
+    return ModelSelectionResult(best_model_type, metric, mean_metrics, std_metrics, fold_scores)
@@ -3,13 +3,14 @@ Risk scoring model utilities.
 """
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 
-from config import MODEL_CONFIGS
+from config import MODEL_CONFIGS, RISK_THRESHOLDS
+from utils.instrumentation import instrumented
 
 
 @dataclass
@@ -20,27 +21,34 @@ class ModelArtifacts:
     feature_columns: List[str]
 
 
-def build_model(model_type: str) -> Any:
+def build_model(model_type: str, params: Optional[Dict[str, Any]] = None) -> Any:
     """
     Build a model instance from configuration.
 
     Args:
         model_type: One of 'logistic_regression', 'random_forest', 'gradient_boosting'.
+        params: Optional parameters overriding MODEL_CONFIGS[model_type],
+            e.g. a tuned configuration.
 
     Returns:
         Configured model instance.
     """
+    if model_type not in MODEL_CONFIGS:
+        raise ValueError(f"Unsupported model_type: {model_type}")
+    config = {**MODEL_CONFIGS[model_type], **(params or {})}
     if model_type == "logistic_regression":
-        return LogisticRegression(**MODEL_CONFIGS[model_type])
+        return LogisticRegression(**config)
     if model_type == "random_forest":
-        return RandomForestClassifier(**MODEL_CONFIGS[model_type])
-    if model_type == "gradient_boosting":
-        return GradientBoostingClassifier(**MODEL_CONFIGS[model_type])
-    raise ValueError(f"Unsupported model_type: {model_type}")
+        return RandomForestClassifier(**config)
+    return GradientBoostingClassifier(**config)
 
 
+@instrumented()
 def train_model(
-    X_train: pd.DataFrame, y_train: pd.Series, model_type: str
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    model_type: str,
+    params: Optional[Dict[str, Any]] = None,
 ) -> Any:
     """
     Train a model for risk scoring.
@@ -49,15 +57,17 @@ def train_model(
         X_train: Training features.
         y_train: Training labels.
         model_type: Model type string.
+        params: Optional parameters overriding MODEL_CONFIGS[model_type].
 
     Returns:
         Trained model.
     """
-    model = build_model(model_type)
+    model = build_model(model_type, params)
     model.fit(X_train, y_train)
     return model
 
 
+@instrumented()
 def predict_loss_probability(model: Any, X: pd.DataFrame) -> List[float]:
     """
     Predict loss probabilities for deals.
@@ -70,3 +80,32 @@ def predict_loss_probability(model: Any, X: pd.DataFrame) -> List[float]:
         List of loss probabilities.
     """
     return model.predict_proba(X)[:, 1].tolist()
+
+
+def risk_score_from_probability(loss_probability: float) -> int:
+    """
+    Convert a loss probability to a 0-100 risk score.
+
+    Args:
+        loss_probability: Predicted probability that the deal is lost.
+
+    Returns:
+        Integer risk score.
+    """
+    return int(round(loss_probability * 100))
+
+
+def risk_category_for_score(risk_score: int) -> str:
+    """
+    Map a 0-100 risk score to its RISK_THRESHOLDS category.
+
+    Args:
+        risk_score: Integer risk score.
+
+    Returns:
+        Risk category label.
+    """
+    for category, (_, upper) in RISK_THRESHOLDS.items():
+        if risk_score <= upper:
+            return category
+    return list(RISK_THRESHOLDS)[-1]
@@ -0,0 +1,102 @@
+"""
+Per-deal feature contributions for tree ensemble risk models.
+
+Each split on a deal's decision path moves the prediction from the parent
+node's value to the child node's value; that change is credited to the
+split feature. Summed over trees, the contributions plus a bias term equal
+the model output, so every deal gets its own explanation.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from scipy.special import logit
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+
+@dataclass
+class TreeContributions:
+    """Bias and per-feature contributions for a batch of deals."""
+
+    bias: np.ndarray
+    contributions: np.ndarray
+
+
+def _add_tree_contributions(
+    tree: Any, X: np.ndarray, node_values: np.ndarray, contributions: np.ndarray
+) -> None:
+    """Walk one fitted tree for all rows at once, level by level."""
+    children_left = tree.children_left
+    children_right = tree.children_right
+    features = tree.feature
+    thresholds = tree.threshold
+
+    rows = np.arange(X.shape[0])
+    nodes = np.zeros(X.shape[0], dtype=np.intp)
+    rows = rows[children_left[nodes] != -1]
+    nodes = nodes[rows]
+    while rows.size:
+        split_features = features[nodes]
+        go_left = X[rows, split_features] <= thresholds[nodes]
+        children = np.where(go_left, children_left[nodes], children_right[nodes])
+        # Each row appears once per level, so plain fancy-index addition is safe.
+        contributions[rows, split_features] += node_values[children] - node_values[nodes]
+        internal = children_left[children] != -1
+        rows = rows[internal]
+        nodes = children[internal]
+
+
+def tree_feature_contributions(model: Any, X: pd.DataFrame) -> TreeContributions:
+    """
+    Compute per-deal feature contributions for a fitted tree ensemble.
+
+    For GradientBoostingClassifier contributions are in log-odds of the
+    positive class and bias + contributions.sum(axis=1) equals
+    decision_function(X). For RandomForestClassifier they are in probability
+    units and sum with the bias to predict_proba(X)[:, 1].
+
+    Args:
+        model: Fitted GradientBoostingClassifier or RandomForestClassifier.
+        X: Feature matrix in the training column order.
+
+    Returns:
+        TreeContributions with bias of shape (n,) and contributions of shape
+        (n, n_features).
+
+    Raises:
+        ValueError: If the model type is not supported.
+    """
+    # Trees compare float32 features, as in sklearn's own predict.
+    X_values = np.asarray(X, dtype=np.float32)
+    n_rows, n_features = X_values.shape
+    contributions = np.zeros((n_rows, n_features))
+
+    if isinstance(model, GradientBoostingClassifier):
+        if model.n_classes_ != 2:
+            raise ValueError("Only binary GradientBoostingClassifier models are supported")
+        if model.init_ == "zero":
+            bias = np.zeros(n_rows)
+        else:
+            bias = logit(model.init_.predict_proba(X_values)[:, 1])
+        for estimator in model.estimators_[:, 0]:
+            tree = estimator.tree_
+            node_values = model.learning_rate * tree.value[:, 0, 0]
+            _add_tree_contributions(tree, X_values, node_values, contributions)
+            bias = bias + node_values[0]
+        return TreeContributions(bias=bias, contributions=contributions)
+
+    if isinstance(model, RandomForestClassifier):
+        n_trees = len(model.estimators_)
+        bias = np.zeros(n_rows)
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            class_values = tree.value[:, 0, :]
+            positive = class_values[:, -1] / class_values.sum(axis=1)
+            node_values = positive / n_trees
+            _add_tree_contributions(tree, X_values, node_values, contributions)
+            bias = bias + node_values[0]
+        return TreeContributions(bias=bias, contributions=contributions)
+
+    raise ValueError(f"Unsupported model for tree contributions: {type(model).__name__}")
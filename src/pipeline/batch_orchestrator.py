@@ -0,0 +1,278 @@
+"""
+Multi-tenant batch scoring across a process pool.
+
+The model and feature transformer are handed to each worker once, through
+the pool initializer, instead of being pickled with every task. With the
+default fork start method on Linux they are inherited copy-on-write and not
+pickled at all. Each task only carries its tenant's file paths. Tenants with
+their own artifacts (a per-tenant bundle) are handed over the same way, and
+every other tenant is scored with the shared default artifacts.
+
+If a worker process dies (for example, killed for memory), the pool is
+broken for every task still pending in it. The tenants that had started are
+then rerun one at a time, each in its own single-worker pool, so only a
+tenant that crashes a worker on its own is marked failed; tenants that had
+not started are resubmitted to a fresh pool.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from data.data_loader import load_sales_data, read_source_columns
+from features.feature_transformer import RiskFeatureTransformer
+from pipeline.drift_monitor import FeatureHistograms, drift_report
+from pipeline.scoring import prepare_scoring_frame, score_csv_in_chunks, score_frame
+
+# Artifacts installed in each worker process by _init_worker.
+_WORKER_ARTIFACTS: Dict[str, Any] = {}
+
+# Model, fitted transformer and drift reference (or None) used to score a tenant.
+TenantArtifacts = Tuple[Any, RiskFeatureTransformer, Optional[FeatureHistograms]]
+
+
+@dataclass
+class TenantJob:
+    """One tenant partition to score."""
+
+    tenant_id: str
+    input_path: Path
+    output_path: Path
+    drift_path: Optional[Path] = None
+
+
+@dataclass
+class TenantResult:
+    """Outcome of scoring one tenant partition."""
+
+    tenant_id: str
+    succeeded: bool
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    drift_status: Optional[str] = None
+
+
+def _init_worker(
+    model: Any,
+    transformer: Optional[RiskFeatureTransformer],
+    drift_reference: Optional[FeatureHistograms] = None,
+    started: Optional[Sequence[int]] = None,
+    tenant_artifacts: Optional[Dict[str, TenantArtifacts]] = None,
+) -> None:
+    """Keep the shared artifacts for every task this worker runs."""
+    _WORKER_ARTIFACTS["default"] = (model, transformer, drift_reference)
+    _WORKER_ARTIFACTS["tenants"] = tenant_artifacts or {}
+    _WORKER_ARTIFACTS["started"] = started
+
+
+def score_tenant(
+    job: TenantJob,
+    model: Any,
+    transformer: RiskFeatureTransformer,
+    chunk_size: Optional[int] = None,
+    lean: bool = False,
+    drift_reference: Optional[FeatureHistograms] = None,
+) -> TenantResult:
+    """
+    Score one tenant's deals and write them to job.output_path.
+
+    Errors are captured in the result rather than raised, and a partially
+    written output file is removed, so one bad partition cannot affect the
+    others.
+
+    Args:
+        job: Tenant input and output paths.
+        model: Trained risk model.
+        transformer: Fitted feature transformer.
+        chunk_size: Stream CSV input in chunks of this many rows.
+        lean: Write input columns plus 'loss_probability' only.
+        drift_reference: Training histograms; with job.drift_path set, the
+            tenant's drift report is written there.
+
+    Returns:
+        TenantResult with row count, timing and drift status, or the error
+        message.
+    """
+    start = time.perf_counter()
+    drift = None
+    if drift_reference is not None and job.drift_path is not None:
+        drift = drift_reference.empty_copy()
+    try:
+        if chunk_size:
+            rows = score_csv_in_chunks(
+                job.input_path,
+                job.output_path,
+                model,
+                transformer,
+                chunk_size,
+                lean=lean,
+                drift=drift,
+            )
+        else:
+            df = load_sales_data(job.input_path, columns=read_source_columns(job.input_path))
+            scored = score_frame(
+                prepare_scoring_frame(df), model, transformer, lean=lean, drift=drift
+            )
+            job.output_path.parent.mkdir(parents=True, exist_ok=True)
+            scored.to_csv(job.output_path, index=False)
+            rows = len(scored)
+        drift_status = None
+        if drift is not None:
+            report = drift_report(drift_reference, drift)
+            job.drift_path.parent.mkdir(parents=True, exist_ok=True)
+            job.drift_path.write_text(
+                json.dumps(report, indent=2, allow_nan=False), encoding="utf-8"
+            )
+            drift_status = report["alert_status"]
+    except Exception as error:  # noqa: BLE001 - isolate tenant failures
+        job.output_path.unlink(missing_ok=True)
+        return TenantResult(
+            job.tenant_id,
+            succeeded=False,
+            seconds=time.perf_counter() - start,
+            error=f"{type(error).__name__}: {error}",
+        )
+    seconds = time.perf_counter() - start
+    return TenantResult(
+        job.tenant_id, succeeded=True, rows=rows, seconds=seconds, drift_status=drift_status
+    )
+
+
+def _score_tenant_in_worker(
+    job: TenantJob, chunk_size: Optional[int], lean: bool, position: int
+) -> TenantResult:
+    """Score one tenant with the artifacts installed by _init_worker."""
+    started = _WORKER_ARTIFACTS["started"]
+    if started is not None:
+        started[position] = 1
+    model, transformer, drift_reference = _WORKER_ARTIFACTS["tenants"].get(
+        job.tenant_id, _WORKER_ARTIFACTS["default"]
+    )
+    return score_tenant(job, model, transformer, chunk_size, lean, drift_reference)
+
+
+def _failed_result(job: TenantJob, error: str) -> TenantResult:
+    return TenantResult(job.tenant_id, succeeded=False, error=error)
+
+
+def _run_pool(
+    jobs: List[TenantJob],
+    positions: List[int],
+    max_workers: int,
+    initargs: Tuple[Any, ...],
+    chunk_size: Optional[int],
+    lean: bool,
+    results: List[Optional[TenantResult]],
+) -> List[int]:
+    """
+    Score jobs[positions] in one process pool, storing results by position.
+
+    Returns:
+        Positions left without a result because a worker process died.
+    """
+    unfinished = []
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(positions)),
+        initializer=_init_worker,
+        initargs=initargs,
+    ) as pool:
+        futures = {
+            pool.submit(
+                _score_tenant_in_worker, jobs[position], chunk_size, lean, position
+            ): position
+            for position in positions
+        }
+        for future in as_completed(futures):
+            position = futures[future]
+            try:
+                results[position] = future.result()
+            except BrokenProcessPool:
+                unfinished.append(position)
+            except Exception as error:  # noqa: BLE001 - task could not be run
+                results[position] = _failed_result(
+                    jobs[position], f"{type(error).__name__}: {error}"
+                )
+    return sorted(unfinished, key=positions.index)
+
+
+def score_tenants(
+    jobs: List[TenantJob],
+    model: Any,
+    transformer: Optional[RiskFeatureTransformer],
+    max_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    lean: bool = False,
+    drift_reference: Optional[FeatureHistograms] = None,
+    tenant_artifacts: Optional[Dict[str, TenantArtifacts]] = None,
+) -> List[TenantResult]:
+    """
+    Score many tenant partitions in parallel.
+
+    Larger inputs are submitted first so the pool does not finish on one
+    long straggler. A worker process that dies (for example, killed for
+    memory) fails only the tenant it was scoring when that tenant also
+    kills a worker when rerun alone; every other tenant is scored.
+
+    Args:
+        jobs: Tenant partitions to score.
+        model: Trained risk model, shared with every worker once; None when
+            every tenant has its own artifacts in tenant_artifacts.
+        transformer: Fitted feature transformer, shared with every worker
+            once; None under the same condition as model.
+        max_workers: Worker processes (default: CPU count).
+        chunk_size: Stream CSV input in chunks of this many rows.
+        lean: Write input columns plus 'loss_probability' only.
+        drift_reference: Training histograms, shared with every worker once;
+            jobs with a drift_path get a drift report.
+        tenant_artifacts: (model, transformer, drift_reference) by tenant id,
+            used instead of the shared artifacts for those tenants and
+            shared with every worker once.
+
+    Returns:
+        One TenantResult per job, in input order.
+
+    Raises:
+        ValueError: If a tenant's transformer is missing or not fitted.
+    """
+    tenant_artifacts = tenant_artifacts or {}
+    for job in jobs:
+        job_transformer = tenant_artifacts.get(job.tenant_id, (model, transformer, None))[1]
+        if job_transformer is None or not job_transformer.is_fitted:
+            raise ValueError(
+                f"Transformer for tenant '{job.tenant_id}' must be fitted before scoring tenants"
+            )
+
+    def input_size(position: int) -> int:
+        path = jobs[position].input_path
+        return path.stat().st_size if path.exists() else 0
+
+    max_workers = max_workers or os.cpu_count() or 1
+    results: List[Optional[TenantResult]] = [None] * len(jobs)
+    # Set by a worker when it starts a job, to tell crashed jobs from queued ones.
+    started = multiprocessing.RawArray("b", max(len(jobs), 1))
+    initargs = (model, transformer, drift_reference, started, tenant_artifacts)
+    pending = sorted(range(len(jobs)), key=input_size, reverse=True)
+    while pending:
+        unfinished = _run_pool(jobs, pending, max_workers, initargs, chunk_size, lean, results)
+        suspects = [position for position in unfinished if started[position]]
+        pending = [position for position in unfinished if not started[position]]
+        if unfinished and not suspects:
+            # The pool died before any job ran, for example in the initializer.
+            for position in unfinished:
+                results[position] = _failed_result(
+                    jobs[position], "BrokenProcessPool: worker process died before scoring"
+                )
+            break
+        for position in suspects:
+            if _run_pool(jobs, [position], 1, initargs, chunk_size, lean, results):
+                results[position] = _failed_result(
+                    jobs[position], "BrokenProcessPool: worker process died scoring this tenant"
+                )
+    return results
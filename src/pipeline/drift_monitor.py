@@ -0,0 +1,363 @@
+"""
+Feature and prediction drift monitoring on fixed-bin histograms.
+
+At training time each model feature and the predicted loss probability get
+bin edges at the deciles of held-out data, and FeatureHistograms counts
+those rows per bin, overall and per segment value. Scoring fills an empty
+copy with the same edges in the same pass that scores the deals: one
+searchsorted and one bincount over the joint segment cell per column, so
+the added cost is a few percent of a scoring run.
+drift_report compares the two with the population stability index (PSI)
+and a binned Kolmogorov-Smirnov statistic per feature, per segment value
+and for the predictions.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    DRIFT_BINS,
+    DRIFT_MIN_SEGMENT_DEALS,
+    DRIFT_PSI_ALERT,
+    DRIFT_PSI_WARNING,
+)
+from features.segment_encoding import SegmentEncoder
+
+PREDICTION_COLUMN = "loss_probability"
+# Share given to empty bins so PSI stays finite.
+_PSI_EPSILON = 1e-4
+# Largest joint (segment values x bins) table counted in one bincount.
+_MAX_JOINT_CELLS = 1 << 20
+
+
+class FeatureHistograms:
+    """
+    Per-bin counts of monitored columns, overall and per segment value.
+
+    Column c has len(edges[c]) + 1 value bins, bin i holding values in
+    (edges[i - 1], edges[i]], plus a last bin for missing values. Segment
+    tables have one row per known segment value and a last row for unknown
+    or missing values.
+
+    Attributes:
+        edges: Column -> ascending inner bin edges.
+        segment_values: Segment column -> known values, in row order.
+        counts: Column -> int64 counts per bin.
+        segment_counts: Segment column -> column -> int64 array of shape
+            (len(values) + 1, bins).
+        rows: Rows counted.
+    """
+
+    def __init__(self, edges: Dict[str, np.ndarray], segment_values: Dict[str, List[Any]]) -> None:
+        self.edges = {
+            column: np.asarray(values, dtype=np.float64) for column, values in edges.items()
+        }
+        self.segment_values = {segment: list(values) for segment, values in segment_values.items()}
+        self._encoder = SegmentEncoder(self.segment_values)
+        # NaN sorts after +inf, so with this sentinel searchsorted alone sends
+        # missing values to the last bin, without a separate isnan pass.
+        self._search_edges = {
+            column: np.append(column_edges, np.inf) for column, column_edges in self.edges.items()
+        }
+        self.rows = 0
+        self.counts = {
+            column: np.zeros(len(column_edges) + 2, dtype=np.int64)
+            for column, column_edges in self.edges.items()
+        }
+        self.segment_counts = {
+            segment: {
+                column: np.zeros((len(values) + 1, len(column_edges) + 2), dtype=np.int64)
+                for column, column_edges in self.edges.items()
+            }
+            for segment, values in self.segment_values.items()
+        }
+
+    @classmethod
+    def fit(
+        cls,
+        columns: Mapping[str, np.ndarray],
+        segments: pd.DataFrame,
+        segment_values: Dict[str, List[Any]],
+        bins: int = DRIFT_BINS,
+    ) -> "FeatureHistograms":
+        """
+        Place bin edges at the quantiles of reference data and count it.
+
+        Repeated quantiles collapse, so a binary feature gets two value bins.
+
+        Args:
+            columns: Column name -> reference values.
+            segments: Frame with the segment columns, aligned with columns.
+            segment_values: Segment column -> known values (for example the
+                transformer's segment_encoder.vocabularies).
+            bins: Value bins per column for continuous data.
+
+        Returns:
+            FeatureHistograms holding the reference counts.
+        """
+        probabilities = np.linspace(0, 1, bins + 1)[1:-1]
+        edges = {}
+        for column, values in columns.items():
+            values = np.asarray(values, dtype=np.float64)
+            values = values[~np.isnan(values)]
+            edges[column] = np.unique(np.quantile(values, probabilities)) if len(values) else []
+        return cls(edges, segment_values).update(columns, segments)
+
+    def empty_copy(self) -> "FeatureHistograms":
+        """Histograms with the same bins and no counts, for new data."""
+        return FeatureHistograms(self.edges, self.segment_values)
+
+    def update(
+        self, columns: Mapping[str, np.ndarray], segments: pd.DataFrame
+    ) -> "FeatureHistograms":
+        """
+        Count a batch of rows.
+
+        Args:
+            columns: Column name -> values for every monitored column.
+            segments: Frame with the segment columns, aligned with columns;
+                segment columns it lacks are counted as unknown.
+
+        Returns:
+            self.
+        """
+        n_rows = len(segments)
+        segment_rows = {}
+        for segment, values in self.segment_values.items():
+            if segment in segments.columns:
+                codes = self._encoder.encode(segments[segment], segment)
+                segment_rows[segment] = np.where(codes < 0, len(values), codes)
+            else:
+                segment_rows[segment] = np.full(n_rows, len(values))
+
+        # One bincount per column over the joint segment cell, marginalised
+        # afterwards, costs far less than one bincount per column and segment.
+        shape = tuple(len(values) + 1 for values in self.segment_values.values())
+        max_bins = max((len(edges) + 2 for edges in self.edges.values()), default=0)
+        n_cells = int(np.prod(shape))
+        joint = n_cells * max_bins <= _MAX_JOINT_CELLS
+        if joint:
+            cells = np.zeros(n_rows, dtype=np.intp)
+            for size, rows in zip(shape, segment_rows.values()):
+                cells *= size
+                cells += rows
+            scaled_cells: Dict[int, np.ndarray] = {}
+
+        for column, edges in self.edges.items():
+            n_bins = len(edges) + 2
+            values = np.asarray(columns[column], dtype=np.float64)
+            bins = np.searchsorted(self._search_edges[column], values, side="left")
+            if joint:
+                if n_bins not in scaled_cells:
+                    scaled_cells[n_bins] = cells * n_bins
+                bins += scaled_cells[n_bins]
+                cells_by_bin = np.bincount(bins, minlength=n_cells * n_bins)
+                cells_by_bin = cells_by_bin.reshape(shape + (n_bins,))
+                self.counts[column] += cells_by_bin.reshape(-1, n_bins).sum(axis=0)
+                for axis, segment in enumerate(self.segment_values):
+                    other_axes = tuple(other for other in range(len(shape)) if other != axis)
+                    self.segment_counts[segment][column] += cells_by_bin.sum(axis=other_axes)
+            else:
+                self.counts[column] += np.bincount(bins, minlength=n_bins)
+                for segment, rows in segment_rows.items():
+                    table = self.segment_counts[segment][column]
+                    table += np.bincount(rows * n_bins + bins, minlength=table.size).reshape(
+                        table.shape
+                    )
+        self.rows += n_rows
+        return self
+
+    def merge(self, other: "FeatureHistograms") -> "FeatureHistograms":
+        """Fold in counts from histograms with the same bins, e.g. another worker's."""
+        if other.edges.keys() != self.edges.keys() or other.segment_values != self.segment_values:
+            raise ValueError("Cannot merge histograms with different columns or segments")
+        for column, counts in other.counts.items():
+            self.counts[column] += counts
+        for segment, tables in other.segment_counts.items():
+            for column, table in tables.items():
+                self.segment_counts[segment][column] += table
+        self.rows += other.rows
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialisable edges and counts."""
+        return {
+            "rows": self.rows,
+            "edges": {column: edges.tolist() for column, edges in self.edges.items()},
+            "segment_values": self.segment_values,
+            "counts": {column: counts.tolist() for column, counts in self.counts.items()},
+            "segment_counts": {
+                segment: {column: table.tolist() for column, table in tables.items()}
+                for segment, tables in self.segment_counts.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FeatureHistograms":
+        """Rebuild histograms written by to_dict."""
+        histograms = cls(data["edges"], data["segment_values"])
+        histograms.rows = data["rows"]
+        for column, counts in data["counts"].items():
+            histograms.counts[column] = np.asarray(counts, dtype=np.int64)
+        for segment, tables in data["segment_counts"].items():
+            for column, table in tables.items():
+                histograms.segment_counts[segment][column] = np.asarray(table, dtype=np.int64)
+        return histograms
+
+    def save(self, path: Path) -> None:
+        """Write the histograms as JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), default=str), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "FeatureHistograms":
+        """Read histograms written by save."""
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def monitored_columns(
+    features: Mapping[str, np.ndarray], loss_probability: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Model feature columns plus the predictions, keyed as FeatureHistograms expects."""
+    columns = dict(features)
+    columns[PREDICTION_COLUMN] = loss_probability
+    return columns
+
+
+def population_stability_index(reference: np.ndarray, current: np.ndarray) -> float:
+    """
+    PSI between two count vectors over the same bins.
+
+    Empty bins are given a share of 1e-4 so the index stays finite. Below
+    DRIFT_PSI_WARNING (0.1) is usually read as stable and above
+    DRIFT_PSI_ALERT (0.25) as a significant shift.
+
+    Args:
+        reference: Reference counts per bin.
+        current: Current counts per bin.
+
+    Returns:
+        PSI; NaN if either side has no rows.
+    """
+    if reference.sum() == 0 or current.sum() == 0:
+        return float("nan")
+    expected = np.maximum(reference / reference.sum(), _PSI_EPSILON)
+    actual = np.maximum(current / current.sum(), _PSI_EPSILON)
+    return float(((actual - expected) * np.log(actual / expected)).sum())
+
+
+def binned_ks_statistic(reference: np.ndarray, current: np.ndarray) -> float:
+    """
+    Largest gap between the two empirical CDFs at the bin edges.
+
+    The last (missing value) bin is left out. Because only bin edges are
+    compared, this is a lower bound on the exact two-sample KS statistic.
+
+    Args:
+        reference: Reference counts per bin, missing bin last.
+        current: Current counts per bin, missing bin last.
+
+    Returns:
+        KS statistic in [0, 1]; NaN if either side has no values.
+    """
+    reference, current = reference[:-1], current[:-1]
+    if reference.sum() == 0 or current.sum() == 0:
+        return float("nan")
+    gap = np.cumsum(reference) / reference.sum() - np.cumsum(current) / current.sum()
+    return float(np.abs(gap).max())
+
+
+def drift_status(psi: float) -> str:
+    """'stable', 'warning' or 'drift' for a PSI value (NaN counts as stable)."""
+    if psi >= DRIFT_PSI_ALERT:
+        return "drift"
+    if psi >= DRIFT_PSI_WARNING:
+        return "warning"
+    return "stable"
+
+
+def _rounded(value: float) -> Optional[float]:
+    """Value rounded for the report; None (JSON null) when undefined."""
+    return None if np.isnan(value) else round(value, 6)
+
+
+def _comparison(reference: np.ndarray, current: np.ndarray) -> Dict[str, Any]:
+    psi = population_stability_index(reference, current)
+    return {
+        "psi": _rounded(psi),
+        "ks": _rounded(binned_ks_statistic(reference, current)),
+        "status": drift_status(psi),
+    }
+
+
+def drift_report(
+    reference: FeatureHistograms,
+    current: FeatureHistograms,
+    min_segment_deals: int = DRIFT_MIN_SEGMENT_DEALS,
+) -> Dict[str, Any]:
+    """
+    Compare scored deals against the training reference.
+
+    Args:
+        reference: Histograms saved at training time.
+        current: Histograms filled while scoring (from reference.empty_copy()).
+        min_segment_deals: Segment values with fewer scored deals are skipped,
+            since PSI on a handful of rows is mostly noise.
+
+    Returns:
+        Dictionary with 'rows', 'reference_rows', per-column 'features'
+        (psi, ks, status), 'segments' (segment -> value -> column -> psi, ks,
+        status), 'feature_drift_score' (largest feature PSI),
+        'prediction_drift_score' (PSI of loss_probability) and
+        'alert_status' ('healthy', 'warning' or 'drift'). Scores that are
+        undefined because a side has no rows are None, so the report is
+        valid JSON.
+    """
+    features = {
+        column: _comparison(reference.counts[column], current.counts[column])
+        for column in reference.edges
+    }
+    segments: Dict[str, Dict[str, Any]] = {}
+    for segment, values in reference.segment_values.items():
+        segments[segment] = {}
+        tables = current.segment_counts[segment]
+        if not tables:
+            continue
+        # Every column's table counts each row once, so any of them gives the deal count.
+        deals = next(iter(tables.values())).sum(axis=1)
+        for row, value in enumerate(values):
+            if deals[row] < min_segment_deals:
+                continue
+            segments[segment][str(value)] = {
+                column: _comparison(
+                    reference.segment_counts[segment][column][row],
+                    current.segment_counts[segment][column][row],
+                )
+                for column in reference.edges
+            }
+
+    feature_scores = [
+        result["psi"]
+        for column, result in features.items()
+        if column != PREDICTION_COLUMN and result["psi"] is not None
+    ]
+    feature_score = max(feature_scores, default=None)
+    prediction_score = features.get(PREDICTION_COLUMN, {}).get("psi")
+    worst = max(
+        (score for score in (feature_score, prediction_score) if score is not None),
+        default=0.0,
+    )
+    status = drift_status(worst)
+    return {
+        "rows": current.rows,
+        "reference_rows": reference.rows,
+        "feature_drift_score": feature_score,
+        "prediction_drift_score": prediction_score,
+        "alert_status": "healthy" if status == "stable" else status,
+        "features": features,
+        "segments": segments,
+    }
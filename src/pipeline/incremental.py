@@ -0,0 +1,219 @@
+"""
+Incremental rescoring of an open pipeline.
+
+Each deal's raw feature inputs are hashed into a 64-bit fingerprint. A state
+store keeps, per deal_id, the fingerprint and loss probability from the
+previous run together with a hash of the scoring artifacts (model, segment
+tables and feature statistics). The next run engineers features and calls
+predict_proba only for deals that are new or whose fingerprint changed, and
+carries every other score forward. When the artifact hash differs from the
+stored one, every deal is rescored.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import FEATURE_INPUT_COLUMNS
+from data.data_loader import DATE_COLUMNS
+from features.feature_store import FeatureStore
+from features.feature_transformer import RiskFeatureTransformer
+from pipeline.risk_digest import add_risk_columns
+from pipeline.scoring import prepare_scoring_frame, score_frame
+
+# Bump when the fingerprint definition or state layout changes.
+STATE_FORMAT_VERSION = 1
+
+
+@dataclass
+class IncrementalScoringStats:
+    """What an incremental run rescored and why."""
+
+    total_deals: int
+    rescored: int
+    carried_forward: int
+    full_rescore_reason: Optional[str]
+
+
+def deal_fingerprints(df: pd.DataFrame, columns: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Hash each deal's feature inputs.
+
+    Values are normalised first (categoricals and strings hash by value,
+    dates to datetime64[ns], numbers to float64), so the same deal gets the
+    same fingerprint whatever dtypes the loader chose for this file.
+
+    Args:
+        df: Deals with the fingerprint columns.
+        columns: Columns to hash (default: FEATURE_INPUT_COLUMNS).
+
+    Returns:
+        uint64 array with one fingerprint per row.
+    """
+    columns = columns or FEATURE_INPUT_COLUMNS
+    normalized = {}
+    for column in columns:
+        values = df[column]
+        if column in DATE_COLUMNS:
+            values = pd.to_datetime(values).astype("datetime64[ns]")
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            values = values.astype(np.float64)
+        normalized[column] = values
+    frame = pd.DataFrame(normalized, index=df.index, copy=False)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def artifact_version(model: Any, transformer: RiskFeatureTransformer) -> str:
+    """
+    Hash the scoring artifacts whose change invalidates stored scores.
+
+    Args:
+        model: Model with predict_proba.
+        transformer: Fitted feature transformer.
+
+    Returns:
+        SHA-256 hex digest of the pickled model and the transformer's
+        segment win rates, overall win rate, feature statistics and rolling
+        win rate tables.
+    """
+    digest = hashlib.sha256(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    statistics = {
+        "segment_probs": transformer.segment_probs,
+        "overall_win_rate": transformer.overall_win_rate,
+        "feature_stats": transformer.feature_stats,
+    }
+    if transformer.rolling_win_rates is not None:
+        statistics["rolling_win_rates"] = transformer.rolling_win_rates.to_dict()
+    digest.update(json.dumps(statistics, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ScoringStateStore:
+    """
+    Pickle file holding the previous run's fingerprints and scores.
+
+    The frame is indexed by deal_id with 'fingerprint' (uint64) and
+    'loss_probability' columns.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def load(self) -> Tuple[Optional[str], pd.DataFrame]:
+        """
+        Read the stored state.
+
+        Returns:
+            Tuple of (artifact version, scores frame); (None, empty frame)
+            when there is no usable state.
+        """
+        empty = pd.DataFrame(
+            {"fingerprint": pd.Series(dtype=np.uint64), "loss_probability": pd.Series(dtype=float)}
+        )
+        if not self.path.exists():
+            return None, empty
+        state = pd.read_pickle(self.path)
+        if state.get("format_version") != STATE_FORMAT_VERSION:
+            return None, empty
+        return state["artifact_version"], state["scores"]
+
+    def save(self, version: str, scores: pd.DataFrame) -> None:
+        """
+        Replace the stored state atomically.
+
+        Args:
+            version: Artifact version the scores were produced with.
+            scores: Frame indexed by deal_id with fingerprint and loss_probability.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        state = {
+            "format_version": STATE_FORMAT_VERSION,
+            "artifact_version": version,
+            "scores": scores,
+        }
+        pd.to_pickle(state, temporary)
+        os.replace(temporary, self.path)
+
+
+def score_incrementally(
+    df: pd.DataFrame,
+    model: Any,
+    transformer: RiskFeatureTransformer,
+    store: ScoringStateStore,
+    feature_store: Optional[FeatureStore] = None,
+) -> Tuple[pd.DataFrame, IncrementalScoringStats]:
+    """
+    Score raw deals, reusing stored scores for unchanged deals.
+
+    Deals absent from this run are dropped from the state, so closed deals
+    leave the store as they leave the pipeline.
+
+    Args:
+        df: Raw deals from load_sales_data with a unique 'deal_id'; changed
+            deals are prepared on a copy, df itself is not modified.
+        model: Trained risk model.
+        transformer: Fitted feature transformer.
+        store: State from the previous run; overwritten with this run's.
+        feature_store: Read features of rescored deals through this store.
+
+    Returns:
+        Tuple of (df's columns plus 'loss_probability', 'risk_score' and
+        'risk_category', run statistics).
+
+    Raises:
+        ValueError: If the transformer is unfitted or deal_ids repeat.
+    """
+    if not transformer.is_fitted:
+        raise ValueError("Incremental scoring needs a fitted RiskFeatureTransformer")
+    if df["deal_id"].duplicated().any():
+        raise ValueError("Incremental scoring needs unique deal_id values")
+
+    fingerprints = deal_fingerprints(df)
+    version = artifact_version(model, transformer)
+    stored_version, stored = store.load()
+
+    reason = None
+    if stored_version is None:
+        reason = "no previous state"
+    elif stored_version != version:
+        reason = "model or segment tables changed"
+
+    deal_ids = pd.Index(df["deal_id"].astype(str), name="deal_id")
+    loss_probability = np.full(len(df), np.nan)
+    changed = np.ones(len(df), dtype=bool)
+    if reason is None:
+        # Positional lookup keeps fingerprints uint64; reindex would cast them to float.
+        positions = stored.index.get_indexer(deal_ids)
+        known = np.flatnonzero(positions >= 0)
+        previous = positions[known]
+        same = stored["fingerprint"].to_numpy()[previous] == fingerprints[known]
+        changed[known[same]] = False
+        loss_probability[known[same]] = stored["loss_probability"].to_numpy()[previous[same]]
+
+    if changed.any():
+        subset = prepare_scoring_frame(df.loc[changed].copy())
+        scored = score_frame(subset, model, transformer, lean=True, feature_store=feature_store)
+        loss_probability[changed] = scored["loss_probability"].to_numpy()
+
+    store.save(
+        version,
+        pd.DataFrame(
+            {"fingerprint": fingerprints, "loss_probability": loss_probability}, index=deal_ids
+        ),
+    )
+    result = add_risk_columns(df.assign(loss_probability=loss_probability))
+    stats = IncrementalScoringStats(
+        total_deals=len(df),
+        rescored=int(changed.sum()),
+        carried_forward=int((~changed).sum()),
+        full_rescore_reason=reason,
+    )
+    return result, stats
@@ -0,0 +1,157 @@
+"""
+Risk bucketing of scored deals and per-manager top-N risk digests.
+
+Scores and categories are computed for whole columns at once: one multiply
+and round for the 0-100 score, one searchsorted over the RISK_THRESHOLDS
+upper bounds for the category. Digests pick each group's N riskiest deals
+with np.partition on that group's slice, so only N rows per group are
+ever sorted.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import RISK_THRESHOLDS
+from utils.instrumentation import instrumented
+
+RISK_CATEGORIES = list(RISK_THRESHOLDS)
+_RISK_UPPER_BOUNDS = np.array([upper for _, upper in RISK_THRESHOLDS.values()])
+
+DIGEST_COLUMNS = [
+    "deal_id",
+    "sales_rep_id",
+    "region",
+    "industry",
+    "deal_amount",
+    "loss_probability",
+    "risk_score",
+    "risk_category",
+]
+
+
+def risk_scores_from_probabilities(loss_probability: np.ndarray) -> np.ndarray:
+    """
+    Convert loss probabilities to 0-100 risk scores.
+
+    Rounds half to even, like risk_score_from_probability.
+
+    Args:
+        loss_probability: Predicted probabilities that deals are lost.
+
+    Returns:
+        int64 array of risk scores.
+    """
+    return np.rint(np.asarray(loss_probability, dtype=np.float64) * 100).astype(np.int64)
+
+
+def risk_categories_for_scores(risk_scores: np.ndarray) -> pd.Categorical:
+    """
+    Map 0-100 risk scores to their RISK_THRESHOLDS categories.
+
+    Args:
+        risk_scores: Integer risk scores.
+
+    Returns:
+        Ordered categorical of category labels, low to critical.
+    """
+    codes = np.searchsorted(_RISK_UPPER_BOUNDS, risk_scores, side="left")
+    codes = np.minimum(codes, len(RISK_CATEGORIES) - 1)
+    return pd.Categorical.from_codes(codes, categories=RISK_CATEGORIES, ordered=True)
+
+
+@instrumented()
+def add_risk_columns(
+    df: pd.DataFrame, probability_column: str = "loss_probability"
+) -> pd.DataFrame:
+    """
+    Add 'risk_score' and 'risk_category' to scored deals in place.
+
+    Args:
+        df: Deals with a loss probability column.
+        probability_column: Column holding the loss probabilities.
+
+    Returns:
+        df with the two columns added.
+    """
+    risk_scores = risk_scores_from_probabilities(df[probability_column].to_numpy())
+    df["risk_score"] = risk_scores
+    df["risk_category"] = risk_categories_for_scores(risk_scores)
+    return df
+
+
+def _top_positions(scores: np.ndarray, n: int) -> np.ndarray:
+    """Positions of the n highest scores, highest first; ties keep input order."""
+    if len(scores) > n:
+        # Partition finds the n-th highest score; deals tied with it are
+        # taken in input order so the digest does not depend on partitioning.
+        cutoff = -np.partition(-scores, n - 1)[n - 1]
+        above = np.flatnonzero(scores > cutoff)
+        tied = np.flatnonzero(scores == cutoff)[: n - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+@instrumented()
+def top_risk_deals(
+    df: pd.DataFrame,
+    by: str = "sales_rep_id",
+    n: int = 10,
+    score_column: str = "loss_probability",
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Select each group's n riskiest deals.
+
+    Rows are bucketed by group with one stable argsort of the integer group
+    codes (a radix sort below 32,767 groups); within a group only the top n
+    are partitioned out and sorted.
+
+    Args:
+        df: Scored deals.
+        by: Column to group by, for example 'sales_rep_id' or 'region'.
+        n: Deals per group.
+        score_column: Column ranked on, highest first.
+        columns: Columns to include (default: the DIGEST_COLUMNS present in df).
+
+    Returns:
+        DataFrame with by, 'rank' (1 = riskiest) and columns, ordered by group
+        then rank. Deals with no group value are left out.
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    columns = columns or [column for column in DIGEST_COLUMNS if column in df.columns]
+    columns = [column for column in columns if column != by]
+
+    codes, groups = pd.factorize(df[by], sort=True)
+    scores = df[score_column].to_numpy(dtype=np.float64)
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    if len(groups) < np.iinfo(np.int16).max:
+        # numpy's stable sort is a radix sort for 16-bit integers.
+        codes = codes.astype(np.int16)
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[codes >= 0], minlength=len(groups))
+    # Missing group values (code -1) sort first; skip past them.
+    start = int((codes < 0).sum())
+
+    selected = []
+    ranks = []
+    for count in counts:
+        members = order[start : start + count]
+        start += count
+        top = members[_top_positions(scores[members], n)]
+        selected.append(top)
+        ranks.append(np.arange(1, len(top) + 1))
+    if selected:
+        positions = np.concatenate(selected)
+        rank = np.concatenate(ranks)
+    else:
+        positions = np.empty(0, dtype=np.int64)
+        rank = np.empty(0, dtype=np.int64)
+
+    digest = df.iloc[positions][[by] + columns].reset_index(drop=True)
+    digest.insert(1, "rank", rank)
+    return digest
@@ -0,0 +1,181 @@
+"""
+Deal scoring pipeline shared by the scoring scripts.
+"""
+
+from pathlib import Path
+from typing import Any, Iterator, List, Optional
+
+import pandas as pd
+
+from config import MODEL_FEATURES
+from data.data_loader import (
+    add_temporal_features,
+    iter_sales_data_chunks,
+    list_data_files,
+    parse_date_columns,
+    prepare_target_variable,
+    read_source_columns,
+)
+from features.feature_engineering import FeatureStatisticsAccumulator
+from features.feature_store import FeatureStore, cached_transform_matrix
+from features.feature_transformer import RiskFeatureTransformer
+from pipeline.drift_monitor import FeatureHistograms, monitored_columns
+from pipeline.risk_digest import add_risk_columns
+from utils.instrumentation import stage
+
+
+def prepare_scoring_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parse dates and add target and temporal columns to raw deals.
+
+    Args:
+        df: Raw deals; modified in place.
+
+    Returns:
+        DataFrame ready for feature engineering.
+    """
+    parse_date_columns(df)
+    if "outcome" in df.columns:
+        df = prepare_target_variable(df, copy=False)
+    return add_temporal_features(df, copy=False)
+
+
+def score_frame(
+    df: pd.DataFrame,
+    model: Any,
+    transformer: RiskFeatureTransformer,
+    lean: bool = False,
+    feature_store: Optional[FeatureStore] = None,
+    drift: Optional[FeatureHistograms] = None,
+) -> pd.DataFrame:
+    """
+    Engineer features for prepared deals and add 'loss_probability'.
+
+    Args:
+        df: Prepared deals from prepare_scoring_frame.
+        model: Trained risk model.
+        transformer: Fitted feature transformer.
+        lean: Build only MODEL_FEATURES into one matrix and add
+            'loss_probability', 'risk_score' and 'risk_category' to df in
+            place instead of returning every engineered column.
+        feature_store: Read model features through this store (lean only).
+        drift: Histograms (from the drift reference's empty_copy) to add
+            this batch's model features and loss probabilities to.
+
+    Returns:
+        DataFrame with engineered features (or just df when lean), loss
+        probabilities, risk scores and risk categories.
+
+    Raises:
+        ValueError: If a feature store is given without lean.
+    """
+    if feature_store is not None and not lean:
+        raise ValueError("A feature store caches model features only; use lean scoring")
+    if lean:
+        with stage("scoring.transform_matrix", rows=len(df)):
+            if feature_store is not None:
+                X = cached_transform_matrix(df, transformer, feature_store, MODEL_FEATURES)
+            else:
+                X = transformer.transform_matrix(df, MODEL_FEATURES)
+        with stage("scoring.predict_proba", rows=len(df)):
+            # Wrapping the single float block keeps feature names without a copy.
+            df["loss_probability"] = model.predict_proba(
+                pd.DataFrame(X, columns=MODEL_FEATURES, index=df.index, copy=False)
+            )[:, 1]
+        if drift is not None:
+            with stage("scoring.drift", rows=len(df)):
+                features = {column: X[:, i] for i, column in enumerate(MODEL_FEATURES)}
+                drift.update(monitored_columns(features, df["loss_probability"].to_numpy()), df)
+        return add_risk_columns(df)
+    with stage("scoring.transform", rows=len(df)):
+        df_features = transformer.transform(df)
+    with stage("scoring.predict_proba", rows=len(df)):
+        df_features["loss_probability"] = model.predict_proba(df_features[MODEL_FEATURES])[:, 1]
+    if drift is not None:
+        with stage("scoring.drift", rows=len(df)):
+            features = {column: df_features[column].to_numpy() for column in MODEL_FEATURES}
+            drift.update(
+                monitored_columns(features, df_features["loss_probability"].to_numpy()),
+                df_features,
+            )
+    return add_risk_columns(df_features)
+
+
+def iter_deal_chunks(
+    input_path: Path, chunk_size: int, usecols: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read deals in chunks of at most chunk_size rows.
+
+    Args:
+        input_path: CSV, Parquet or Feather file, or a directory of them such
+            as a CRM ingestion export (read file by file in sorted order).
+        chunk_size: Rows per chunk.
+        usecols: Optional subset of columns to read.
+
+    Yields:
+        DataFrame chunks with the load_sales_data schema and unparsed dates.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer")
+    for path in list_data_files(input_path):
+        yield from iter_sales_data_chunks(path, chunk_size, columns=usecols, parse_dates=False)
+
+
+def score_csv_in_chunks(
+    input_path: Path,
+    output_path: Path,
+    model: Any,
+    transformer: RiskFeatureTransformer,
+    chunk_size: int,
+    lean: bool = False,
+    feature_store: Optional[FeatureStore] = None,
+    drift: Optional[FeatureHistograms] = None,
+) -> int:
+    """
+    Score a deals file or directory chunk by chunk with bounded memory.
+
+    When the transformer is not fitted (no training artifacts), a first pass
+    reads only the columns needed for its statistics so every chunk is scored
+    exactly as the full file would be in one shot. Each chunk is then
+    engineered, scored and appended to output_path.
+
+    Args:
+        input_path: CSV, Parquet or Feather file, or a directory of them.
+        output_path: Path to output CSV (overwritten).
+        model: Trained risk model.
+        transformer: Feature transformer, fitted on the input if needed.
+        chunk_size: Rows per chunk.
+        lean: Write input columns plus the risk columns only (see score_frame).
+        feature_store: Read model features through this store (lean only).
+        drift: Histograms to add every chunk's features and predictions to.
+
+    Returns:
+        Number of scored rows written.
+    """
+    if not transformer.is_fitted:
+        header = read_source_columns(input_path)
+        wanted = set(FeatureStatisticsAccumulator.required_columns) | {"outcome"}
+        usecols = [column for column in header if column in wanted]
+        transformer.fit_chunks(iter_deal_chunks(input_path, chunk_size, usecols=usecols))
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    rows_written = 0
+    for chunk in iter_deal_chunks(input_path, chunk_size):
+        scored = score_frame(
+            prepare_scoring_frame(chunk),
+            model,
+            transformer,
+            lean=lean,
+            feature_store=feature_store,
+            drift=drift,
+        )
+        with stage("scoring.to_csv", rows=len(scored)):
+            scored.to_csv(
+                output_path,
+                mode="w" if rows_written == 0 else "a",
+                header=rows_written == 0,
+                index=False,
+            )
+        rows_written += len(scored)
+    return rows_written
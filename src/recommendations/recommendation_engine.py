@@ -3,11 +3,13 @@ Recommendation engine for deal risk scoring.
 """
 
 from dataclasses import dataclass
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+RECOMMENDATION_COLUMNS = ["priority", "action", "rationale"]
+
 
 @dataclass
 class RiskFactor:
@@ -27,20 +29,16 @@ class Recommendation:
     rationale: str
 
 
-def identify_risk_factors(
-    deal_features: pd.Series, model: Any, feature_columns: List[str], top_n: int = 3
-) -> List[RiskFactor]:
+def rank_feature_importances(model: Any, feature_columns: List[str]) -> List[Tuple[str, float]]:
     """
-    Identify top risk factors for a specific deal.
+    Rank features by the model's global importance, highest first.
 
     Args:
-        deal_features: Single deal's feature values.
         model: Trained model.
         feature_columns: List of feature names.
-        top_n: Number of top factors to return.
 
     Returns:
-        List of RiskFactor objects.
+        List of (feature, importance) pairs.
     """
     if hasattr(model, "feature_importances_"):
         importances = model.feature_importances_
@@ -49,7 +47,34 @@ def identify_risk_factors(
     else:
         importances = np.ones(len(feature_columns))
 
-    pairs = sorted(zip(feature_columns, importances), key=lambda x: x[1], reverse=True)
+    return sorted(zip(feature_columns, importances), key=lambda x: x[1], reverse=True)
+
+
+def identify_risk_factors(
+    deal_features: pd.Series,
+    model: Any,
+    feature_columns: List[str],
+    top_n: int = 3,
+    importances: Optional[np.ndarray] = None,
+) -> List[RiskFactor]:
+    """
+    Identify top risk factors for a specific deal.
+
+    Args:
+        deal_features: Single deal's feature values.
+        model: Trained model.
+        feature_columns: List of feature names.
+        top_n: Number of top factors to return.
+        importances: Optional deal-specific importances, for example a row
+            of tree_feature_contributions; global importances when omitted.
+
+    Returns:
+        List of RiskFactor objects.
+    """
+    if importances is None:
+        pairs = rank_feature_importances(model, feature_columns)
+    else:
+        pairs = sorted(zip(feature_columns, importances), key=lambda x: x[1], reverse=True)
     risk_factors: List[RiskFactor] = []
 
     for feature, importance in pairs[:top_n]:
@@ -138,3 +163,187 @@ def generate_recommendations(
         )
 
     return recommendations
+
+
+def _format_values(template: str, values: pd.Series) -> pd.Series:
+    """Format numeric values with a printf-style template, keeping the index."""
+    formatted = np.char.mod(template, values.to_numpy(dtype=float))
+    return pd.Series(formatted, index=values.index, dtype=object)
+
+
+def _describe_factor(feature: str, deals: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+    """Vectorized equivalent of the descriptions built by identify_risk_factors."""
+
+    def column(name: str, default: Any) -> pd.Series:
+        if name in deals.columns:
+            return deals[name][rows]
+        return pd.Series(default, index=deals.index[rows])
+
+    value = column(feature, None)
+    if feature.startswith("win_prob_"):
+        segment_type = feature.replace("win_prob_", "")
+        segment_value = column(segment_type, "Unknown").astype(object).astype(str)
+        segment_label = segment_type.replace("_", " ").title()
+        win_rate = _format_values("%.2f", value)
+        described = segment_label + ": " + segment_value + " (win rate: " + win_rate + ")"
+    elif feature == "is_long_cycle":
+        generic = f"{feature}: " + value.astype(str)
+        cycle_days = column("sales_cycle_days", 0)
+        long_cycle = "Long sales cycle (" + _format_values("%.0f", cycle_days) + " days)"
+        described = generic.where(value != 1, long_cycle)
+    elif feature == "is_large_deal":
+        described = column("deal_amount", 0).map("Deal size: ${:,.0f}".format)
+    else:
+        described = f"{feature}: " + value.astype(str)
+    return described.to_numpy(dtype=object)
+
+
+def identify_risk_factors_batch(
+    deals: pd.DataFrame,
+    model: Any,
+    feature_columns: List[str],
+    top_n: int = 3,
+    importances: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    Identify top risk factors for every deal in a scored DataFrame.
+
+    Importances are ranked once for the whole batch. Rows match
+    identify_risk_factors applied deal by deal.
+
+    Args:
+        deals: Scored deals with feature and raw columns.
+        model: Trained model.
+        feature_columns: List of feature names.
+        top_n: Number of top factors to return.
+        importances: Optional per-deal importances of shape
+            (len(deals), len(feature_columns)), such as the contributions
+            from tree_feature_contributions; global model importances are
+            used when omitted.
+
+    Returns:
+        DataFrame indexed like deals with 'risk_factor_{i}',
+        'risk_factor_{i}_impact' and 'risk_factor_{i}_description' columns
+        for i in 1..top_n.
+    """
+    top_n = min(top_n, len(feature_columns))
+    if importances is None:
+        ranked = rank_feature_importances(model, feature_columns)[:top_n]
+        positions = np.array([feature_columns.index(feature) for feature, _ in ranked])
+        top_index = np.tile(positions, (len(deals), 1))
+        top_impact = np.tile([float(impact) for _, impact in ranked], (len(deals), 1))
+    else:
+        # Stable sort on negated values keeps the earlier feature first on ties.
+        order = np.argsort(-importances, axis=1, kind="stable")
+        top_index = order[:, :top_n]
+        top_impact = np.take_along_axis(importances, top_index, axis=1).astype(float)
+
+    names = np.asarray(feature_columns, dtype=object)
+    result = pd.DataFrame(index=deals.index)
+    for rank in range(top_n):
+        column = f"risk_factor_{rank + 1}"
+        rank_index = top_index[:, rank]
+        descriptions = np.empty(len(deals), dtype=object)
+        for position in np.unique(rank_index):
+            rows = rank_index == position
+            descriptions[rows] = _describe_factor(names[position], deals, rows)
+        result[column] = names[rank_index]
+        result[f"{column}_impact"] = top_impact[:, rank]
+        result[f"{column}_description"] = descriptions
+    return result
+
+
+def generate_recommendations_batch(
+    risk_categories: pd.Series, risk_factors: pd.DataFrame, deals: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Generate action recommendations for many deals with vectorized rules.
+
+    Args:
+        risk_categories: Risk category label per deal, indexed like deals.
+        risk_factors: Output of identify_risk_factors_batch.
+        deals: Deals' feature values.
+
+    Returns:
+        Long DataFrame with one row per recommendation, indexed by the deal
+        index and ordered as generate_recommendations would list them, with
+        'priority', 'action' and 'rationale' columns.
+    """
+    n_deals = len(deals)
+    positions = np.arange(n_deals)
+    parts: List[pd.DataFrame] = []
+
+    def add(rule_order: int, mask: np.ndarray, priority: str, action: str, rationale: Any) -> None:
+        rows = positions[mask]
+        if len(rows) == 0:
+            return
+        if not np.isscalar(rationale):
+            rationale = np.asarray(rationale, dtype=object)[mask]
+        parts.append(
+            pd.DataFrame(
+                {
+                    "_position": rows,
+                    "_order": rule_order,
+                    "priority": priority,
+                    "action": action,
+                    "rationale": rationale,
+                }
+            )
+        )
+
+    categories = risk_categories.to_numpy()
+    add(
+        0,
+        categories == "critical",
+        "immediate",
+        "Schedule executive sponsor call within 24 hours",
+        "Deal has <25% win probability and needs senior intervention",
+    )
+    add(
+        1,
+        np.isin(categories, ["high", "critical"]),
+        "this_week",
+        "Provide ROI calculator and customer case studies",
+        "High-risk deals need a stronger value proposition",
+    )
+
+    cycle_days = deals.get("sales_cycle_days", pd.Series(0, index=deals.index))
+    timeline_rationale = "Deal open " + _format_values("%.0f", cycle_days) + " days (above average)"
+    rank = 1
+    while f"risk_factor_{rank}" in risk_factors.columns:
+        feature = risk_factors[f"risk_factor_{rank}"].astype(str)
+        description = risk_factors[f"risk_factor_{rank}_description"].astype(str)
+        partner = (
+            feature.str.contains("lead_source", regex=False)
+            & description.str.contains("Partner", regex=False)
+        ).to_numpy()
+        add(
+            2 * rank,
+            partner,
+            "this_week",
+            "Engage partner account manager for joint call",
+            "Partner-sourced deals benefit from collaborative selling",
+        )
+        add(
+            2 * rank + 1,
+            (feature == "is_long_cycle").to_numpy(),
+            "immediate",
+            "Create timeline with clear milestones and next steps",
+            timeline_rationale,
+        )
+        rank += 1
+
+    add(
+        2 * rank,
+        np.isin(categories, ["medium", "high", "critical"]),
+        "ongoing",
+        "Weekly check-in with decision maker",
+        "Regular engagement prevents deal stagnation",
+    )
+
+    if not parts:
+        return pd.DataFrame(columns=RECOMMENDATION_COLUMNS, index=deals.index[:0])
+    combined = pd.concat(parts, ignore_index=True)
+    combined = combined.sort_values(["_position", "_order"], kind="stable")
+    combined.index = deals.index[combined["_position"].to_numpy()]
+    return combined[RECOMMENDATION_COLUMNS]
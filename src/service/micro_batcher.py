@@ -0,0 +1,97 @@
+"""
+Micro-batching of concurrent scoring requests.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+
+class MicroBatcher:
+    """
+    Group items submitted from many threads into batches for one call.
+
+    A background thread waits for the first item, then keeps collecting
+    until max_batch_size items are queued or max_wait_ms has passed, and
+    hands the batch to process_batch. Each submitter receives a Future
+    resolved with its own result. If process_batch raises on a batch of
+    several items, each item is retried on its own, so only the items that
+    fail on their own receive the exception.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be a positive integer")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches_processed = 0
+        self.items_processed = 0
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item and return a Future for its result."""
+        if self._stopped.is_set():
+            raise RuntimeError("MicroBatcher has been stopped")
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def stop(self) -> None:
+        """Stop the worker after the current batch."""
+        self._stopped.set()
+        self._worker.join()
+
+    def _collect(self) -> List[Tuple[Any, Future]]:
+        """Block for one item, then gather more until the batch is full or the window closes."""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            try:
+                results = self.process_batch(items)
+            except Exception as exc:  # noqa: BLE001 - isolated below
+                if len(batch) == 1:
+                    batch[0][1].set_exception(exc)
+                    continue
+                self._run_one_by_one(batch)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            self.batches_processed += 1
+            self.items_processed += len(batch)
+
+    def _run_one_by_one(self, batch: List[Tuple[Any, Future]]) -> None:
+        """Process each item of a failed batch alone, failing only the items that raise."""
+        for item, future in batch:
+            try:
+                future.set_result(self.process_batch([item])[0])
+            except Exception as exc:  # noqa: BLE001 - forwarded to this item's caller
+                future.set_exception(exc)
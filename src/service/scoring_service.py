@@ -0,0 +1,361 @@
+"""
+Long-running HTTP service for single-deal risk scoring.
+
+The model and feature transformer are loaded once and kept in memory.
+Concurrent requests are grouped by a MicroBatcher so a burst of single-deal
+requests costs one feature pass and one predict_proba call per scorer.
+
+With a BundleCache, a request's X-Tenant-ID header selects that tenant's
+latest artifact bundle; recently used tenants stay loaded, so switching
+between them does not reload artifacts from disk.
+"""
+
+import json
+import math
+import threading
+from dataclasses import asdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import DATE_FORMAT, DEFAULT_TENANT, FEATURE_INPUT_COLUMNS, MODEL_FEATURES
+from features.feature_store import FeatureStore, cached_transform_matrix, transformer_version
+from features.feature_transformer import RiskFeatureTransformer
+from models.artifact_bundle import ArtifactBundle, BundleCache
+from models.flat_ensemble import FlatTreeEnsemble
+from models.tree_contributions import tree_feature_contributions
+from pipeline.risk_digest import risk_categories_for_scores, risk_scores_from_probabilities
+from recommendations.recommendation_engine import generate_recommendations, identify_risk_factors
+from service.micro_batcher import MicroBatcher
+
+SCORE_PATH = "/v1/deals/score"
+HEALTH_PATH = "/health"
+TENANT_HEADER = "X-Tenant-ID"
+NUMERIC_FIELDS = ["deal_amount", "sales_cycle_days"]
+NON_NEGATIVE_FIELDS = ["deal_amount", "sales_cycle_days"]
+
+
+class ValidationError(ValueError):
+    """Raised when a scoring request is missing or has malformed fields."""
+
+    def __init__(self, message: str, field: str, constraint: str) -> None:
+        super().__init__(message)
+        self.field = field
+        self.constraint = constraint
+
+
+def validate_deal(deal: Any) -> Dict[str, Any]:
+    """
+    Check that a request body contains the fields feature engineering needs.
+
+    Args:
+        deal: Decoded JSON request body.
+
+    Returns:
+        The deal as a dictionary.
+
+    Raises:
+        ValidationError: If a field is missing, not numeric, not finite
+            (json.loads accepts NaN and Infinity) or negative.
+    """
+    if not isinstance(deal, dict):
+        raise ValidationError("Request body must be a JSON object", "body", "object")
+    for field in FEATURE_INPUT_COLUMNS:
+        if deal.get(field) is None:
+            raise ValidationError(f"Missing required field: {field}", field, "required")
+    for field in NUMERIC_FIELDS:
+        if isinstance(deal[field], bool) or not isinstance(deal[field], (int, float)):
+            raise ValidationError(f"Field must be numeric: {field}", field, "numeric")
+        if not math.isfinite(deal[field]):
+            raise ValidationError(f"Field must be finite: {field}", field, "finite")
+    for field in NON_NEGATIVE_FIELDS:
+        if deal[field] < 0:
+            raise ValidationError(f"Field must not be negative: {field}", field, "non_negative")
+    return deal
+
+
+class DealScorer:
+    """Score batches of deal records with a warm model and transformer."""
+
+    def __init__(
+        self,
+        model: Any,
+        transformer: RiskFeatureTransformer,
+        feature_columns: Optional[List[str]] = None,
+        model_version: Optional[str] = None,
+        flat_model: Optional[FlatTreeEnsemble] = None,
+        feature_store: Optional[FeatureStore] = None,
+        tenant: str = DEFAULT_TENANT,
+    ) -> None:
+        self.model = model
+        self.flat_model = flat_model
+        self.transformer = transformer
+        self.feature_columns = feature_columns or MODEL_FEATURES
+        self.model_version = model_version
+        self.feature_store = feature_store
+        self.tenant = tenant
+        self._feature_version = transformer_version(transformer) if feature_store else None
+
+    @classmethod
+    def from_bundle(
+        cls, bundle: ArtifactBundle, feature_store: Optional[FeatureStore] = None
+    ) -> "DealScorer":
+        """Build a scorer from a loaded artifact bundle."""
+        return cls(
+            bundle.model,
+            bundle.transformer,
+            feature_columns=bundle.feature_columns,
+            model_version=bundle.version,
+            flat_model=bundle.flat_model,
+            feature_store=feature_store,
+            tenant=bundle.tenant,
+        )
+
+    def score_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score validated deal records in one pass.
+
+        Features and probabilities are computed for the whole batch at once.
+        Micro-batches are small, so explanations use the per-deal
+        recommendation functions on plain dictionaries, which carry less
+        overhead than the DataFrame batch path at this size.
+
+        Args:
+            records: Deals as dictionaries with FEATURE_INPUT_COLUMNS.
+
+        Returns:
+            One response dictionary per record, in order.
+        """
+        df = pd.DataFrame.from_records(records)
+        created = pd.to_datetime(df["created_date"], format=DATE_FORMAT, errors="coerce")
+        df["month"] = created.dt.month
+        df["created_month"] = created.dt.to_period("M")
+        if self.feature_store is not None:
+            X = cached_transform_matrix(
+                df,
+                self.transformer,
+                self.feature_store,
+                self.feature_columns,
+                tenant=self.tenant,
+                version=self._feature_version,
+            )
+        else:
+            X = self.transformer.transform_matrix(df, self.feature_columns)
+        features = pd.DataFrame(X, columns=self.feature_columns, copy=False)
+        if self.flat_model is not None:
+            loss_probability = self.flat_model.predict_loss_probability(X)
+        else:
+            loss_probability = self.model.predict_proba(features)[:, 1]
+        try:
+            importances = tree_feature_contributions(self.model, features).contributions
+        except ValueError:
+            importances = None
+
+        risk_scores = risk_scores_from_probabilities(loss_probability)
+        risk_categories = risk_categories_for_scores(risk_scores)
+        scored_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        responses = []
+        for position, record in enumerate(records):
+            deal = {**record, **dict(zip(self.feature_columns, X[position].tolist()))}
+            risk_score = int(risk_scores[position])
+            risk_category = risk_categories[position]
+            risk_factors = identify_risk_factors(
+                deal,
+                self.model,
+                self.feature_columns,
+                importances=None if importances is None else importances[position],
+            )
+            recommendations = generate_recommendations(risk_category, risk_factors, deal)
+            responses.append(
+                {
+                    "deal_id": record.get("deal_id"),
+                    "risk_score": risk_score,
+                    "risk_category": risk_category,
+                    "loss_probability": float(loss_probability[position]),
+                    "win_probability": float(1 - loss_probability[position]),
+                    "risk_factors": [
+                        {"factor": f.feature, "impact": f.impact, "description": f.description}
+                        for f in risk_factors
+                    ],
+                    "recommendations": [asdict(r) for r in recommendations],
+                    "scored_at": scored_at,
+                    "model_version": self.model_version,
+                }
+            )
+        return responses
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler for the scoring and health endpoints."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; Nagle would delay the body.
+    disable_nagle_algorithm = True
+    server: "ScoringHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Silence per-request logging; it dominates latency under load."""
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, default=_json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Report liveness and batching counters."""
+        if self.path != HEALTH_PATH:
+            self._send_json(404, {"error": "not_found", "message": f"Unknown path: {self.path}"})
+            return
+        batcher = self.server.batcher
+        payload = {
+            "status": "ok",
+            "batches_processed": batcher.batches_processed,
+            "deals_scored": batcher.items_processed,
+        }
+        feature_store = self.server.scorer.feature_store
+        if feature_store is not None:
+            payload["feature_store"] = feature_store.stats()
+        cache = self.server.bundle_cache
+        if cache is not None:
+            payload["bundle_cache"] = {
+                "size": len(cache),
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "evictions": cache.evictions,
+            }
+        self._send_json(200, payload)
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Score one deal through the micro-batcher."""
+        if self.path != SCORE_PATH:
+            self._send_json(404, {"error": "not_found", "message": f"Unknown path: {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            deal = validate_deal(json.loads(self.rfile.read(length) or b"null"))
+        except json.JSONDecodeError as exc:
+            self._send_json(400, {"error": "validation_error", "message": f"Invalid JSON: {exc}"})
+            return
+        except ValidationError as exc:
+            self._send_json(
+                400,
+                {
+                    "error": "validation_error",
+                    "message": str(exc),
+                    "details": {"field": exc.field, "constraint": exc.constraint},
+                },
+            )
+            return
+
+        tenant = self.headers.get(TENANT_HEADER)
+        try:
+            scorer = self.server.scorer_for(tenant)
+        except FileNotFoundError as exc:
+            self._send_json(404, {"error": "unknown_tenant", "message": str(exc)})
+            return
+        except ValueError as exc:
+            self._send_json(400, {"error": "validation_error", "message": str(exc)})
+            return
+
+        try:
+            future = self.server.batcher.submit((scorer, deal))
+            result = future.result(timeout=self.server.request_timeout)
+        except Exception as exc:  # noqa: BLE001 - reported to the client
+            self._send_json(
+                500, {"error": "internal_error", "message": f"Model inference failed: {exc}"}
+            )
+            return
+        self._send_json(200, result)
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server that owns the scorers and the micro-batcher."""
+
+    daemon_threads = True
+    # Many clients connect at once under load; the default backlog of 5 drops them.
+    request_queue_size = 256
+
+    def __init__(
+        self,
+        address: tuple,
+        scorer: DealScorer,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        request_timeout: float = 10.0,
+        bundle_cache: Optional[BundleCache] = None,
+    ) -> None:
+        super().__init__(address, ScoringRequestHandler)
+        self.scorer = scorer
+        self.request_timeout = request_timeout
+        self.bundle_cache = bundle_cache
+        self._tenant_scorers: Dict[Tuple[str, str], DealScorer] = {}
+        self._tenant_lock = threading.Lock()
+        if bundle_cache is not None:
+            bundle_cache.on_evict = self._drop_tenant_scorer
+        self.batcher = MicroBatcher(_score_by_scorer, max_batch_size, max_wait_ms)
+
+    def scorer_for(self, tenant: Optional[str]) -> DealScorer:
+        """
+        Return the scorer for a tenant's latest bundle.
+
+        Args:
+            tenant: Tenant id from the request; None selects the default scorer.
+
+        Returns:
+            DealScorer.
+
+        Raises:
+            FileNotFoundError: If the tenant has no bundle.
+            ValueError: If tenant routing is not enabled or the id is invalid.
+        """
+        if tenant is None:
+            return self.scorer
+        if self.bundle_cache is None:
+            raise ValueError(f"{TENANT_HEADER} is not supported by this server")
+        if not tenant or "/" in tenant or "\\" in tenant or tenant.startswith("."):
+            raise ValueError(f"Invalid tenant id: {tenant!r}")
+        bundle = self.bundle_cache.get(tenant)
+        key = (tenant, bundle.version)
+        with self._tenant_lock:
+            scorer = self._tenant_scorers.get(key)
+            if scorer is None:
+                scorer = self._tenant_scorers[key] = DealScorer.from_bundle(
+                    bundle, feature_store=self.scorer.feature_store
+                )
+        return scorer
+
+    def _drop_tenant_scorer(self, key: Tuple[str, str], bundle: ArtifactBundle) -> None:
+        """Forget the scorer of an evicted bundle; queued requests keep their reference."""
+        with self._tenant_lock:
+            self._tenant_scorers.pop(key, None)
+
+    def server_close(self) -> None:
+        """Stop the batcher along with the listening socket."""
+        super().server_close()
+        self.batcher.stop()
+
+
+def _score_by_scorer(items: List[Tuple[DealScorer, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Score a micro-batch of (scorer, deal) pairs, one score_records call per scorer."""
+    groups: Dict[int, Tuple[DealScorer, List[int]]] = {}
+    for position, (scorer, _) in enumerate(items):
+        groups.setdefault(id(scorer), (scorer, []))[1].append(position)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    for scorer, positions in groups.values():
+        scored = scorer.score_records([items[position][1] for position in positions])
+        for position, result in zip(positions, scored):
+            results[position] = result
+    return results
+
+
+def _json_default(value: Any) -> Any:
+    """Serialise numpy scalars in responses."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,345 @@
+"""
+Stage timing and memory instrumentation.
+
+Stages are marked with the ``stage`` context manager or the ``instrumented``
+decorator. Nothing is recorded until ``enable_instrumentation`` is called;
+while disabled, a decorated function costs one flag check per call and
+``stage`` returns a shared no-op context.
+
+Each completed stage records wall time, rows processed, rows/sec and peak
+memory. By default peak memory is the process's peak resident set size when
+the stage ends, which costs one getrusage call; where the resource module is
+missing (Windows) psutil's peak working set is used if installed, otherwise
+no value is recorded. With ``memory="tracemalloc"`` it is the stage's own
+peak of traced allocations above its starting point; that is precise per
+stage but slows allocation-heavy code (such as DataFrame.to_csv) several
+times over, so it is meant for profiling runs.
+Records are emitted as JSON lines and aggregated into a Prometheus
+text-format file.
+"""
+
+import functools
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+METRIC_PREFIX = "skygeni_stage"
+MEMORY_MODES = ("rss", "tracemalloc", "none")
+# ru_maxrss is in kilobytes on Linux and bytes on macOS.
+_RSS_UNIT_BYTES = 1 if sys.platform == "darwin" else 1024
+
+
+@dataclass
+class StageRecord:
+    """Measurements of one completed stage."""
+
+    stage: str
+    seconds: float
+    rows: Optional[int]
+    rows_per_second: Optional[float]
+    peak_memory_mb: Optional[float]
+    parent: Optional[str]
+
+
+class _InstrumentationState:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.memory = "none"
+        self.json_log_path: Optional[Path] = None
+        self.json_log: Optional[TextIO] = None
+        self.prometheus_path: Optional[Path] = None
+        self.records: List[StageRecord] = []
+        self.stack: List["_Stage"] = []
+        self.started_tracemalloc = False
+
+
+_STATE = _InstrumentationState()
+
+
+class _NullStage:
+    """Context returned by stage() while instrumentation is disabled."""
+
+    rows: Optional[int] = None
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Callers may set .rows unconditionally; ignore it when disabled.
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Active stage measurement."""
+
+    def __init__(self, name: str, rows: Optional[int]) -> None:
+        self.name = name
+        self.rows = rows
+        self.start = 0.0
+        self.start_memory = 0
+        self.max_memory = 0
+
+    def __enter__(self) -> "_Stage":
+        if _STATE.memory == "tracemalloc":
+            current, peak = tracemalloc.get_traced_memory()
+            if _STATE.stack:
+                parent = _STATE.stack[-1]
+                parent.max_memory = max(parent.max_memory, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = self.max_memory = current
+        _STATE.stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        seconds = time.perf_counter() - self.start
+        _STATE.stack.pop()
+        peak_memory_mb = None
+        if _STATE.memory == "rss":
+            peak_memory_mb = _peak_rss_mb()
+        elif _STATE.memory == "tracemalloc":
+            self.max_memory = max(self.max_memory, tracemalloc.get_traced_memory()[1])
+            peak_memory_mb = (self.max_memory - self.start_memory) / 1024**2
+            if _STATE.stack:
+                parent = _STATE.stack[-1]
+                parent.max_memory = max(parent.max_memory, self.max_memory)
+        rows_per_second = self.rows / seconds if self.rows is not None and seconds > 0 else None
+        _record(
+            StageRecord(
+                stage=self.name,
+                seconds=seconds,
+                rows=self.rows,
+                rows_per_second=rows_per_second,
+                peak_memory_mb=peak_memory_mb,
+                parent=_STATE.stack[-1].name if _STATE.stack else None,
+            )
+        )
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB; None if unavailable."""
+    try:
+        import resource
+    except ImportError:  # Not on Unix.
+        try:
+            import psutil
+        except ImportError:
+            return None
+        memory = psutil.Process().memory_info()
+        return getattr(memory, "peak_wset", memory.rss) / 1024**2
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT_BYTES / 1024**2
+
+
+def _record(record: StageRecord) -> None:
+    """Keep a completed record and emit it as a JSON line."""
+    _STATE.records.append(record)
+    line = json.dumps({"event": "stage_complete", **asdict(record)})
+    if _STATE.json_log is not None:
+        _STATE.json_log.write(line + "\n")
+    else:
+        logger.info(line)
+
+
+def enable_instrumentation(
+    json_log_path: Optional[Path] = None,
+    prometheus_path: Optional[Path] = None,
+    memory: str = "rss",
+) -> None:
+    """
+    Start recording stages.
+
+    Args:
+        json_log_path: Append one JSON line per stage here; the file stays
+            open until disable_instrumentation. Logged at INFO level on this
+            module's logger when omitted.
+        prometheus_path: Text file rewritten by write_prometheus_metrics.
+        memory: 'rss' (process peak RSS), 'tracemalloc' (per-stage traced
+            peak; slow) or 'none'.
+
+    Raises:
+        ValueError: If memory is not one of MEMORY_MODES.
+    """
+    if memory not in MEMORY_MODES:
+        raise ValueError(f"memory must be one of {MEMORY_MODES}, got {memory!r}")
+    _close_json_log()
+    _STATE.enabled = True
+    _STATE.json_log_path = json_log_path
+    _STATE.prometheus_path = prometheus_path
+    _STATE.memory = memory
+    _STATE.records = []
+    _STATE.stack = []
+    if json_log_path is not None:
+        json_log_path.parent.mkdir(parents=True, exist_ok=True)
+        # Line buffered: every record reaches the file as it completes, and
+        # forked workers inherit no pending output.
+        _STATE.json_log = json_log_path.open("a", encoding="utf-8", buffering=1)
+    if memory == "tracemalloc" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _STATE.started_tracemalloc = True
+
+
+def _close_json_log() -> None:
+    if _STATE.json_log is not None:
+        _STATE.json_log.close()
+        _STATE.json_log = None
+
+
+def disable_instrumentation() -> List[StageRecord]:
+    """
+    Stop recording, closing the JSON log and writing the Prometheus file
+    if one was configured.
+
+    Returns:
+        Records collected since instrumentation was enabled.
+    """
+    if _STATE.enabled and _STATE.prometheus_path is not None:
+        write_prometheus_metrics(_STATE.prometheus_path)
+    _close_json_log()
+    if _STATE.started_tracemalloc:
+        tracemalloc.stop()
+        _STATE.started_tracemalloc = False
+    _STATE.enabled = False
+    _STATE.memory = "none"
+    records, _STATE.records = _STATE.records, []
+    return records
+
+
+def instrumentation_enabled() -> bool:
+    """Return whether stages are currently being recorded."""
+    return _STATE.enabled
+
+
+def stage_records() -> List[StageRecord]:
+    """Return the records collected so far."""
+    return list(_STATE.records)
+
+
+def stage(name: str, rows: Optional[int] = None) -> Any:
+    """
+    Measure a block of code as a named stage.
+
+    Args:
+        name: Stage name, e.g. 'score.to_csv'.
+        rows: Rows processed, if known up front; can also be set on the
+            returned object inside the block.
+
+    Returns:
+        Context manager; a shared no-op when instrumentation is disabled.
+    """
+    if not _STATE.enabled:
+        return _NULL_STAGE
+    return _Stage(name, rows)
+
+
+def _row_count(value: Any) -> Optional[int]:
+    """Rows of a DataFrame, Series or array; None for anything else."""
+    shape = getattr(value, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+def instrumented(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Decorate a function so each call is measured as a stage.
+
+    Rows are taken from the first positional argument when it is a
+    DataFrame or array, otherwise from the return value.
+
+    Args:
+        name: Stage name (default: the function's module-qualified name).
+
+    Returns:
+        Decorator.
+    """
+
+    def decorator(func: F) -> F:
+        stage_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _STATE.enabled:
+                return func(*args, **kwargs)
+            with _Stage(stage_name, _row_count(args[0]) if args else None) as active:
+                result = func(*args, **kwargs)
+                if active.rows is None:
+                    active.rows = _row_count(result)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus_metrics(records: List[StageRecord]) -> str:
+    """
+    Aggregate stage records in the Prometheus text exposition format.
+
+    Args:
+        records: Completed stage records.
+
+    Returns:
+        Metrics text with per-stage call counts, total seconds, total rows,
+        last duration and maximum peak memory.
+    """
+    totals: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        total = totals.setdefault(
+            record.stage, {"calls": 0, "seconds": 0.0, "rows": 0, "last": 0.0, "peak": 0.0}
+        )
+        total["calls"] += 1
+        total["seconds"] += record.seconds
+        total["rows"] += record.rows or 0
+        total["last"] = record.seconds
+        if record.peak_memory_mb is not None:
+            total["peak"] = max(total["peak"], record.peak_memory_mb * 1024**2)
+
+    metrics = [
+        ("calls_total", "counter", "Completed stage executions.", "calls"),
+        ("seconds_total", "counter", "Wall time spent in the stage.", "seconds"),
+        ("rows_total", "counter", "Rows processed by the stage.", "rows"),
+        ("last_duration_seconds", "gauge", "Wall time of the latest execution.", "last"),
+        ("peak_memory_bytes", "gauge", "Largest peak memory of an execution.", "peak"),
+    ]
+    lines = []
+    for suffix, metric_type, help_text, key in metrics:
+        metric = f"{METRIC_PREFIX}_{suffix}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for stage_name, total in totals.items():
+            lines.append(f'{metric}{{stage="{_escape_label(stage_name)}"}} {total[key]:.10g}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_metrics(path: Path) -> None:
+    """
+    Write the collected records as a Prometheus text file.
+
+    The file is replaced atomically so a node_exporter textfile collector
+    never reads a partial file.
+
+    Args:
+        path: Output .prom file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(format_prometheus_metrics(_STATE.records), encoding="utf-8")
+    os.replace(temporary, path)
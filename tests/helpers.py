@@ -0,0 +1,47 @@
+"""
+Sample deals and a small trained model shared by the test modules.
+"""
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import MODEL_FEATURES
+from features.feature_transformer import RiskFeatureTransformer
+from models.risk_scorer import train_model
+from pipeline.scoring import prepare_scoring_frame
+
+
+def sample_deals(n_rows: int = 120) -> pd.DataFrame:
+    """Raw deals in the sales CSV layout, reproducible for a given n_rows."""
+    rng = np.random.default_rng(7)
+    created = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 300, n_rows), unit="D")
+    cycle = rng.integers(7, 120, n_rows)
+    return pd.DataFrame(
+        {
+            "deal_id": [f"D{i}" for i in range(n_rows)],
+            "created_date": created.strftime("%Y-%m-%d"),
+            "closed_date": (created + pd.to_timedelta(cycle, unit="D")).strftime("%Y-%m-%d"),
+            "sales_rep_id": rng.choice(["R1", "R2", "R3"], n_rows),
+            "industry": rng.choice(["Tech", "Finance", "Health"], n_rows),
+            "region": rng.choice(["North America", "EMEA", "APAC"], n_rows),
+            "product_type": rng.choice(["Core", "Pro"], n_rows),
+            "lead_source": rng.choice(["Inbound", "Partner"], n_rows),
+            "deal_stage": rng.choice(["Qualified", "Closed"], n_rows),
+            "deal_amount": rng.integers(2000, 100000, n_rows),
+            "sales_cycle_days": cycle,
+            "outcome": rng.choice(["Won", "Lost"], n_rows),
+        }
+    )
+
+
+def trained_model() -> LogisticRegression:
+    """Logistic regression fitted on sample_deals(60)."""
+    df = prepare_scoring_frame(sample_deals(60))
+    features = RiskFeatureTransformer().fit_transform(df)
+    return train_model(features[MODEL_FEATURES], features["is_lost"], "logistic_regression")
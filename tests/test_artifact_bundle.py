@@ -0,0 +1,226 @@
+import argparse
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+import joblib
+import pandas as pd
+
+import cli.score
+from cli import score_tenants, update_segments
+from config import MODEL_FEATURES, MODEL_FILENAME
+from features.feature_transformer import RiskFeatureTransformer
+from models.artifact_bundle import (
+    FLAT_MODEL_DIR,
+    BundleCache,
+    load_bundle,
+    resolve_bundle_path,
+    save_bundle,
+)
+from models.risk_scorer import train_model
+from pipeline.drift_monitor import FeatureHistograms, monitored_columns
+from pipeline.scoring import prepare_scoring_frame, score_frame
+from tests.helpers import sample_deals, trained_model
+
+
+def _fitted(model_type: str = "gradient_boosting", n_rows: int = 80) -> tuple:
+    df = prepare_scoring_frame(sample_deals(n_rows))
+    transformer = RiskFeatureTransformer().fit(df)
+    features = transformer.transform(df)
+    model = train_model(features[MODEL_FEATURES], features["is_lost"], model_type)
+    return model, transformer, features[MODEL_FEATURES]
+
+
+def test_round_trip_memory_maps_flat_arrays(tmp_path: Path) -> None:
+    model, transformer, X = _fitted()
+    bundle_dir = save_bundle(model, transformer, root=tmp_path, tenant="acme")
+
+    assert resolve_bundle_path(tmp_path, "acme") == bundle_dir
+    bundle = load_bundle(bundle_dir)
+    assert bundle.version == bundle_dir.name == bundle.content_hash[:12]
+    assert bundle.feature_columns == MODEL_FEATURES
+    assert isinstance(bundle.flat_model.left, np.memmap)
+    np.testing.assert_allclose(
+        bundle.flat_model.predict_loss_probability(X), model.predict_proba(X)[:, 1], atol=1e-9
+    )
+    np.testing.assert_allclose(bundle.model.predict_proba(X), model.predict_proba(X))
+    assert bundle.transformer.segment_probs == transformer.segment_probs
+
+    # Identical artifacts resolve to the same version.
+    assert save_bundle(model, transformer, root=tmp_path, tenant="acme") == bundle_dir
+
+
+def test_flat_model_scoring_skips_the_estimator(tmp_path: Path) -> None:
+    model, transformer, X = _fitted()
+    save_bundle(model, transformer, root=tmp_path, tenant="acme")
+    X.to_csv(tmp_path / "features.csv", index=False)
+    code = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "import pandas as pd\n"
+        "import cli.score\n"
+        f"cli.score.BUNDLES_DIR = Path({str(tmp_path)!r})\n"
+        "model, _, _ = cli.score.load_artifacts(flat_model=True, tenant='acme')\n"
+        f"X = pd.read_csv(Path({str(tmp_path)!r}) / 'features.csv')\n"
+        "print(model.predict_loss_probability(X)[:3].round(6).tolist())\n"
+        "print(sorted({'sklearn', 'joblib'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    probabilities, heavy_modules = result.stdout.strip().splitlines()[-2:]
+    assert heavy_modules == "[]"
+    assert json.loads(probabilities) == pytest.approx(
+        model.predict_proba(X)[:3, 1].round(6).tolist()
+    )
+
+
+def test_drift_reference_is_loaded_from_the_scoring_bundle(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    model, transformer, X = _fitted()
+    reference = FeatureHistograms.fit(
+        monitored_columns(
+            {column: X[column].to_numpy() for column in MODEL_FEATURES},
+            model.predict_proba(X)[:, 1],
+        ),
+        prepare_scoring_frame(sample_deals(80)),
+        transformer.segment_encoder.vocabularies,
+    )
+    save_bundle(model, transformer, root=tmp_path, tenant="acme", version="v1")
+    save_bundle(
+        model, transformer, root=tmp_path, tenant="acme", version="v2", drift_reference=reference
+    )
+    monkeypatch.setattr(cli.score, "BUNDLES_DIR", tmp_path)
+
+    _, _, loaded = cli.score.load_artifacts(tenant="acme", drift=True)
+    assert loaded.rows == reference.rows
+    for column in reference.edges:
+        assert np.array_equal(loaded.counts[column], reference.counts[column])
+    assert cli.score.load_artifacts(tenant="acme")[2] is None
+    with pytest.raises(FileNotFoundError, match="no drift reference"):
+        cli.score.load_artifacts(tenant="acme", version="v1", drift=True)
+
+
+def test_update_segments_publishes_a_bundle_that_scoring_loads(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    model, transformer, _ = _fitted()
+    bundles, models_dir = tmp_path / "bundles", tmp_path / "models"
+    first_dir = save_bundle(model, transformer, root=bundles)
+    for module in (cli.score, update_segments):
+        monkeypatch.setattr(module, "BUNDLES_DIR", bundles)
+        monkeypatch.setattr(module, "MODELS_DIR", models_dir)
+    monkeypatch.setattr(update_segments, "DATA_CACHE_DIR", None)
+    deals = prepare_scoring_frame(sample_deals(80))
+
+    def scored_industry_win_prob() -> np.ndarray:
+        _, loaded, _ = cli.score.load_artifacts()
+        return loaded.transform_matrix(deals, ["win_prob_industry"])[:, 0]
+
+    before = scored_industry_win_prob()
+    closed_path = tmp_path / "closed.csv"
+    sample_deals(200).assign(industry="Tech", outcome="Won").to_csv(closed_path, index=False)
+    update_segments.run(argparse.Namespace(input=[str(closed_path)], tenant="default"))
+    after = scored_industry_win_prob()
+
+    tech = (deals["industry"] == "Tech").to_numpy()
+    assert (after[tech] > before[tech]).all()
+    np.testing.assert_array_equal(after[~tech], before[~tech])
+    latest = load_bundle(resolve_bundle_path(bundles))
+    assert latest.version != first_dir.name
+    assert latest.manifest["metadata"]["updated_from"] == first_dir.name
+    loose = RiskFeatureTransformer.load(models_dir)
+    assert loose.segment_probs == latest.transformer.segment_probs
+
+
+def test_score_tenants_uses_each_tenant_bundle(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bundles, models_dir = tmp_path / "bundles", tmp_path / "models"
+    artifacts = {
+        "acme": _fitted("gradient_boosting", 80),
+        "globex": _fitted("logistic_regression", 120),
+        "initech": _fitted("random_forest", 100),
+    }
+    for tenant in ("acme", "globex"):
+        model, transformer, _ = artifacts[tenant]
+        save_bundle(model, transformer, root=bundles, tenant=tenant)
+    # initech has no bundle and falls back to the default tenant's loose files.
+    model, transformer, _ = artifacts["initech"]
+    models_dir.mkdir()
+    joblib.dump(model, models_dir / MODEL_FILENAME)
+    transformer.save(models_dir)
+    for module in (cli.score, score_tenants):
+        monkeypatch.setattr(module, "BUNDLES_DIR", bundles)
+    monkeypatch.setattr(cli.score, "MODELS_DIR", models_dir)
+
+    deals = sample_deals(60)
+    for tenant in artifacts:
+        deals.to_csv(tmp_path / f"{tenant}.csv", index=False)
+    score_tenants.run(
+        argparse.Namespace(
+            input=[str(tmp_path / f"{tenant}.csv") for tenant in artifacts],
+            output_dir=str(tmp_path / "out"),
+            workers=2,
+            chunk_size=None,
+            lean=False,
+            flat_model=False,
+            model_version=None,
+            drift=False,
+        )
+    )
+
+    for tenant, (model, transformer, _) in artifacts.items():
+        expected = score_frame(prepare_scoring_frame(deals.copy()), model, transformer)
+        scored = pd.read_csv(tmp_path / "out" / f"{tenant}_risk_scores.csv")
+        np.testing.assert_allclose(scored["loss_probability"], expected["loss_probability"])
+
+
+def test_tampered_bundle_fails_integrity_check(tmp_path: Path) -> None:
+    model, transformer, _ = _fitted()
+    bundle_dir = save_bundle(model, transformer, root=tmp_path, version="v1")
+    threshold = np.load(bundle_dir / FLAT_MODEL_DIR / "threshold.npy")
+    threshold[0] += 1
+    np.save(bundle_dir / FLAT_MODEL_DIR / "threshold.npy", threshold)
+
+    with pytest.raises(ValueError, match="threshold.npy"):
+        load_bundle(bundle_dir)
+    load_bundle(bundle_dir, verify=False)
+
+
+def test_non_tree_model_has_no_flat_export(tmp_path: Path) -> None:
+    _, transformer, _ = _fitted()
+    bundle = load_bundle(save_bundle(trained_model(), transformer, root=tmp_path))
+    assert bundle.flat_model is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    model, transformer, _ = _fitted()
+    for tenant in ("a", "b", "c"):
+        save_bundle(model, transformer, root=tmp_path, tenant=tenant)
+    evicted = []
+    cache = BundleCache(tmp_path, max_size=2, on_evict=lambda key, bundle: evicted.append(key))
+
+    first = cache.get("a")
+    cache.get("b")
+    assert cache.get("a") is first
+    cache.get("c")
+    assert [key[0] for key in evicted] == ["b"]
+    assert [key[0] for key in cache.keys()] == ["a", "c"]
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+
+    # Publishing a new version for a tenant is picked up on the next lookup.
+    other_model, other_transformer, _ = _fitted(n_rows=90)
+    new_dir = save_bundle(other_model, other_transformer, root=tmp_path, tenant="a")
+    assert cache.get("a").version == new_dir.name != first.version
+
+    with pytest.raises(FileNotFoundError):
+        cache.get("missing")
@@ -0,0 +1,107 @@
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Any
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import MODEL_FEATURES
+from features.feature_transformer import RiskFeatureTransformer
+from pipeline import batch_orchestrator
+from pipeline.batch_orchestrator import TenantJob, score_tenants
+from pipeline.drift_monitor import FeatureHistograms, monitored_columns
+from pipeline.scoring import prepare_scoring_frame, score_frame
+from tests.helpers import sample_deals, trained_model
+
+
+def test_tenants_scored_in_parallel_with_isolated_failures(tmp_path: Path) -> None:
+    model = trained_model()
+    deals = sample_deals(90)
+    transformer = RiskFeatureTransformer().fit(prepare_scoring_frame(deals.copy()))
+
+    jobs = []
+    for tenant_id, rows in (("acme", slice(0, 40)), ("globex", slice(40, 90))):
+        input_path = tmp_path / f"{tenant_id}.csv"
+        deals.iloc[rows].to_csv(input_path, index=False)
+        jobs.append(TenantJob(tenant_id, input_path, tmp_path / "out" / f"{tenant_id}.csv"))
+    broken_path = tmp_path / "initech.csv"
+    deals.drop(columns=["deal_amount"]).to_csv(broken_path, index=False)
+    jobs.insert(1, TenantJob("initech", broken_path, tmp_path / "out" / "initech.csv"))
+
+    results = score_tenants(jobs, model, transformer, max_workers=2)
+
+    assert [result.tenant_id for result in results] == ["acme", "initech", "globex"]
+    assert [result.succeeded for result in results] == [True, False, True]
+    assert "deal_amount" in results[1].error
+    assert not (tmp_path / "out" / "initech.csv").exists()
+
+    expected = score_frame(prepare_scoring_frame(deals.iloc[40:90].copy()), model, transformer)
+    scored = pd.read_csv(tmp_path / "out" / "globex.csv")
+    assert results[2].rows == len(scored) == 50
+    pd.testing.assert_series_equal(
+        scored["loss_probability"], expected["loss_probability"].reset_index(drop=True)
+    )
+
+
+def test_tenant_drift_reports_written_by_workers(tmp_path: Path) -> None:
+    model = trained_model()
+    deals = sample_deals(90)
+    transformer = RiskFeatureTransformer().fit(prepare_scoring_frame(deals.copy()))
+    scored = score_frame(prepare_scoring_frame(deals.copy()), model, transformer)
+    reference = FeatureHistograms.fit(
+        monitored_columns(
+            {column: scored[column].to_numpy() for column in MODEL_FEATURES},
+            scored["loss_probability"].to_numpy(),
+        ),
+        scored,
+        transformer.segment_encoder.vocabularies,
+    )
+
+    input_path = tmp_path / "acme.csv"
+    deals.to_csv(input_path, index=False)
+    jobs = [
+        TenantJob("acme", input_path, tmp_path / "acme.csv.out", tmp_path / "acme_drift.json"),
+        TenantJob("globex", input_path, tmp_path / "globex.csv.out"),
+    ]
+    results = score_tenants(
+        jobs, model, transformer, max_workers=2, chunk_size=40, drift_reference=reference
+    )
+
+    assert [result.drift_status for result in results] == ["healthy", None]
+    report = json.loads((tmp_path / "acme_drift.json").read_text(encoding="utf-8"))
+    assert report["rows"] == 90
+    assert report["prediction_drift_score"] == 0.0
+    assert not (tmp_path / "globex_drift.json").exists()
+
+
+def test_worker_crash_fails_only_the_crashing_tenant(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    model = trained_model()
+    deals = sample_deals(60)
+    transformer = RiskFeatureTransformer().fit(prepare_scoring_frame(deals.copy()))
+    original_score_tenant = batch_orchestrator.score_tenant
+
+    def score_or_die(job: TenantJob, *args: Any) -> Any:
+        if job.tenant_id == "oom":
+            os._exit(1)
+        return original_score_tenant(job, *args)
+
+    # Worker processes are forked after the patch, so they inherit it.
+    monkeypatch.setattr(batch_orchestrator, "score_tenant", score_or_die)
+    jobs = []
+    for tenant_id in ("acme", "oom", "globex", "initech", "umbrella"):
+        input_path = tmp_path / f"{tenant_id}.csv"
+        # The crashing tenant is the largest, so it is submitted first.
+        deals.iloc[: 60 if tenant_id == "oom" else 20].to_csv(input_path, index=False)
+        jobs.append(TenantJob(tenant_id, input_path, tmp_path / "out" / f"{tenant_id}.csv"))
+
+    results = score_tenants(jobs, model, transformer, max_workers=2)
+
+    assert [result.succeeded for result in results] == [True, False, True, True, True]
+    assert "worker process died" in results[1].error
+    assert all(result.rows == 20 for result in results if result.succeeded)
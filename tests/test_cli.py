@@ -0,0 +1,51 @@
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from cli.main import build_parser
+
+
+def test_help_does_not_import_heavy_dependencies() -> None:
+    code = (
+        "import sys\n"
+        "from cli.main import main\n"
+        "try:\n"
+        "    main(['score', '--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted({'pandas', 'numpy', 'sklearn', 'joblib'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    assert "usage: skygeni score" in result.stdout
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_subcommands_resolve_to_command_modules() -> None:
+    parser = build_parser()
+    args = parser.parse_args(["score", "--input", "in.csv", "--output", "out.csv", "--flat-model"])
+    assert args.command_module == "cli.score"
+    assert args.flat_model and args.chunk_size is None
+
+    args = parser.parse_args(["train", "--rolling-half-life", "6"])
+    assert (args.command_module, args.rolling_window, args.rolling_half_life) == (
+        "cli.train",
+        None,
+        6.0,
+    )
+
+    args = parser.parse_args(["update-segments", "--input", "a.csv", "b.csv"])
+    assert args.command_module == "cli.update_segments"
+    assert args.input == ["a.csv", "b.csv"]
+
+    args = parser.parse_args(["digest", "--input", "s.csv", "--output", "d.csv", "--by", "region"])
+    assert (args.command_module, args.by, args.top) == ("cli.digest", "region", 10)
+
+    with pytest.raises(SystemExit):
+        parser.parse_args([])
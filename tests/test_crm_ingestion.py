@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from data.crm_client import RetryPolicy
+from data.crm_ingestion import ingest_tenants, validate_deal_records
+from data.data_loader import REQUIRED_COLUMNS, load_sales_data
+from data.fake_crm import FakeCRMServer
+
+FAST_RETRY = RetryPolicy(max_attempts=8, base_delay=0.001, max_delay=0.01)
+
+
+def test_ingestion_matches_source_with_bounded_pooled_concurrency(tmp_path: Path) -> None:
+    tenants = {"acme": 2_500, "globex": 700}
+    with FakeCRMServer(tenants, latency=0.01, failure_rate=0.1, token="secret") as crm:
+        results = ingest_tenants(
+            crm.url,
+            list(tenants),
+            tmp_path,
+            page_size=200,
+            max_connections=3,
+            retry=FAST_RETRY,
+            headers={"Authorization": "Bearer secret"},
+            row_group_size=1_000,
+        )
+        assert [result.succeeded for result in results] == [True, True]
+        assert [result.rows for result in results] == [2_500, 700]
+        assert results[0].pages == 13 and results[0].files == 1
+        assert crm.failures > 0
+        # Every page went through at most three pooled connections per tenant.
+        assert max(crm.max_concurrent.values()) <= 3 and crm.max_concurrent["acme"] > 1
+        assert crm.connections <= 6 < crm.requests
+
+        for tenant in tenants:
+            loaded = load_sales_data(tmp_path / tenant).sort_values("deal_id", ignore_index=True)
+            source = crm.deals[tenant]
+            assert list(loaded.columns) == REQUIRED_COLUMNS
+            assert loaded["deal_id"].tolist() == source["deal_id"].tolist()
+            assert loaded["deal_amount"].tolist() == source["deal_amount"].astype(float).tolist()
+            assert (
+                loaded["industry"].astype(str).tolist() == source["industry"].astype(str).tolist()
+            )
+            expected_dates = pd.to_datetime(source["created_date"]).tolist()
+            assert loaded["created_date"].tolist() == expected_dates
+        assert len(load_sales_data(tmp_path)) == 3_200
+
+
+def test_failed_sync_keeps_previous_export(tmp_path: Path) -> None:
+    with FakeCRMServer({"acme": 300}, max_requests_per_connection=2) as crm:
+        first = ingest_tenants(crm.url, ["acme"], tmp_path, page_size=50, retry=FAST_RETRY)
+    assert first[0].succeeded and first[0].rows == 300
+
+    with FakeCRMServer({"acme": 500}, token="rotated") as crm:
+        second = ingest_tenants(crm.url, ["acme", "../escape"], tmp_path, retry=FAST_RETRY)
+    assert [result.succeeded for result in second] == [False, False]
+    assert "HTTP 401" in second[0].error
+    assert len(load_sales_data(tmp_path / "acme")) == 300
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["acme"]
+
+
+def test_rejected_tenant_id_leaves_other_directories_alone(tmp_path: Path) -> None:
+    # Where the staging path used to be built from the unchecked id.
+    bystander = tmp_path / f".staging-../escape-{os.getpid()}"
+    bystander.mkdir(parents=True)
+    with FakeCRMServer({"acme": 10}) as crm:
+        results = ingest_tenants(crm.url, ["../escape"], tmp_path, retry=FAST_RETRY)
+    assert not results[0].succeeded and "directory name" in results[0].error
+    assert bystander.is_dir()
+
+
+def test_deals_repeated_across_pages_are_written_once(tmp_path: Path) -> None:
+    with FakeCRMServer({"acme": 300}) as crm:
+        deals = crm.deals["acme"]
+        deals.loc[150:159, "deal_id"] = deals.loc[0:9, "deal_id"].to_numpy()
+        results = ingest_tenants(crm.url, ["acme"], tmp_path, page_size=50, retry=FAST_RETRY)
+    assert results[0].succeeded
+    assert (results[0].rows, results[0].duplicates) == (290, 10)
+    loaded = load_sales_data(tmp_path / "acme")
+    assert loaded["deal_id"].is_unique and len(loaded) == 290
+
+
+def test_validate_deal_records_rejects_unusable_deals() -> None:
+    good = {
+        "deal_id": "D1",
+        "created_date": "2024-01-05",
+        "sales_rep_id": 17,
+        "industry": "SaaS",
+        "region": "Europe",
+        "product_type": "Core",
+        "lead_source": "Inbound",
+        "deal_amount": "12000.5",
+        "sales_cycle_days": 30,
+    }
+    records = [
+        good,
+        {**good, "deal_id": None},
+        {**good, "deal_amount": "n/a"},
+        {**good, "sales_cycle_days": 3.5},
+        {**good, "created_date": "05/01/2024"},
+        {key: value for key, value in good.items() if key != "region"},
+    ]
+    deals, rejected = validate_deal_records(records)
+    assert rejected == 5
+    assert deals["deal_amount"].tolist() == [12000.5]
+    assert deals["sales_rep_id"].tolist() == ["17"]
+    assert deals["outcome"].isna().all()
@@ -2,6 +2,7 @@ from pathlib import Path
 import sys
 
 import pandas as pd
+import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
@@ -37,3 +38,49 @@ def test_prepare_target_variable() -> None:
     df = pd.DataFrame({"outcome": ["Won", "Lost"]})
     df_target = prepare_target_variable(df)
     assert df_target["is_lost"].tolist() == [0, 1]
+
+
+def test_load_sales_data_schema_and_cache(tmp_path: Path) -> None:
+    data = pd.DataFrame(
+        {
+            "deal_id": ["D1", "D2"],
+            "created_date": ["2024-01-01", "2024-02-01"],
+            "closed_date": ["2024-01-10", "2024-03-01"],
+            "sales_rep_id": ["R1", "R2"],
+            "industry": ["Tech", "Finance"],
+            "region": ["EMEA", "APAC"],
+            "product_type": ["Core", "Pro"],
+            "lead_source": ["Inbound", "Partner"],
+            "deal_stage": ["Qualified", "Closed"],
+            "deal_amount": [10000, 25000],
+            "sales_cycle_days": [9, 29],
+            "outcome": ["Won", "Lost"],
+        }
+    )
+    file_path = tmp_path / "sales.csv"
+    data.to_csv(file_path, index=False)
+    cache_dir = tmp_path / "cache"
+
+    df = load_sales_data(file_path, columns=["industry", "created_date"], cache_dir=cache_dir)
+    assert list(df.columns) == ["industry", "created_date"]
+    assert isinstance(df["industry"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["created_date"])
+    assert len(list(cache_dir.iterdir())) == 1
+
+    cached = load_sales_data(file_path, columns=["industry", "created_date"], cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(cached, df)
+
+    full = load_sales_data(file_path)
+    assert full["sales_cycle_days"].dtype.itemsize < 8
+
+
+def test_load_sales_data_parquet(tmp_path: Path) -> None:
+    pytest.importorskip("pyarrow")
+    data = pd.DataFrame({"industry": ["Tech"], "created_date": ["2024-01-01"], "deal_amount": [5]})
+    file_path = tmp_path / "sales.parquet"
+    data.to_parquet(file_path)
+
+    df = load_sales_data(file_path, columns=["industry", "created_date"])
+    assert df["created_date"].iloc[0] == pd.Timestamp("2024-01-01")
+    with pytest.raises(ValueError):
+        load_sales_data(file_path, columns=["region"])
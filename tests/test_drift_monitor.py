@@ -0,0 +1,137 @@
+import json
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import MODEL_FEATURES
+from features.feature_transformer import RiskFeatureTransformer
+from pipeline.drift_monitor import (
+    FeatureHistograms,
+    binned_ks_statistic,
+    drift_report,
+    monitored_columns,
+    population_stability_index,
+)
+from pipeline.scoring import prepare_scoring_frame, score_csv_in_chunks, score_frame
+from tests.helpers import sample_deals, trained_model
+
+SEGMENTS = {"region": ["EMEA", "NA"]}
+
+
+def _histograms(amount: np.ndarray, regions: np.ndarray) -> FeatureHistograms:
+    return FeatureHistograms.fit(
+        {"amount": amount}, pd.DataFrame({"region": regions}), SEGMENTS, bins=10
+    )
+
+
+def test_psi_and_ks_separate_stable_from_shifted_data() -> None:
+    rng = np.random.default_rng(0)
+    regions = rng.choice(["EMEA", "NA"], 20_000)
+    reference = _histograms(rng.normal(0, 1, 20_000), regions)
+
+    same = reference.empty_copy().update(
+        {"amount": rng.normal(0, 1, 20_000)}, pd.DataFrame({"region": regions})
+    )
+    shifted_amount = rng.normal(0, 1, 20_000) + np.where(regions == "NA", 1.0, 0.0)
+    shifted = reference.empty_copy().update(
+        {"amount": shifted_amount}, pd.DataFrame({"region": regions})
+    )
+
+    assert population_stability_index(reference.counts["amount"], same.counts["amount"]) < 0.01
+    assert binned_ks_statistic(reference.counts["amount"], same.counts["amount"]) < 0.02
+
+    report = drift_report(reference, shifted, min_segment_deals=100)
+    by_region = report["segments"]["region"]
+    assert by_region["EMEA"]["amount"]["status"] == "stable"
+    assert by_region["NA"]["amount"]["status"] == "drift"
+    assert by_region["NA"]["amount"]["ks"] > 0.3
+    assert (
+        report["features"]["amount"]["psi"]
+        > drift_report(reference, same)["features"]["amount"]["psi"]
+    )
+
+
+def test_missing_and_unknown_values_get_their_own_bins() -> None:
+    reference = _histograms(np.arange(100, dtype=float), np.array(["EMEA", "NA"] * 50))
+    current = reference.empty_copy().update(
+        {"amount": np.array([np.nan, 5.0, 1e9, -np.inf])},
+        pd.DataFrame({"region": ["EMEA", "APAC", None, "NA"]}),
+    )
+    counts = current.counts["amount"]
+    assert counts[-1] == 1 and counts[0] == 2 and counts[-2] == 1
+    assert current.segment_counts["region"]["amount"].sum(axis=1).tolist() == [1, 1, 2]
+
+    report = drift_report(reference, current, min_segment_deals=2)
+    assert list(report["segments"]["region"]) == []
+
+
+def test_undefined_scores_are_written_as_null() -> None:
+    reference = _histograms(np.arange(100, dtype=float), np.array(["EMEA", "NA"] * 50))
+    report = drift_report(reference, reference.empty_copy())
+
+    assert report["features"]["amount"] == {"psi": None, "ks": None, "status": "stable"}
+    assert report["feature_drift_score"] is None and report["prediction_drift_score"] is None
+    assert report["alert_status"] == "healthy"
+    assert "NaN" not in json.dumps(report, allow_nan=False)
+
+
+def test_chunked_updates_merge_and_round_trip_match_one_pass(tmp_path: Path) -> None:
+    rng = np.random.default_rng(1)
+    amount = rng.lognormal(10, 1, 5_000)
+    amount[::97] = np.nan
+    regions = rng.choice(["EMEA", "NA", "LATAM"], 5_000)
+    reference = _histograms(amount, regions)
+
+    halves = [reference.empty_copy(), reference.empty_copy()]
+    for chunk in np.array_split(np.arange(5_000), 7):
+        halves[chunk[0] % 2].update(
+            {"amount": amount[chunk]}, pd.DataFrame({"region": regions[chunk]})
+        )
+    merged = halves[0].merge(halves[1])
+    reference.save(tmp_path / "drift_reference.json")
+    loaded = FeatureHistograms.load(tmp_path / "drift_reference.json")
+
+    for histograms in (merged, loaded):
+        assert histograms.rows == reference.rows
+        assert np.array_equal(histograms.counts["amount"], reference.counts["amount"])
+        assert np.array_equal(
+            histograms.segment_counts["region"]["amount"],
+            reference.segment_counts["region"]["amount"],
+        )
+
+
+def test_scoring_paths_fill_the_same_histograms(tmp_path: Path) -> None:
+    model = trained_model()
+    deals = sample_deals(400)
+    transformer = RiskFeatureTransformer().fit(prepare_scoring_frame(deals.copy()))
+    scored = score_frame(prepare_scoring_frame(deals.copy()), model, transformer)
+    reference = FeatureHistograms.fit(
+        monitored_columns(
+            {column: scored[column].to_numpy() for column in MODEL_FEATURES},
+            scored["loss_probability"].to_numpy(),
+        ),
+        scored,
+        transformer.segment_encoder.vocabularies,
+    )
+
+    full, lean, chunked = (reference.empty_copy() for _ in range(3))
+    score_frame(prepare_scoring_frame(deals.copy()), model, transformer, drift=full)
+    score_frame(prepare_scoring_frame(deals.copy()), model, transformer, lean=True, drift=lean)
+    input_path = tmp_path / "deals.csv"
+    deals.to_csv(input_path, index=False)
+    score_csv_in_chunks(
+        input_path, tmp_path / "out.csv", model, transformer, 150, lean=True, drift=chunked
+    )
+
+    for histograms in (full, lean, chunked):
+        assert histograms.rows == 400
+        for column in reference.edges:
+            assert np.array_equal(histograms.counts[column], reference.counts[column])
+    report = drift_report(reference, chunked, min_segment_deals=50)
+    assert report["alert_status"] == "healthy"
+    assert report["prediction_drift_score"] == 0.0
+    assert set(report["segments"]["industry"]) == {"Finance", "Health", "Tech"}
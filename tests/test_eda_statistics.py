@@ -0,0 +1,57 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from data.data_loader import add_temporal_features, load_sales_data
+from data.eda_statistics import RunningMoments, summarize_sales_data
+from tests.helpers import sample_deals
+
+
+def test_running_moments_merge_matches_numpy() -> None:
+    values = np.random.default_rng(0).normal(loc=5, scale=3, size=1_000)
+    merged = RunningMoments()
+    for part in np.array_split(values, 7):
+        merged.merge(RunningMoments().update(part))
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.std == pytest.approx(values.std(ddof=1))
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+def test_streaming_summary_matches_in_memory_describe(tmp_path: Path) -> None:
+    deals = sample_deals(150)
+    csv_path = tmp_path / "deals.csv"
+    parquet_path = tmp_path / "deals.parquet"
+    deals.to_csv(csv_path, index=False)
+    loaded = load_sales_data(csv_path)
+    loaded.to_parquet(parquet_path, row_group_size=40)
+    df = add_temporal_features(loaded)
+    expected = df.describe()
+
+    for paths, workers in (([csv_path], 1), ([parquet_path], 2)):
+        summary = summarize_sales_data(paths, chunk_size=32, workers=workers)
+        assert summary.rows == len(df)
+        assert summary.win_rate == pytest.approx((df["outcome"] == "Won").mean())
+        assert summary.date_range == (df["created_date"].min(), df["created_date"].max())
+        statistics = summary.describe()
+        assert list(statistics.index) == list(expected.index)
+        for column in expected.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                for row in ["min", "25%", "50%", "75%", "max"]:
+                    assert abs(statistics.loc[row, column] - expected.loc[row, column]) < (
+                        pd.Timedelta(seconds=1)
+                    )
+            else:
+                np.testing.assert_allclose(
+                    statistics[column].astype(float), expected[column].astype(float), rtol=1e-9
+                )
+        industry = df.groupby("industry", observed=True)["outcome"].apply(
+            lambda outcome: (outcome == "Won").mean()
+        )
+        rates = summary.segment_win_rates()["industry"]
+        assert rates.sort_index().to_numpy() == pytest.approx(industry.sort_index().to_numpy())
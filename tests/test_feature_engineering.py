@@ -1,12 +1,24 @@
 from pathlib import Path
 import sys
 
+import numpy as np
 import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from features.feature_engineering import engineer_risk_features
-from features.segment_probabilities import calculate_segment_probabilities
+from config import MODEL_FEATURES, SEGMENT_COLUMNS
+from features.feature_engineering import (
+    FeatureStatisticsAccumulator,
+    build_feature_matrix,
+    compute_feature_statistics,
+    engineer_risk_features,
+)
+from features.segment_probabilities import (
+    calculate_segment_counts,
+    calculate_segment_probabilities,
+    merge_segment_counts,
+    segment_probabilities_from_counts,
+)
 
 
 def test_engineer_risk_features() -> None:
@@ -31,3 +43,137 @@ def test_engineer_risk_features() -> None:
     assert "rapv_aging_value" in df_features.columns
     assert "deal_amount_log" in df_features.columns
     assert "is_long_cycle" in df_features.columns
+
+
+def test_feature_statistics_accumulator_matches_full_data() -> None:
+    rng = np.random.default_rng(0)
+    n_rows = 101
+    df = pd.DataFrame(
+        {
+            "outcome": rng.choice(["Won", "Lost"], n_rows),
+            "industry": rng.choice(["Tech", "Finance", "Health"], n_rows),
+            "product_type": rng.choice(["Core", "Pro"], n_rows),
+            "lead_source": rng.choice(["Inbound", "Partner", "Referral"], n_rows),
+            "region": rng.choice(["NA", "EMEA"], n_rows),
+            "deal_amount": rng.integers(2000, 100000, n_rows),
+            "sales_cycle_days": rng.integers(7, 120, n_rows),
+            "month": rng.integers(1, 13, n_rows),
+        }
+    )
+
+    accumulator = FeatureStatisticsAccumulator()
+    for start in range(0, n_rows, 17):
+        accumulator.update(df.iloc[start : start + 17])
+
+    assert accumulator.finalize() == compute_feature_statistics(df)
+    assert accumulator.overall_win_rate == (df["outcome"] == "Won").mean()
+
+
+def test_segment_counts_merge_matches_full_history() -> None:
+    df = pd.DataFrame(
+        {
+            "outcome": ["Won", "Lost", "Lost", "Won", "Won", "Lost"],
+            "industry": ["Tech", "Finance", "Tech", "Finance", "Tech", None],
+            "region": ["EMEA", "EMEA", "APAC", "APAC", "APAC", "EMEA"],
+        }
+    )
+    segments = ["industry", "region"]
+    expected = {
+        segment: df.groupby(segment).apply(lambda x: (x["outcome"] == "Won").mean()).to_dict()
+        for segment in segments
+    }
+
+    merged = merge_segment_counts(
+        [
+            calculate_segment_counts(df.iloc[:2], segments),
+            calculate_segment_counts(df.iloc[2:], segments),
+        ],
+        segments,
+    )
+    assert calculate_segment_probabilities(df, segments) == expected
+    assert segment_probabilities_from_counts(merged, segments) == expected
+    assert merged["total"].sum() == len(df)
+
+
+def test_build_feature_matrix_matches_engineer_risk_features() -> None:
+    rng = np.random.default_rng(3)
+    n_rows = 50
+    df = pd.DataFrame(
+        {
+            "outcome": rng.choice(["Won", "Lost"], n_rows),
+            "industry": rng.choice(["Tech", "Finance", "Health"], n_rows),
+            "product_type": rng.choice(["Core", "Pro"], n_rows),
+            "lead_source": rng.choice(["Inbound", "Partner"], n_rows),
+            "region": rng.choice(["EMEA", "APAC"], n_rows),
+            "deal_amount": rng.integers(2000, 100000, n_rows),
+            "sales_cycle_days": rng.integers(0, 120, n_rows),
+            "month": rng.integers(1, 13, n_rows),
+        }
+    )
+    segment_probs = calculate_segment_probabilities(df.iloc[:30], SEGMENT_COLUMNS)
+    feature_stats = compute_feature_statistics(df.iloc[:30])
+    df.loc[0, "industry"] = "Unseen"
+    df.loc[1, "sales_cycle_days"] = 0
+
+    expected = engineer_risk_features(df, segment_probs, 0.45, feature_stats)
+    columns = MODEL_FEATURES + ["rapv_aging_value", "aging_factor", "median_cycle_region"]
+    matrix = build_feature_matrix(df, segment_probs, 0.45, feature_stats, columns=columns)
+
+    np.testing.assert_array_equal(matrix, expected[columns].to_numpy(dtype=float))
+    assert "win_prob_industry" not in df.columns
+
+
+def _rank_error(values: np.ndarray, estimate: float, q: float) -> float:
+    """Distance from q to the range of ranks estimate holds in values (ties included)."""
+    below = (values < estimate).mean()
+    at_or_below = (values <= estimate).mean()
+    return max(0.0, below - q, q - at_or_below)
+
+
+def test_sketched_feature_statistics_within_rank_error() -> None:
+    rng = np.random.default_rng(3)
+    n_rows = 60_000
+    df = pd.DataFrame(
+        {
+            "outcome": rng.choice(["Won", "Lost"], n_rows),
+            "industry": rng.choice(["Tech", "Finance", "Health"], n_rows),
+            "product_type": rng.choice(["Core", "Pro"], n_rows),
+            "lead_source": rng.choice(["Inbound", "Partner", "Referral"], n_rows),
+            "region": rng.choice(["NA", "EMEA"], n_rows),
+            "deal_amount": rng.lognormal(10, 1, n_rows).round(2),
+            "sales_cycle_days": rng.integers(7, 120, n_rows),
+            "month": rng.integers(1, 13, n_rows),
+        }
+    )
+    error = 0.01
+    # Partitions are sketched independently, as parallel workers would, then merged.
+    merged = FeatureStatisticsAccumulator(quantile_error=error)
+    for seed, part in enumerate(np.array_split(np.arange(n_rows), 6)):
+        partial = FeatureStatisticsAccumulator(quantile_error=error, seed=seed)
+        merged.merge(partial.update(df.iloc[part]))
+    sketched = merged.finalize()
+    exact = compute_feature_statistics(df)
+    assert merged.rows == n_rows
+    assert sketched["mean_cycle"] == exact["mean_cycle"]
+
+    cycles = df["sales_cycle_days"].to_numpy()
+    amounts = df["deal_amount"].to_numpy()
+    assert _rank_error(cycles, sketched["overall_median_cycle"], 0.5) <= error
+    assert _rank_error(amounts, sketched["large_deal_threshold"], 0.5) <= error
+    for segment in SEGMENT_COLUMNS:
+        assert set(sketched["median_cycle"][segment]) == set(exact["median_cycle"][segment])
+        for value, median in sketched["median_cycle"][segment].items():
+            assert _rank_error(cycles[df[segment] == value], median, 0.5) <= error
+
+    # Downstream, only deals between the exact and sketched thresholds change is_large_deal.
+    segment_probs = calculate_segment_probabilities(df, SEGMENT_COLUMNS)
+    with_exact = engineer_risk_features(df, segment_probs, feature_stats=exact)
+    with_sketch = engineer_risk_features(df, segment_probs, feature_stats=sketched)
+    assert (with_exact["is_large_deal"] != with_sketch["is_large_deal"]).mean() <= error
+    aging_change = (with_sketch["rapv_aging_value"] / with_exact["rapv_aging_value"] - 1).abs()
+    assert aging_change.max() < 0.05
+    # Below the sketch size nothing is compacted, so the statistics are exact.
+    small = df.iloc[:200]
+    assert compute_feature_statistics(small, quantile_error=error) == (
+        compute_feature_statistics(small)
+    )
@@ -0,0 +1,93 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from features.feature_store import (
+    InMemoryFeatureStore,
+    SQLiteFeatureStore,
+    cached_transform_matrix,
+)
+from features.feature_transformer import RiskFeatureTransformer
+from pipeline.scoring import prepare_scoring_frame
+from tests.helpers import sample_deals
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _stores(tmp_path: Path, clock: _Clock, max_entries: int) -> list:
+    return [
+        InMemoryFeatureStore(max_entries, default_ttl_seconds=60, clock=clock),
+        SQLiteFeatureStore(tmp_path / "features.db", max_entries, 60, clock=clock),
+    ]
+
+
+@pytest.mark.parametrize("backend", [0, 1])
+def test_store_evicts_least_recently_used(tmp_path: Path, backend: int) -> None:
+    clock = _Clock()
+    store = _stores(tmp_path, clock, max_entries=2)[backend]
+    store.put("a", np.array([1.0, 2.0]))
+    clock.now += 1
+    store.put("b", np.array([3.0]))
+    clock.now += 1
+    np.testing.assert_array_equal(store.get("a"), [1.0, 2.0])
+    clock.now += 1
+    store.put("c", np.array([4.0]))
+
+    assert store.get("b") is None
+    assert store.get("c") is not None
+    assert len(store) == 2
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["puts"]) == (2, 1, 3)
+    assert stats["evictions"] >= 1
+
+
+@pytest.mark.parametrize("backend", [0, 1])
+def test_store_expires_entries_after_ttl(tmp_path: Path, backend: int) -> None:
+    clock = _Clock()
+    store = _stores(tmp_path, clock, max_entries=10)[backend]
+    store.put("short", np.array([1.0]))
+    store.put("long", np.array([2.0]), ttl_seconds=600)
+    clock.now += 61
+
+    assert store.get("short") is None
+    np.testing.assert_array_equal(store.get("long"), [2.0])
+    store.purge_expired()
+    assert len(store) == 1
+
+
+def test_cached_matrix_matches_transformer_and_reuses_rows() -> None:
+    df = prepare_scoring_frame(sample_deals(60))
+    transformer = RiskFeatureTransformer().fit(df)
+    store = InMemoryFeatureStore()
+    expected = transformer.transform_matrix(df)
+
+    np.testing.assert_allclose(cached_transform_matrix(df, transformer, store), expected)
+    assert store.stats()["misses"] == 60
+    np.testing.assert_allclose(cached_transform_matrix(df, transformer, store), expected)
+    assert store.stats()["hits"] == 60
+
+    # A changed deal gets a new fingerprint and is recomputed.
+    changed = df.copy()
+    changed.loc[5, "deal_amount"] *= 10
+    np.testing.assert_allclose(
+        cached_transform_matrix(changed, transformer, store),
+        transformer.transform_matrix(changed),
+    )
+    assert store.stats()["misses"] == 61
+
+    # Refitted statistics never read rows cached under the old ones.
+    refitted = RiskFeatureTransformer().fit(df.iloc[:30])
+    np.testing.assert_allclose(
+        cached_transform_matrix(df, refitted, store), refitted.transform_matrix(df)
+    )
+    assert store.stats()["misses"] == 121
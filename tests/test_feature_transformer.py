@@ -0,0 +1,56 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import SEGMENT_COLUMNS
+from features.feature_engineering import engineer_risk_features
+from features.feature_transformer import RiskFeatureTransformer
+from features.segment_probabilities import calculate_segment_counts
+
+
+def _history() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "deal_id": ["D1", "D2", "D3", "D4"],
+            "outcome": ["Won", "Lost", "Lost", "Won"],
+            "industry": ["Tech", "Finance", "Tech", "Finance"],
+            "product_type": ["Core", "Core", "Pro", "Pro"],
+            "lead_source": ["Inbound", "Partner", "Partner", "Inbound"],
+            "region": ["EMEA", "EMEA", "APAC", "APAC"],
+            "deal_amount": [10000, 20000, 5000, 40000],
+            "sales_cycle_days": [30, 90, 60, 100],
+            "month": [1, 12, 6, 3],
+        }
+    )
+
+
+def test_fit_transform_matches_engineer_risk_features() -> None:
+    df = _history()
+    transformer = RiskFeatureTransformer()
+    features = transformer.fit_transform(df)
+    expected = engineer_risk_features(df, transformer.segment_probs)
+    pd.testing.assert_frame_equal(features, expected)
+
+
+def test_single_deal_matches_batch_after_reload(tmp_path: Path) -> None:
+    df = _history()
+    RiskFeatureTransformer().fit(df).save(tmp_path)
+    transformer = RiskFeatureTransformer.load(tmp_path)
+
+    batch = transformer.transform(df.drop(columns="outcome"))
+    single = transformer.transform(df.drop(columns="outcome").iloc[[2]])
+    pd.testing.assert_frame_equal(single, batch.iloc[[2]])
+
+
+def test_update_segment_counts_matches_refit(tmp_path: Path) -> None:
+    df = _history()
+    RiskFeatureTransformer().fit(df.iloc[:2]).save(tmp_path)
+    transformer = RiskFeatureTransformer.load(tmp_path)
+    transformer.update_segment_counts(calculate_segment_counts(df.iloc[2:], SEGMENT_COLUMNS))
+
+    refit = RiskFeatureTransformer().fit(df)
+    assert transformer.segment_probs == refit.segment_probs
+    assert transformer.overall_win_rate == refit.overall_win_rate
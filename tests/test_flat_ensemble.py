@@ -0,0 +1,85 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from models.flat_ensemble import ROW_BLOCK_SIZE, FlatTreeEnsemble, export_flat_model
+from models.risk_scorer import predict_loss_probability, train_model
+
+
+def _training_data(n: int = 400) -> tuple:
+    rng = np.random.default_rng(11)
+    X = pd.DataFrame(
+        {
+            "f1": rng.normal(size=n),
+            "f2": rng.uniform(size=n).round(2),
+            "f3": rng.integers(0, 3, n),
+        }
+    )
+    y = pd.Series((X["f1"] + X["f3"] + rng.normal(scale=0.7, size=n) > 1).astype(int))
+    return X, y
+
+
+@pytest.mark.parametrize("model_type", ["gradient_boosting", "random_forest"])
+def test_flat_model_matches_predict_loss_probability(model_type: str, tmp_path: Path) -> None:
+    X, y = _training_data()
+    model = train_model(X, y, model_type)
+
+    flat_model = export_flat_model(model, list(X.columns))
+    flat_model.save(tmp_path / "flat.npz")
+    flat_model = FlatTreeEnsemble.load(tmp_path / "flat.npz")
+
+    expected = predict_loss_probability(model, X)
+    np.testing.assert_allclose(flat_model.predict_loss_probability(X), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(
+        flat_model.predict_loss_probability(X.iloc[:1]), expected[:1], rtol=0, atol=1e-12
+    )
+    assert len(X) > ROW_BLOCK_SIZE
+
+
+def test_flat_model_matches_on_split_thresholds() -> None:
+    X, y = _training_data()
+    model = train_model(X, y, "gradient_boosting")
+    flat_model = export_flat_model(model, list(X.columns))
+
+    tree = model.estimators_[0, 0].tree_
+    boundary = X.iloc[: tree.node_count].astype(np.float32)
+    for row, (feature, threshold) in enumerate(zip(tree.feature, tree.threshold)):
+        if feature >= 0:
+            value = np.float32(threshold)
+            boundary.iloc[row, feature] = (
+                np.nextafter(value, np.float32(np.inf)) if row % 2 else value
+            )
+
+    np.testing.assert_allclose(
+        flat_model.predict_loss_probability(boundary),
+        predict_loss_probability(model, boundary),
+        rtol=0,
+        atol=1e-12,
+    )
+
+
+def test_flat_model_rejects_unsupported_models() -> None:
+    X, y = _training_data()
+    model = train_model(X, y, "logistic_regression")
+    with pytest.raises(ValueError):
+        export_flat_model(model, list(X.columns))
+
+
+@pytest.mark.filterwarnings("ignore:overflow encountered in cast:RuntimeWarning")
+@pytest.mark.parametrize("bad_value", [np.nan, np.inf, 1e300])
+def test_flat_model_rejects_non_finite_input_like_sklearn(bad_value: float) -> None:
+    X, y = _training_data()
+    model = train_model(X, y, "gradient_boosting")
+    flat = export_flat_model(model, list(X.columns))
+    X_bad = X.head(3).astype(float)
+    X_bad.iloc[1, 0] = bad_value
+
+    with pytest.raises(ValueError):
+        model.predict_proba(X_bad)
+    with pytest.raises(ValueError, match="NaN, infinity"):
+        flat.predict_loss_probability(X_bad)
@@ -0,0 +1,71 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from models.hyperparameter_search import sample_candidates, successive_halving_search
+
+SEARCH_SPACE = {"max_depth": [1, 2, 3], "learning_rate": [0.05, 0.2, 0.5]}
+
+
+def _split_data(n_rows: int = 1500) -> tuple:
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(n_rows, 4))
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.8, size=n_rows) > 0).astype(int)
+    split = int(n_rows * 0.7)
+    return X[:split], y[:split], X[split:], y[split:]
+
+
+def test_sample_candidates_are_distinct_grid_points() -> None:
+    candidates = sample_candidates(SEARCH_SPACE, 20)
+    assert len(candidates) == 9
+    assert len({tuple(sorted(candidate.items())) for candidate in candidates}) == 9
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_successive_halving_grows_survivors_and_halves_candidates() -> None:
+    X_train, y_train, X_valid, y_valid = _split_data()
+    result = successive_halving_search(
+        X_train,
+        y_train,
+        X_valid,
+        y_valid,
+        search_space=SEARCH_SPACE,
+        n_candidates=9,
+        eta=3,
+        max_estimators=90,
+        min_rows=100,
+        patience=10,
+    )
+
+    rungs = [[trial for trial in result.trials if trial.rung == rung] for rung in range(3)]
+    assert len(rungs[0]) == 9
+    assert 0 < len(rungs[2]) <= len(rungs[1]) <= 3
+    assert rungs[0][0].n_rows < rungs[1][0].n_rows
+    assert rungs[0][0].n_estimators < rungs[1][0].n_estimators
+    assert not result.budget_exhausted
+    assert 1 <= result.best_params["n_estimators"] <= 90
+    assert set(SEARCH_SPACE) < set(result.best_params)
+    assert result.best_score > 0.7
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_time_budget_stops_after_first_rung() -> None:
+    X_train, y_train, X_valid, y_valid = _split_data()
+    result = successive_halving_search(
+        X_train,
+        y_train,
+        X_valid,
+        y_valid,
+        search_space=SEARCH_SPACE,
+        n_candidates=9,
+        max_estimators=90,
+        min_rows=100,
+        time_budget_seconds=1e-9,
+    )
+    assert result.budget_exhausted
+    assert {trial.rung for trial in result.trials} == {0}
+    assert result.best_params["n_estimators"] >= 1
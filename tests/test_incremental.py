@@ -0,0 +1,80 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import MODEL_FEATURES
+from data.data_loader import apply_sales_schema, parse_date_columns
+from features.feature_transformer import RiskFeatureTransformer
+from models.risk_scorer import train_model
+from pipeline.incremental import ScoringStateStore, deal_fingerprints, score_incrementally
+from pipeline.scoring import prepare_scoring_frame, score_frame
+from tests.helpers import sample_deals
+
+
+def _raw(df: pd.DataFrame) -> pd.DataFrame:
+    """Deals as load_sales_data returns them."""
+    return parse_date_columns(apply_sales_schema(df.copy()))
+
+
+def _fitted() -> tuple:
+    df = prepare_scoring_frame(_raw(sample_deals(120)))
+    transformer = RiskFeatureTransformer().fit(df)
+    features = transformer.transform(df)
+    model = train_model(features[MODEL_FEATURES], features["is_lost"], "gradient_boosting")
+    return model, transformer
+
+
+def _full_scores(df: pd.DataFrame, model, transformer) -> np.ndarray:
+    scored = score_frame(prepare_scoring_frame(df.copy()), model, transformer, lean=True)
+    return scored["loss_probability"].to_numpy()
+
+
+def test_fingerprints_ignore_loader_dtypes() -> None:
+    deals = sample_deals(20)
+    downcast = _raw(deals)
+    widened = _raw(deals).astype({"deal_amount": "int64", "industry": str})
+    np.testing.assert_array_equal(deal_fingerprints(downcast), deal_fingerprints(widened))
+
+    changed = downcast.copy()
+    changed.loc[3, "sales_cycle_days"] += 1
+    differs = deal_fingerprints(changed) != deal_fingerprints(downcast)
+    assert differs.tolist() == [index == 3 for index in range(20)]
+
+
+def test_rescores_only_new_and_changed_deals(tmp_path: Path) -> None:
+    model, transformer = _fitted()
+    store = ScoringStateStore(tmp_path / "state.pkl")
+    deals = _raw(sample_deals(110))
+    day_one = deals.iloc[:100]
+
+    _, stats = score_incrementally(day_one, model, transformer, store)
+    assert stats.rescored == 100 and stats.full_rescore_reason == "no previous state"
+
+    # Day two: deals 0-9 closed, 20-24 changed, ten new deals opened.
+    day_two = deals.iloc[10:].reset_index(drop=True)
+    day_two.loc[10:14, "deal_amount"] += 5000
+    scored, stats = score_incrementally(day_two, model, transformer, store)
+    assert (stats.rescored, stats.carried_forward) == (15, 85)
+    assert stats.full_rescore_reason is None
+    np.testing.assert_allclose(
+        scored["loss_probability"], _full_scores(day_two, model, transformer)
+    )
+    _, state = store.load()
+    assert len(state) == 100 and "D0" not in state.index
+
+
+def test_artifact_change_invalidates_state(tmp_path: Path) -> None:
+    model, transformer = _fitted()
+    store = ScoringStateStore(tmp_path / "state.pkl")
+    deals = _raw(sample_deals(50))
+    score_incrementally(deals, model, transformer, store)
+
+    transformer.update_segment_counts(transformer.segment_counts.head(3))
+    scored, stats = score_incrementally(deals, model, transformer, store)
+    assert stats.rescored == 50
+    assert stats.full_rescore_reason == "model or segment tables changed"
+    np.testing.assert_allclose(scored["loss_probability"], _full_scores(deals, model, transformer))
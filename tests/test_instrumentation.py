@@ -0,0 +1,117 @@
+from pathlib import Path
+import json
+import sys
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils.instrumentation import (
+    disable_instrumentation,
+    enable_instrumentation,
+    instrumentation_enabled,
+    instrumented,
+    stage,
+    stage_records,
+)
+
+
+@instrumented("test.double")
+def _double(df: pd.DataFrame) -> pd.DataFrame:
+    return df * 2
+
+
+@pytest.fixture(autouse=True)
+def _reset_instrumentation():
+    yield
+    disable_instrumentation()
+
+
+def test_disabled_records_nothing() -> None:
+    assert not instrumentation_enabled()
+    with stage("outer", rows=10) as active:
+        active.rows = 20
+    _double(pd.DataFrame({"a": [1, 2]}))
+    assert stage_records() == []
+
+
+def test_records_rows_and_nesting(tmp_path: Path) -> None:
+    log_path = tmp_path / "metrics.jsonl"
+    prom_path = tmp_path / "metrics.prom"
+    enable_instrumentation(json_log_path=log_path, prometheus_path=prom_path)
+
+    with stage("outer"):
+        _double(pd.DataFrame({"a": np.arange(500)}))
+        _double(pd.DataFrame({"a": np.arange(300)}))
+    records = disable_instrumentation()
+
+    assert [record.stage for record in records] == ["test.double", "test.double", "outer"]
+    assert [record.rows for record in records] == [500, 300, None]
+    assert records[0].parent == "outer" and records[2].parent is None
+    assert records[0].rows_per_second > 0 and records[0].peak_memory_mb > 0
+
+    lines = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [line["stage"] for line in lines] == ["test.double", "test.double", "outer"]
+
+    prom = prom_path.read_text()
+    assert "# TYPE skygeni_stage_seconds_total counter" in prom
+    assert 'skygeni_stage_calls_total{stage="test.double"} 2' in prom
+    assert 'skygeni_stage_rows_total{stage="test.double"} 800' in prom
+
+
+def test_tracemalloc_peak_is_per_stage() -> None:
+    enable_instrumentation(memory="tracemalloc")
+    with stage("outer"):
+        with stage("large"):
+            buffer = np.ones(4_000_000)  # ~30 MB
+            del buffer
+        with stage("small"):
+            buffer = np.ones(1_000)
+            del buffer
+    records = {record.stage: record for record in disable_instrumentation()}
+
+    assert records["large"].peak_memory_mb > 25
+    assert records["small"].peak_memory_mb < 1
+    # The outer stage sees the peak reached inside its first child.
+    assert records["outer"].peak_memory_mb >= records["large"].peak_memory_mb
+
+
+def test_rejects_unknown_memory_mode() -> None:
+    with pytest.raises(ValueError):
+        enable_instrumentation(memory="psutil")
+
+
+def test_rss_without_resource_module_falls_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    # A None entry makes the import fail, as on Windows.
+    monkeypatch.setitem(sys.modules, "resource", None)
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    enable_instrumentation()
+    with stage("outer"):
+        pass
+    (record,) = disable_instrumentation()
+    assert record.stage == "outer" and record.peak_memory_mb is None
+
+
+def test_json_log_is_opened_once_per_session(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    log_path = tmp_path / "metrics.jsonl"
+    opened = []
+    original_open = Path.open
+
+    def counting_open(path: Path, mode: str = "r", *args: Any, **kwargs: Any) -> Any:
+        if path == log_path and mode == "a":
+            opened.append(path)
+        return original_open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "open", counting_open)
+    enable_instrumentation(json_log_path=log_path)
+    for _ in range(3):
+        with stage("step"):
+            pass
+    assert len(log_path.read_text().splitlines()) == 3
+    disable_instrumentation()
+    assert len(opened) == 1
@@ -0,0 +1,59 @@
+import argparse
+import functools
+from pathlib import Path
+import sys
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cli.train import new_transformer
+from config import RANDOM_STATE
+from features.feature_transformer import RiskFeatureTransformer
+from models.model_selection import build_fold_matrices, select_model
+from pipeline.scoring import prepare_scoring_frame
+from tests.helpers import sample_deals
+
+
+def test_fold_features_fitted_on_training_rows_only() -> None:
+    df = prepare_scoring_frame(sample_deals(120))
+    folds = build_fold_matrices(df, n_folds=3)
+
+    assert len(folds) == 3
+    assert sum(len(y_valid) for _, _, _, y_valid in folds) == len(df)
+    splitter = StratifiedKFold(n_splits=3, shuffle=True, random_state=RANDOM_STATE)
+    train_rows, valid_rows = next(splitter.split(np.zeros(len(df)), df["is_lost"]))
+    transformer = RiskFeatureTransformer().fit(df.iloc[train_rows])
+    np.testing.assert_array_equal(folds[0][0], transformer.transform_matrix(df.iloc[train_rows]))
+    np.testing.assert_array_equal(folds[0][2], transformer.transform_matrix(df.iloc[valid_rows]))
+
+
+def test_folds_use_the_train_command_feature_options() -> None:
+    df = prepare_scoring_frame(sample_deals(120))
+    args = argparse.Namespace(quantile_error=0.01, rolling_window=2, rolling_half_life=None)
+    folds = build_fold_matrices(
+        df, n_folds=3, transformer_factory=functools.partial(new_transformer, args)
+    )
+
+    splitter = StratifiedKFold(n_splits=3, shuffle=True, random_state=RANDOM_STATE)
+    train_rows, valid_rows = next(splitter.split(np.zeros(len(df)), df["is_lost"]))
+    shipped = new_transformer(args).fit(df.iloc[train_rows])
+    assert shipped.rolling_win_rates is not None and shipped.quantile_error == 0.01
+    np.testing.assert_array_equal(folds[0][2], shipped.transform_matrix(df.iloc[valid_rows]))
+    plain = RiskFeatureTransformer().fit(df.iloc[train_rows])
+    assert not np.array_equal(folds[0][2], plain.transform_matrix(df.iloc[valid_rows]))
+
+
+def test_select_model_compares_every_model_type() -> None:
+    df = prepare_scoring_frame(sample_deals(150))
+    result = select_model(
+        df, model_types=["logistic_regression", "random_forest"], n_folds=3, max_workers=2
+    )
+
+    assert set(result.mean_metrics) == {"logistic_regression", "random_forest"}
+    assert len(result.fold_scores) == 6
+    assert result.best_model_type == max(
+        result.mean_metrics, key=lambda name: result.mean_metrics[name]["roc_auc"]
+    )
+    assert 0.0 <= result.std_metrics["random_forest"]["roc_auc"] <= 0.5
@@ -0,0 +1,49 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils.quantile_sketch import QuantileSketch
+
+
+def _max_rank_error(sketch: QuantileSketch, values: np.ndarray) -> float:
+    ordered = np.sort(values)
+    qs = np.linspace(0.01, 0.99, 99)
+    estimates = sketch.quantiles(qs)
+    true_ranks = np.searchsorted(ordered, estimates, side="right") / len(values)
+    return float(np.abs(true_ranks - qs).max())
+
+
+def test_exact_before_compaction() -> None:
+    values = np.random.default_rng(0).normal(size=150)
+    sketch = QuantileSketch(k=200).update(values)
+    qs = [0.0, 0.25, 0.5, 0.75, 1.0]
+    np.testing.assert_allclose(sketch.quantiles(qs), np.quantile(values, qs))
+
+
+def test_rank_error_bounded_and_merge() -> None:
+    values = np.random.default_rng(1).lognormal(mean=10, sigma=1, size=200_000)
+    single = QuantileSketch(k=200, seed=0)
+    for chunk in np.array_split(values, 20):
+        single.update(chunk)
+    assert single.count == len(values)
+    assert single.size < 1_000
+    assert _max_rank_error(single, values) < 0.02
+
+    merged = QuantileSketch(k=200, seed=1)
+    for seed, part in enumerate(np.array_split(values, 8)):
+        merged.merge(QuantileSketch(k=200, seed=seed + 2).update(part))
+    assert merged.count == len(values)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+    assert _max_rank_error(merged, values) < 0.02
+    assert abs(merged.rank(np.median(values)) - 0.5) < 0.02
+
+
+def test_for_error_sizes_sketch_to_bound() -> None:
+    values = np.random.default_rng(2).exponential(size=100_000)
+    for error in (0.05, 0.01):
+        sketch = QuantileSketch.for_error(error, seed=0).update(values)
+        assert sketch.rank_error <= error
+        assert _max_rank_error(sketch, values) <= error
@@ -0,0 +1,59 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from models.risk_scorer import train_model
+from recommendations.recommendation_engine import (
+    generate_recommendations,
+    generate_recommendations_batch,
+    identify_risk_factors,
+    identify_risk_factors_batch,
+)
+
+FEATURES = ["win_prob_lead_source", "is_long_cycle", "is_large_deal", "rem_score"]
+
+
+def _deals() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    n_rows = 40
+    return pd.DataFrame(
+        {
+            "lead_source": rng.choice(["Inbound", "Partner", "Referral"], n_rows),
+            "win_prob_lead_source": rng.uniform(0.3, 0.6, n_rows),
+            "is_long_cycle": rng.integers(0, 2, n_rows),
+            "is_large_deal": rng.integers(0, 2, n_rows),
+            "rem_score": rng.uniform(0, 500, n_rows),
+            "sales_cycle_days": rng.integers(7, 120, n_rows),
+            "deal_amount": rng.integers(2000, 100000, n_rows),
+            "is_lost": rng.integers(0, 2, n_rows),
+            "risk_category": rng.choice(["low", "medium", "high", "critical"], n_rows),
+        },
+        index=[f"D{i}" for i in range(n_rows)],
+    )
+
+
+@pytest.mark.parametrize("model_type", ["random_forest", "logistic_regression"])
+def test_batch_recommendations_match_per_deal(model_type: str) -> None:
+    deals = _deals()
+    model = train_model(deals[FEATURES], deals["is_lost"], model_type)
+
+    factors = identify_risk_factors_batch(deals, model, FEATURES, top_n=3)
+    recommendations = generate_recommendations_batch(deals["risk_category"], factors, deals)
+
+    for deal_id, deal in deals.iterrows():
+        expected_factors = identify_risk_factors(deal, model, FEATURES, top_n=3)
+        for rank, factor in enumerate(expected_factors, start=1):
+            assert factors.loc[deal_id, f"risk_factor_{rank}"] == factor.feature
+            assert factors.loc[deal_id, f"risk_factor_{rank}_impact"] == factor.impact
+            assert factors.loc[deal_id, f"risk_factor_{rank}_description"] == factor.description
+
+        expected = generate_recommendations(deal["risk_category"], expected_factors, deal)
+        actual = recommendations.loc[[deal_id]] if deal_id in recommendations.index else []
+        assert [(r.priority, r.action, r.rationale) for r in expected] == [
+            tuple(row) for row in np.asarray(actual).tolist()
+        ]
@@ -0,0 +1,47 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from models.risk_scorer import risk_category_for_score, risk_score_from_probability
+from pipeline.risk_digest import add_risk_columns, top_risk_deals
+
+
+def test_vectorized_buckets_match_scalar_helpers() -> None:
+    probabilities = np.array([0.0, 0.25, 0.255, 0.2551, 0.26, 0.505, 0.5, 0.751, 0.76, 1.0])
+    probabilities = np.concatenate([probabilities, np.random.default_rng(3).random(500)])
+    df = add_risk_columns(pd.DataFrame({"loss_probability": probabilities}))
+
+    expected_scores = [risk_score_from_probability(p) for p in probabilities]
+    assert df["risk_score"].tolist() == expected_scores
+    assert df["risk_category"].tolist() == [risk_category_for_score(s) for s in expected_scores]
+
+
+def test_top_risk_deals_matches_full_sort() -> None:
+    rng = np.random.default_rng(11)
+    n_rows = 5000
+    df = pd.DataFrame(
+        {
+            "deal_id": [f"D{i}" for i in range(n_rows)],
+            "sales_rep_id": rng.choice([f"R{i}" for i in range(40)] + [None], n_rows),
+            # Coarse probabilities so ties are common.
+            "loss_probability": rng.integers(0, 20, n_rows) / 20,
+        }
+    )
+    df.loc[df["sales_rep_id"] == "R7", "sales_rep_id"] = "R_small"
+    df.loc[df.index[df["sales_rep_id"] == "R_small"][3:], "sales_rep_id"] = "R8"
+
+    digest = top_risk_deals(df, n=5)
+    expected = (
+        df.dropna(subset=["sales_rep_id"])
+        .sort_values(["sales_rep_id", "loss_probability"], ascending=[True, False], kind="stable")
+        .groupby("sales_rep_id")
+        .head(5)
+    )
+    assert digest["deal_id"].tolist() == expected["deal_id"].tolist()
+    assert list(digest.columns) == ["sales_rep_id", "rank", "deal_id", "loss_probability"]
+    small = digest[digest["sales_rep_id"] == "R_small"]
+    assert small["rank"].tolist() == [1, 2, 3]
@@ -0,0 +1,133 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import FEATURE_INPUT_COLUMNS, MODEL_FEATURES, SEGMENT_COLUMNS
+from data.data_loader import add_temporal_features, apply_sales_schema, parse_date_columns
+from features.feature_engineering import engineer_risk_features
+from features.feature_store import transformer_version
+from features.feature_transformer import RiskFeatureTransformer
+from features.rolling_win_rates import RollingSegmentWinRates
+from features.segment_probabilities import calculate_segment_probabilities
+from pipeline.incremental import artifact_version
+from service.scoring_service import DealScorer
+from tests.helpers import sample_deals, trained_model
+
+
+def _deals(n_rows: int = 300) -> pd.DataFrame:
+    return add_temporal_features(parse_date_columns(apply_sales_schema(sample_deals(n_rows))))
+
+
+def _brute_force_rate(df: pd.DataFrame, segment: str, value: str, weights: np.ndarray) -> float:
+    mask = (df[segment] == value).to_numpy()
+    won = (df["outcome"] == "Won").to_numpy()
+    return float((weights * won)[mask].sum() / weights[mask].sum())
+
+
+def test_monthly_updates_match_batch_and_brute_force() -> None:
+    df = _deals()
+    batch = RollingSegmentWinRates().update(df)
+    monthly = RollingSegmentWinRates()
+    for month in sorted(df["created_month"].unique()):
+        monthly.update(df[df["created_month"] == month])
+    assert monthly.end == batch.end == df["created_month"].max()
+
+    all_time = calculate_segment_probabilities(df, SEGMENT_COLUMNS)
+    for segment in SEGMENT_COLUMNS:
+        assert monthly.window_rates()[segment] == pytest.approx(all_time[segment])
+
+    age = batch.end.ordinal - df["created_month"].array.asi8
+    for rates in (batch, monthly):
+        windowed = rates.window_rates(window=3)["industry"]
+        decayed = rates.decayed_rates(half_life=2)["industry"]
+        for value in ("Tech", "Finance", "Health"):
+            recent = (age < 3).astype(float)
+            assert np.isclose(windowed[value], _brute_force_rate(df, "industry", value, recent))
+            decay = 0.5 ** (age / 2)
+            assert np.isclose(decayed[value], _brute_force_rate(df, "industry", value, decay))
+
+
+def test_late_deals_invalidate_cached_decay() -> None:
+    df = _deals()
+    cutoff = df["created_month"].max() - 2
+    rates = RollingSegmentWinRates().update(df[df["created_month"] > cutoff])
+    rates.decayed_rates(half_life=3)
+    rates.update(df[df["created_month"] <= cutoff])
+
+    expected = RollingSegmentWinRates().update(df)
+    assert rates.start == expected.start
+    decayed = rates.decayed_rates(half_life=3)
+    for segment, segment_rates in expected.decayed_rates(half_life=3).items():
+        assert decayed[segment] == pytest.approx(segment_rates)
+
+
+def test_deal_rates_only_use_earlier_periods(tmp_path: Path) -> None:
+    df = _deals()
+    rates = RollingSegmentWinRates(window=2).update(df)
+    point_in_time = rates.deal_rates(df)["region"]
+
+    first_month = df["created_month"] == rates.start
+    assert np.isnan(point_in_time[first_month.to_numpy()]).all()
+    deal = int(np.flatnonzero(~first_month.to_numpy())[0])
+    month, region = df["created_month"].iloc[deal], df["region"].iloc[deal]
+    earlier = df[(df["created_month"] < month) & (df["created_month"] >= month - 2)]
+    expected = (earlier.loc[earlier["region"] == region, "outcome"] == "Won").mean()
+    assert np.isclose(point_in_time[deal], expected)
+
+    rates.save(tmp_path / "rolling.json")
+    loaded = RollingSegmentWinRates.load(tmp_path / "rolling.json")
+    np.testing.assert_array_equal(loaded.deal_rates(df)["region"], point_in_time)
+
+
+def test_engineer_risk_features_uses_rolling_rates_with_fallback() -> None:
+    df = _deals()
+    segment_probs = calculate_segment_probabilities(df, SEGMENT_COLUMNS)
+    rates = RollingSegmentWinRates(half_life=1).update(df)
+
+    features = engineer_risk_features(df, segment_probs, rolling_win_rates=rates)
+    recent = rates.deal_rates(df)["industry"]
+    has_history = ~np.isnan(recent)
+    engineered = features["win_prob_industry"].to_numpy()
+    np.testing.assert_allclose(engineered[has_history], recent[has_history])
+    static = df["industry"].map(segment_probs["industry"]).astype(float).to_numpy()
+    np.testing.assert_allclose(engineered[~has_history], static[~has_history])
+
+
+def test_transformer_scores_with_saved_rolling_rates(tmp_path: Path) -> None:
+    df = _deals()
+    static = RiskFeatureTransformer().fit(df)
+    transformer = RiskFeatureTransformer(rolling_win_rates=RollingSegmentWinRates(half_life=2)).fit(
+        df
+    )
+
+    lean = transformer.transform_matrix(df)
+    np.testing.assert_allclose(lean, transformer.transform(df)[MODEL_FEATURES].to_numpy(float))
+    assert not np.allclose(lean[:, 0], static.transform_matrix(df)[:, 0])
+
+    model = trained_model()
+    records = sample_deals(300)[FEATURE_INPUT_COLUMNS][:20].to_dict(orient="records")
+    responses = DealScorer(model, transformer).score_records(records)
+    features = pd.DataFrame(lean[:20], columns=MODEL_FEATURES)
+    np.testing.assert_allclose(
+        [response["loss_probability"] for response in responses],
+        model.predict_proba(features)[:, 1],
+    )
+
+    transformer.save(tmp_path)
+    loaded = RiskFeatureTransformer.load(tmp_path)
+    np.testing.assert_allclose(loaded.transform_matrix(df), lean)
+    assert transformer_version(loaded) != transformer_version(static)
+    assert artifact_version(None, loaded) != artifact_version(None, static)
+
+    version = transformer_version(loaded)
+    later = df.assign(created_month=df["created_month"] + 12)
+    loaded.rolling_win_rates.update(later)
+    assert transformer_version(loaded) != version
+
+    static.save(tmp_path)
+    assert RiskFeatureTransformer.load(tmp_path).rolling_win_rates is None
@@ -0,0 +1,57 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from features.feature_transformer import RiskFeatureTransformer
+from pipeline.scoring import prepare_scoring_frame, score_csv_in_chunks, score_frame
+from tests.helpers import sample_deals, trained_model
+
+
+def test_chunked_scoring_matches_one_shot(tmp_path: Path) -> None:
+    input_path = tmp_path / "deals.csv"
+    sample_deals().to_csv(input_path, index=False)
+
+    df = prepare_scoring_frame(pd.read_csv(input_path))
+    model = trained_model()
+    one_shot = score_frame(df, model, RiskFeatureTransformer().fit(df))
+
+    output_path = tmp_path / "scores.csv"
+    rows = score_csv_in_chunks(
+        input_path, output_path, model, RiskFeatureTransformer(), chunk_size=25
+    )
+
+    one_shot_path = tmp_path / "one_shot.csv"
+    one_shot.to_csv(one_shot_path, index=False)
+    chunked = pd.read_csv(output_path)
+    expected = pd.read_csv(one_shot_path)
+    assert rows == len(one_shot)
+    pd.testing.assert_frame_equal(
+        chunked.drop(columns="loss_probability"), expected.drop(columns="loss_probability")
+    )
+    assert np.allclose(chunked["loss_probability"], expected["loss_probability"], rtol=1e-12)
+
+
+def test_chunked_scoring_reads_parquet_feather_and_partition_directories(tmp_path: Path) -> None:
+    deals = sample_deals()
+    csv_path = tmp_path / "deals.csv"
+    deals.to_csv(csv_path, index=False)
+    parts = tmp_path / "crm" / "acme"
+    parts.mkdir(parents=True)
+    deals.iloc[:70].to_parquet(parts / "part-00000.parquet", index=False)
+    deals.iloc[70:].to_parquet(parts / "part-00001.parquet", index=False)
+    deals.to_parquet(tmp_path / "deals.parquet", index=False)
+    deals.to_feather(tmp_path / "deals.feather")
+
+    model = trained_model()
+    transformer = RiskFeatureTransformer().fit(prepare_scoring_frame(deals.copy()))
+    score_csv_in_chunks(csv_path, tmp_path / "expected.csv", model, transformer, chunk_size=25)
+    expected = pd.read_csv(tmp_path / "expected.csv")
+    for input_path in (tmp_path / "deals.parquet", tmp_path / "deals.feather", parts):
+        output_path = tmp_path / f"{input_path.name}_scores.csv"
+        rows = score_csv_in_chunks(input_path, output_path, model, transformer, chunk_size=25)
+        assert rows == len(deals)
+        pd.testing.assert_frame_equal(pd.read_csv(output_path), expected)
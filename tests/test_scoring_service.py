@@ -0,0 +1,148 @@
+from pathlib import Path
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from typing import Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import MODEL_FEATURES
+from features.feature_transformer import RiskFeatureTransformer
+from models.artifact_bundle import BundleCache, save_bundle
+from models.risk_scorer import train_model
+from pipeline.scoring import prepare_scoring_frame
+from service.micro_batcher import MicroBatcher
+from service.scoring_service import SCORE_PATH, TENANT_HEADER, DealScorer, ScoringHTTPServer
+from tests.helpers import sample_deals
+
+
+def test_micro_batcher_groups_concurrent_items() -> None:
+    release = threading.Event()
+    batch_sizes = []
+
+    def process(items: list) -> list:
+        release.wait(timeout=5)
+        batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(5)]
+    release.set()
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6, 8]
+    assert sum(batch_sizes) == 5 and len(batch_sizes) < 5
+    batcher.stop()
+
+
+def test_micro_batcher_fails_only_the_bad_item_of_a_batch() -> None:
+    release = threading.Event()
+    batch_sizes = []
+
+    def process(items: list) -> list:
+        release.wait(timeout=5)
+        batch_sizes.append(len(items))
+        if any(item < 0 for item in items):
+            raise ValueError("negative item")
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50)
+    good, bad = batcher.submit(3), batcher.submit(-1)
+    release.set()
+    assert good.result(timeout=5) == 6
+    with pytest.raises(ValueError, match="negative item"):
+        bad.result(timeout=5)
+    assert batch_sizes == [2, 1, 1]
+    batcher.stop()
+
+
+@pytest.fixture()
+def server(tmp_path: Path) -> ScoringHTTPServer:
+    df = prepare_scoring_frame(sample_deals(80))
+    transformer = RiskFeatureTransformer().fit(df)
+    features = transformer.transform(df)
+    model = train_model(features[MODEL_FEATURES], features["is_lost"], "gradient_boosting")
+    save_bundle(model, transformer, root=tmp_path, tenant="acme", version="v7")
+
+    http_server = ScoringHTTPServer(
+        ("127.0.0.1", 0),
+        DealScorer(model, transformer),
+        bundle_cache=BundleCache(tmp_path, max_size=2),
+    )
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def _post(server: ScoringHTTPServer, payload: dict, headers: Optional[dict] = None) -> tuple:
+    url = f"http://127.0.0.1:{server.server_address[1]}{SCORE_PATH}"
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), headers=headers or {}, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_score_endpoint(server: ScoringHTTPServer) -> None:
+    deal = sample_deals(1).drop(columns=["outcome", "closed_date"]).iloc[0].to_dict()
+    deal["deal_amount"] = int(deal["deal_amount"])
+    deal["sales_cycle_days"] = int(deal["sales_cycle_days"])
+
+    status, body = _post(server, deal)
+    assert status == 200
+    assert body["deal_id"] == deal["deal_id"]
+    assert 0 <= body["loss_probability"] <= 1
+    assert body["risk_category"] in {"low", "medium", "high", "critical"}
+    assert len(body["risk_factors"]) == 3
+
+    status, body = _post(server, {"deal_id": "D1"})
+    assert status == 400
+    assert body["error"] == "validation_error"
+
+    for field, value, constraint in (
+        ("deal_amount", -5, "non_negative"),
+        ("deal_amount", float("inf"), "finite"),
+        ("sales_cycle_days", float("nan"), "finite"),
+    ):
+        status, body = _post(server, {**deal, field: value})
+        assert status == 400
+        assert body["details"] == {"field": field, "constraint": constraint}
+
+
+def test_bad_deal_does_not_fail_its_micro_batch(server: ScoringHTTPServer) -> None:
+    deal = sample_deals(1).drop(columns=["outcome", "closed_date"]).iloc[0].to_dict()
+    deal["deal_amount"] = int(deal["deal_amount"])
+    deal["sales_cycle_days"] = int(deal["sales_cycle_days"])
+    bad_deal = {**deal, "deal_id": "bad", "deal_amount": float("inf")}
+
+    # Submitted straight to the batcher, as if validation had let the deal through.
+    futures = [server.batcher.submit((server.scorer, item)) for item in (bad_deal, deal)]
+    with pytest.raises(ValueError):
+        futures[0].result(timeout=10)
+    assert futures[1].result(timeout=10)["deal_id"] == deal["deal_id"]
+
+
+def test_tenant_header_routes_to_cached_bundle(server: ScoringHTTPServer) -> None:
+    deal = sample_deals(1).drop(columns=["outcome", "closed_date"]).iloc[0].to_dict()
+    deal["deal_amount"] = int(deal["deal_amount"])
+    deal["sales_cycle_days"] = int(deal["sales_cycle_days"])
+
+    _, default_body = _post(server, deal)
+    for _ in range(2):
+        status, body = _post(server, deal, {TENANT_HEADER: "acme"})
+        assert status == 200
+        assert body["model_version"] == "v7"
+        assert body["loss_probability"] == pytest.approx(default_body["loss_probability"])
+    assert (server.bundle_cache.misses, server.bundle_cache.hits) == (1, 1)
+
+    status, body = _post(server, deal, {TENANT_HEADER: "unknown"})
+    assert status == 404 and body["error"] == "unknown_tenant"
+    status, _ = _post(server, deal, {TENANT_HEADER: "../acme"})
+    assert status == 400
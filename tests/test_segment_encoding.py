@@ -0,0 +1,53 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import SEGMENT_COLUMNS
+from features.feature_transformer import RiskFeatureTransformer
+from features.segment_encoding import SegmentEncoder, segment_win_probabilities
+from pipeline.scoring import prepare_scoring_frame
+from tests.helpers import sample_deals
+
+
+def test_lookup_matches_dict_map_for_categorical_and_object_columns() -> None:
+    segment_probs = {"industry": {"Tech": 0.6, "Finance": 0.4, "Health": float("nan")}}
+    values = pd.Series(["Tech", "Retail", None, "Health", "Finance", "Tech"])
+    expected = values.map(segment_probs["industry"]).astype(float).fillna(0.45).to_numpy()
+
+    for column in (values, values.astype("category")):
+        df = pd.DataFrame({"industry": column})
+        probs = segment_win_probabilities(df, segment_probs, 0.45)["industry"]
+        np.testing.assert_array_equal(probs, expected)
+
+
+def test_codes_stay_stable_when_values_are_added() -> None:
+    encoder = SegmentEncoder.from_values({"region": ["EMEA", "APAC"]})
+    assert encoder.vocabularies == {"region": ["APAC", "EMEA"]}
+    extended = encoder.extended({"region": ["AMER", "EMEA", "LATAM"]})
+    assert extended.vocabularies == {"region": ["APAC", "EMEA", "AMER", "LATAM"]}
+    assert encoder.extended({"region": ["APAC"]}) is encoder
+
+    codes = extended.encode(pd.Series(["EMEA", "LATAM", "Mars"]), "region")
+    assert codes.tolist() == [1, 3, -1]
+
+
+def test_transformer_persists_codes_and_builds_cross_tables(tmp_path: Path) -> None:
+    df = prepare_scoring_frame(sample_deals(200))
+    transformer = RiskFeatureTransformer().fit(df)
+    transformer.save(tmp_path)
+    loaded = RiskFeatureTransformer.load(tmp_path)
+    assert loaded.segment_encoder.vocabularies == transformer.segment_encoder.vocabularies
+    assert set(loaded.segment_encoder.vocabularies) == set(SEGMENT_COLUMNS)
+
+    cross = loaded.cross_win_probabilities(df, ("industry", "region"))
+    is_won = (df["outcome"] == "Won").astype(float)
+    expected = is_won.groupby([df["industry"], df["region"]], observed=True).transform("mean")
+    np.testing.assert_allclose(cross, expected.to_numpy())
+
+    unseen = df.head(2).assign(region=["Mars", "Mars"])
+    unseen_rates = loaded.cross_win_probabilities(unseen, ("industry", "region"))
+    np.testing.assert_array_equal(unseen_rates, [loaded.overall_win_rate] * 2)
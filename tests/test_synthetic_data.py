@@ -0,0 +1,32 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import SEGMENT_COLUMNS
+from data.data_loader import REQUIRED_COLUMNS, load_sales_data
+from data.synthetic_data import SEGMENT_VALUES, generate_sales_data, write_sales_data
+
+
+def test_generated_deals_match_sales_schema() -> None:
+    df = generate_sales_data(20_000, seed=1)
+
+    assert list(df.columns) == REQUIRED_COLUMNS
+    for column in SEGMENT_COLUMNS:
+        assert set(df[column].unique()) == set(SEGMENT_VALUES[column])
+    assert df["deal_amount"].between(2_000, 100_000).all()
+    assert 12_000 < df["deal_amount"].median() < 16_000
+    assert df["sales_cycle_days"].between(7, 120).all()
+    assert 0.43 < (df["outcome"] == "Won").mean() < 0.48
+    assert (df["closed_date"] > df["created_date"]).all()
+
+
+def test_chunked_csv_loads_with_unique_deal_ids(tmp_path: Path) -> None:
+    path = write_sales_data(tmp_path / "deals.csv", 2_500, chunk_size=1_000)
+
+    df = load_sales_data(path)
+    assert len(df) == 2_500
+    assert df["deal_id"].is_unique
+    assert (df["closed_date"] - df["created_date"]).dt.days.equals(
+        df["sales_cycle_days"].astype("int64")
+    )
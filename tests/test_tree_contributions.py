@@ -0,0 +1,56 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from models.risk_scorer import train_model
+from models.tree_contributions import tree_feature_contributions
+from recommendations.recommendation_engine import identify_risk_factors, identify_risk_factors_batch
+
+
+def _training_data() -> tuple:
+    rng = np.random.default_rng(5)
+    X = pd.DataFrame(
+        {
+            "f1": rng.normal(size=200),
+            "f2": rng.uniform(size=200),
+            "f3": rng.integers(0, 2, 200),
+        }
+    )
+    y = pd.Series((X["f1"] + rng.normal(scale=0.5, size=200) > 0).astype(int))
+    return X, y
+
+
+@pytest.mark.parametrize("model_type", ["gradient_boosting", "random_forest"])
+def test_contributions_sum_to_model_output(model_type: str) -> None:
+    X, y = _training_data()
+    model = train_model(X, y, model_type)
+
+    result = tree_feature_contributions(model, X)
+    total = result.bias + result.contributions.sum(axis=1)
+    if model_type == "gradient_boosting":
+        expected = model.decision_function(X)
+    else:
+        expected = model.predict_proba(X)[:, 1]
+    np.testing.assert_allclose(total, expected, atol=1e-10)
+
+
+def test_contributions_as_risk_factor_importances() -> None:
+    X, y = _training_data()
+    model = train_model(X, y, "gradient_boosting")
+    contributions = tree_feature_contributions(model, X).contributions
+
+    factors = identify_risk_factors_batch(
+        X, model, list(X.columns), top_n=2, importances=contributions
+    )
+    for position in range(5):
+        expected = identify_risk_factors(
+            X.iloc[position], model, list(X.columns), top_n=2, importances=contributions[position]
+        )
+        assert factors.iloc[position]["risk_factor_1"] == expected[0].feature
+        assert factors.iloc[position]["risk_factor_2_impact"] == expected[1].impact
+    assert factors["risk_factor_1"].nunique() > 1